@@ -1,8 +1,11 @@
+import csv
+import json
+import os
 import pathlib
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-import pandas as pd
+import threading
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
 import locale
 
 # Configurar locale para português
@@ -14,15 +17,25 @@ except:
     except:
         pass  # Se não conseguir configurar o locale, usa o padrão
 
-SPREADSHEET_ID = None  # Será preenchido na primeira execução
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+SPREADSHEET_TITLE = 'Alta Vista - Posts'
+# IDs da planilha e das abas, guardados entre execuções para evitar a busca no Drive
+CACHE_PATH = pathlib.Path('data/sheets.json')
+# Coluna que identifica uma linha já enviada
+KEY_COLUMN = 'link'
+# Linhas por chamada de append
+BATCH_SIZE = 500
+# "local" usa o substituto offline (export/local_sheets.py) em vez da API
+SHEETS_BACKEND = os.getenv('SHEETS_BACKEND', 'google')
+LOCAL_SHEETS_PATH = pathlib.Path('data/local_sheets.json')
 
 def format_date(date_str: str) -> str:
     """
     Formata a data do post para um formato amigável
-    
+
     Args:
         date_str: String com a data no formato original
-        
+
     Returns:
         str: Data formatada em português
     """
@@ -38,39 +51,44 @@ def format_date(date_str: str) -> str:
     except:
         return date_str
 
-def get_or_create_spreadsheet(sheets_service, drive_service):
+def sheet_name_for(date: Optional[datetime] = None) -> str:
+    """Nome da aba mensal ("Outubro 2026")."""
+    return (date or datetime.now()).strftime("%B %Y").capitalize()
+
+def column_letter(index: int) -> str:
+    """Converte o índice da coluna em letra (0 -> A, 26 -> AA)."""
+    letters = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord('A') + rest) + letters
+    return letters
+
+def _quote(sheet_name: str) -> str:
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+def get_or_create_spreadsheet(sheets_service, drive_service=None, title: str = SPREADSHEET_TITLE) -> str:
     """
     Obtém a planilha fixa ou cria uma nova se não existir
+
+    Sem `drive_service`, não há como procurar pelo nome e a planilha é criada.
     """
-    global SPREADSHEET_ID
-    
-    # Se já temos o ID da planilha, apenas retorna
-    if SPREADSHEET_ID:
-        return SPREADSHEET_ID
-        
-    # Tenta encontrar a planilha pelo nome
-    results = drive_service.files().list(
-        q="name='Alta Vista - Posts' and mimeType='application/vnd.google-apps.spreadsheet'",
-        spaces='drive',
-        fields='files(id, name)'
-    ).execute()
-    
-    files = results.get('files', [])
-    
-    # Se encontrou a planilha, usa ela
-    if files:
-        SPREADSHEET_ID = files[0]['id']
-        return SPREADSHEET_ID
-    
+    if drive_service is not None:
+        # Tenta encontrar a planilha pelo nome
+        results = drive_service.files().list(
+            q=f"name='{title}' and mimeType='application/vnd.google-apps.spreadsheet'",
+            spaces='drive',
+            fields='files(id, name)'
+        ).execute()
+        files = results.get('files', [])
+        if files:
+            return files[0]['id']
+
     # Se não encontrou, cria uma nova
-    spreadsheet = {
-        'properties': {
-            'title': 'Alta Vista - Posts'
-        }
-    }
-    spreadsheet = sheets_service.spreadsheets().create(body=spreadsheet).execute()
-    SPREADSHEET_ID = spreadsheet['spreadsheetId']
-    return SPREADSHEET_ID
+    spreadsheet = sheets_service.spreadsheets().create(
+        body={'properties': {'title': title}}
+    ).execute()
+    return spreadsheet['spreadsheetId']
 
 def share_spreadsheet(drive_service, spreadsheet_id, email):
     """
@@ -82,7 +100,7 @@ def share_spreadsheet(drive_service, spreadsheet_id, email):
             fileId=spreadsheet_id,
             fields='permissions(id,emailAddress)'
         ).execute()
-        
+
         # Se o usuário já tem acesso, não precisa compartilhar novamente
         for permission in permissions.get('permissions', []):
             if permission.get('emailAddress') == email:
@@ -104,90 +122,270 @@ def share_spreadsheet(drive_service, spreadsheet_id, email):
     except Exception as e:
         print(f"Warning: Could not share spreadsheet: {e}")
 
-def upload_csv(csv_path: pathlib.Path, share_with_email: str = None) -> str:
+class SheetsWriter:
     """
-    Upload a CSV file to Google Sheets, using a fixed spreadsheet with monthly tabs
-    
+    Envia linhas para a aba mensal da planilha, só acrescentando as novas.
+
+    As linhas são identificadas pela coluna `key` (o link do artigo); as já
+    presentes na aba são ignoradas. Na primeira escrita em uma aba, o
+    cabeçalho e a coluna-chave são lidos uma vez e mantidos em memória, e
+    os IDs da planilha e das abas ficam em `cache_path` para as próximas
+    execuções. As linhas novas vão em chamadas de append de até
+    `batch_size` linhas, sem limpar nem reescrever a aba.
+
+    Example:
+        >>> writer = get_writer()
+        >>> writer.append([{"title": "...", "link": "https://..."}])
+        1
+    """
+
+    def __init__(self, sheets_service, drive_service=None, spreadsheet_id: Optional[str] = None,
+                 title: str = SPREADSHEET_TITLE, cache_path: Optional[pathlib.Path] = CACHE_PATH,
+                 key: str = KEY_COLUMN, batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            sheets_service: Cliente da API do Sheets (ou LocalSheetsService)
+            drive_service: Cliente da API do Drive, usado para achar a planilha pelo nome
+            spreadsheet_id: ID da planilha (se None, vem do cache ou é procurado/criado)
+            title: Nome da planilha
+            cache_path: Arquivo com os IDs da planilha e das abas (None = sem cache em disco)
+            key: Coluna que identifica linhas já enviadas
+            batch_size: Máximo de linhas por chamada de append
+        """
+        self.sheets = sheets_service
+        self.drive = drive_service
+        self.title = title
+        self.cache_path = pathlib.Path(cache_path) if cache_path else None
+        self.key = key
+        self.batch_size = max(1, batch_size)
+        self._cache = self._load_cache()
+        if spreadsheet_id and spreadsheet_id != self._cache.get('spreadsheet_id'):
+            self._cache = {'spreadsheet_id': spreadsheet_id, 'sheets': {}}
+        # Estado de cada aba: cabeçalho e chaves já presentes
+        self._headers: Dict[str, List[str]] = {}
+        self._keys: Dict[str, Set[str]] = {}
+        # O writer é compartilhado pelo processo: um append por vez
+        self._lock = threading.Lock()
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if self.cache_path and self.cache_path.exists():
+            try:
+                cache = json.loads(self.cache_path.read_text(encoding='utf-8'))
+                if cache.get('title') == self.title:
+                    return cache
+            except (OSError, ValueError):
+                pass
+        return {'sheets': {}}
+
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({**self._cache, 'title': self.title}), encoding='utf-8')
+        tmp.replace(self.cache_path)
+
+    def _forget(self) -> None:
+        """Descarta os IDs e o estado em memória (planilha ou aba removida)."""
+        self._cache = {'sheets': {}}
+        self._headers.clear()
+        self._keys.clear()
+        self._save_cache()
+
+    @property
+    def spreadsheet_id(self) -> str:
+        """ID da planilha, procurada ou criada só se não estiver no cache."""
+        if not self._cache.get('spreadsheet_id'):
+            self._cache = {'spreadsheet_id': get_or_create_spreadsheet(self.sheets, self.drive, self.title),
+                           'sheets': {}}
+            self._save_cache()
+        return self._cache['spreadsheet_id']
+
+    @property
+    def url(self) -> str:
+        return f'https://docs.google.com/spreadsheets/d/{self.spreadsheet_id}'
+
+    def _ensure_sheet(self, name: str) -> None:
+        """Cria a aba se ela não estiver no cache nem na planilha."""
+        if name in self._cache['sheets']:
+            return
+        spreadsheet_id = self.spreadsheet_id
+        info = self.sheets.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields='sheets.properties'
+        ).execute()
+        sheets = {s['properties']['title']: s['properties']['sheetId'] for s in info.get('sheets', [])}
+        if name not in sheets:
+            reply = self.sheets.spreadsheets().batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={"requests": [{"addSheet": {"properties": {"title": name}}}]}
+            ).execute()
+            sheets[name] = reply['replies'][0]['addSheet']['properties']['sheetId']
+            # Aba nova: vazia, sem precisar ler cabeçalho ou chaves
+            self._headers[name] = []
+            self._keys[name] = set()
+        self._cache['sheets'] = sheets
+        self._save_cache()
+
+    def _load_state(self, name: str) -> None:
+        """Lê o cabeçalho e a coluna-chave da aba (uma vez por processo)."""
+        if name in self._headers:
+            return
+        values = self.sheets.spreadsheets().values()
+        header = values.get(spreadsheetId=self.spreadsheet_id,
+                            range=f"{_quote(name)}!1:1").execute().get('values', [[]])[0]
+        keys: Set[str] = set()
+        if self.key in header:
+            column = column_letter(header.index(self.key))
+            rows = values.get(spreadsheetId=self.spreadsheet_id,
+                              range=f"{_quote(name)}!{column}2:{column}").execute().get('values', [])
+            keys = {row[0] for row in rows if row and row[0]}
+        self._headers[name] = list(header)
+        self._keys[name] = keys
+
+    def _prepare(self, name: str) -> None:
+        from_cache = name in self._cache['sheets']
+        try:
+            self._ensure_sheet(name)
+            self._load_state(name)
+        except Exception:
+            if not from_cache:
+                raise
+            # IDs do cache não valem mais: procura/cria de novo
+            self._forget()
+            self._ensure_sheet(name)
+            self._load_state(name)
+
+    def append(self, rows: Iterable[Dict[str, Any]], sheet_name: Optional[str] = None) -> int:
+        """
+        Acrescenta as linhas ainda não presentes na aba.
+
+        Args:
+            rows: Linhas (dicionários coluna -> valor)
+            sheet_name: Aba de destino (padrão: a do mês atual)
+
+        Returns:
+            int: Número de linhas acrescentadas
+        """
+        name = sheet_name or sheet_name_for()
+        rows = [dict(row) for row in rows]
+        for row in rows:
+            if row.get('published') and 'data_formatada' not in row:
+                row['data_formatada'] = format_date(str(row['published']))
+        if not rows:
+            return 0
+
+        with self._lock:
+            self._prepare(name)
+            # O estado da aba só muda depois que cada chamada à API dá certo:
+            # uma falha deixa as linhas pendentes para a próxima tentativa
+            keys = self._keys[name]
+            new_rows, row_keys = [], []
+            for row in rows:
+                key = str(row.get(self.key) or '')
+                if key and (key in keys or key in row_keys):
+                    continue
+                new_rows.append(row)
+                row_keys.append(key)
+            if not new_rows:
+                return 0
+
+            header = list(self._headers[name])
+            missing = [col for col in dict.fromkeys(c for row in new_rows for c in row) if col not in header]
+            values = self.sheets.spreadsheets().values()
+            values_rows = []
+            if missing:
+                if header:
+                    # Colunas novas: só o cabeçalho é atualizado, as linhas existentes ficam
+                    values.update(spreadsheetId=self.spreadsheet_id, range=f"{_quote(name)}!A1",
+                                  valueInputOption='RAW', body={'values': [header + missing]}).execute()
+                    self._headers[name] = header + missing
+                else:
+                    # Aba vazia: o cabeçalho vai no primeiro lote
+                    values_rows.append(missing)
+                header = header + missing
+
+            offset = len(values_rows)
+            values_rows.extend([_cell(row.get(col)) for col in header] for row in new_rows)
+            for start in range(0, len(values_rows), self.batch_size):
+                end = start + self.batch_size
+                values.append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{_quote(name)}!A1",
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': values_rows[start:end]}
+                ).execute()
+                self._headers[name] = header
+                keys.update(key for key in row_keys[max(0, start - offset):end - offset] if key)
+            return len(new_rows)
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+@lru_cache(maxsize=1)
+def get_services():
+    """
+    Clientes das APIs do Sheets e do Drive, criados uma vez por processo.
+
+    Com SHEETS_BACKEND=local, usa o substituto offline gravado em
+    data/local_sheets.json e não há cliente do Drive.
+    """
+    if SHEETS_BACKEND == 'local':
+        from export.local_sheets import LocalSheetsService
+        return LocalSheetsService(LOCAL_SHEETS_PATH), None
+
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
+    credentials_path = pathlib.Path(__file__).parent / 'temp_credentials.json'
+    if not credentials_path.exists():
+        raise FileNotFoundError(f"Credenciais do Google não encontradas em {credentials_path}")
+    credentials = service_account.Credentials.from_service_account_file(
+        str(credentials_path), scopes=SCOPES)
+    return (build('sheets', 'v4', credentials=credentials, cache_discovery=False),
+            build('drive', 'v3', credentials=credentials, cache_discovery=False))
+
+@lru_cache(maxsize=1)
+def get_writer() -> SheetsWriter:
+    """SheetsWriter compartilhado pelo processo (clientes e estado das abas reaproveitados)."""
+    sheets_service, drive_service = get_services()
+    return SheetsWriter(sheets_service, drive_service)
+
+def upload_rows(rows: List[Dict[str, Any]], share_with_email: str = None) -> str:
+    """
+    Envia linhas para a aba do mês na planilha fixa, sem repetir as já enviadas
+
     Args:
-        csv_path (pathlib.Path): Path to the CSV file
+        rows: Linhas em memória (ex.: drafts gerados)
         share_with_email (str, optional): Email to share the spreadsheet with
-        
+
     Returns:
         str: URL of the spreadsheet
     """
-    # Load credentials
-    SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-    current_dir = pathlib.Path(__file__).parent
-    credentials_path = current_dir / 'temp_credentials.json'
-    
-    print(f"Trying to load credentials from: {credentials_path}")
-    print(f"File exists: {credentials_path.exists()}")
-    
-    credentials = service_account.Credentials.from_service_account_file(
-        str(credentials_path), scopes=SCOPES)
+    writer = get_writer()
+    added = writer.append(rows)
+    print(f"{added} nova(s) linha(s) enviada(s) ({len(rows) - added} já presente(s))")
+    if share_with_email and writer.drive is not None:
+        share_spreadsheet(writer.drive, writer.spreadsheet_id, share_with_email)
+    return writer.url
 
-    # Create services
-    sheets_service = build('sheets', 'v4', credentials=credentials)
-    drive_service = build('drive', 'v3', credentials=credentials)
-
-    # Get or create the fixed spreadsheet
-    spreadsheet_id = get_or_create_spreadsheet(sheets_service, drive_service)
-
-    # Share the spreadsheet if an email is provided
-    if share_with_email:
-        share_spreadsheet(drive_service, spreadsheet_id, share_with_email)
-
-    # Read CSV
-    df = pd.read_csv(csv_path)
-    
-    # Adiciona coluna de data formatada se não existir
-    if 'published' in df.columns:
-        df['data_formatada'] = df['published'].apply(format_date)
-    
-    # Get current month and year
-    current_date = datetime.now()
-    sheet_name = current_date.strftime("%B %Y").capitalize()
-    
-    try:
-        # Tenta obter a aba
-        sheets_service.spreadsheets().get(
-            spreadsheetId=spreadsheet_id,
-            ranges=sheet_name
-        ).execute()
-    except:
-        # Se a aba não existe, cria
-        sheets_service.spreadsheets().batchUpdate(
-            spreadsheetId=spreadsheet_id,
-            body={
-                "requests": [{
-                    "addSheet": {
-                        "properties": {
-                            "title": sheet_name
-                        }
-                    }
-                }]
-            }
-        ).execute()
+def upload_csv(csv_path: pathlib.Path, share_with_email: str = None) -> str:
+    """
+    Upload a CSV file to Google Sheets, using a fixed spreadsheet with monthly tabs
 
-    # Prepare data
-    values = [df.columns.tolist()] + df.values.tolist()
-    
-    # Clear existing content in the sheet
-    sheets_service.spreadsheets().values().clear(
-        spreadsheetId=spreadsheet_id,
-        range=f"{sheet_name}!A1:Z"
-    ).execute()
-    
-    # Update spreadsheet
-    body = {
-        'values': values
-    }
-    sheets_service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id,
-        range=f"{sheet_name}!A1",
-        valueInputOption='RAW',
-        body=body
-    ).execute()
+    Mantida por compatibilidade; prefira `upload_rows` com as linhas em memória.
+
+    Args:
+        csv_path (pathlib.Path): Path to the CSV file
+        share_with_email (str, optional): Email to share the spreadsheet with
 
-    # Return the URL
-    return f'https://docs.google.com/spreadsheets/d/{spreadsheet_id}' 
\ No newline at end of file
+    Returns:
+        str: URL of the spreadsheet
+    """
+    with open(csv_path, newline='', encoding='utf-8') as fh:
+        rows = list(csv.DictReader(fh))
+    return upload_rows(rows, share_with_email)
@@ -0,0 +1,220 @@
+"""
+Substituto local da API do Google Sheets, para testes e execuções offline.
+
+Implementa o subconjunto da interface do `googleapiclient` usado pelo
+`SheetsWriter` (`spreadsheets().create/get/batchUpdate` e
+`spreadsheets().values().get/append/update/clear`), com a mesma forma de
+chamada encadeada terminando em `.execute()`.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_RANGE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))(?:!(.*))?$")
+_CELL = re.compile(r"^([A-Z]*)(\d*)$")
+
+
+def column_index(letters: str) -> int:
+    """Converte a letra da coluna em índice (A -> 0, AA -> 26)."""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def parse_range(a1: str) -> Tuple[str, int, int, Optional[int], Optional[int]]:
+    """
+    Interpreta um intervalo A1 ("'Aba'!A2:C", "Aba!1:1", "Aba").
+
+    Returns:
+        Tuple: (aba, linha inicial, coluna inicial, linha final, coluna final),
+        com índices a partir de 0 e None para intervalos abertos
+    """
+    match = _RANGE.match(a1)
+    if not match:
+        raise ValueError(f"Intervalo inválido: {a1}")
+    sheet = (match.group(1) or '').replace("''", "'") or match.group(2)
+    cells = match.group(3)
+    if not cells:
+        return sheet, 0, 0, None, None
+    start, _, end = cells.partition(':')
+    start_col, start_row = _CELL.match(start).groups()
+    end_col, end_row = _CELL.match(end or start).groups()
+    return (sheet,
+            int(start_row) - 1 if start_row else 0,
+            column_index(start_col) if start_col else 0,
+            int(end_row) - 1 if end_row else None,
+            column_index(end_col) if end_col else None)
+
+
+class _Request:
+    """Chamada pendente, executada em `execute()` como no googleapiclient."""
+
+    def __init__(self, service: "LocalSheetsService", method: str, handler, **kwargs):
+        self._service = service
+        self._method = method
+        self._handler = handler
+        self._kwargs = kwargs
+
+    def execute(self) -> Dict[str, Any]:
+        self._service.calls.append(self._method)
+        result = self._handler(**self._kwargs)
+        self._service._persist()
+        return result
+
+
+class _Values:
+    def __init__(self, service: "LocalSheetsService"):
+        self._service = service
+
+    def get(self, spreadsheetId: str, range: str, **_: Any) -> _Request:
+        return _Request(self._service, 'values.get', self._service._get_values,
+                        spreadsheet_id=spreadsheetId, a1=range)
+
+    def append(self, spreadsheetId: str, range: str, body: Dict, **_: Any) -> _Request:
+        return _Request(self._service, 'values.append', self._service._append_values,
+                        spreadsheet_id=spreadsheetId, a1=range, values=body['values'])
+
+    def update(self, spreadsheetId: str, range: str, body: Dict, **_: Any) -> _Request:
+        return _Request(self._service, 'values.update', self._service._update_values,
+                        spreadsheet_id=spreadsheetId, a1=range, values=body['values'])
+
+    def clear(self, spreadsheetId: str, range: str, **_: Any) -> _Request:
+        return _Request(self._service, 'values.clear', self._service._clear_values,
+                        spreadsheet_id=spreadsheetId, a1=range)
+
+
+class _Spreadsheets:
+    def __init__(self, service: "LocalSheetsService"):
+        self._service = service
+
+    def create(self, body: Dict, **_: Any) -> _Request:
+        return _Request(self._service, 'create', self._service._create, body=body)
+
+    def get(self, spreadsheetId: str, **_: Any) -> _Request:
+        return _Request(self._service, 'get', self._service._describe, spreadsheet_id=spreadsheetId)
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict, **_: Any) -> _Request:
+        return _Request(self._service, 'batchUpdate', self._service._batch_update,
+                        spreadsheet_id=spreadsheetId, requests=body['requests'])
+
+    def values(self) -> _Values:
+        return _Values(self._service)
+
+
+class LocalSheetsService:
+    """
+    Planilhas em memória (opcionalmente gravadas em um arquivo JSON).
+
+    `calls` registra o nome de cada chamada executada, o que permite
+    verificar nos testes quantas requisições a API real receberia.
+
+    Example:
+        >>> service = LocalSheetsService()
+        >>> writer = SheetsWriter(service, cache_path=None)
+        >>> writer.append(rows)
+        >>> service.rows(writer.spreadsheet_id, writer.sheet_name)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: Arquivo JSON onde as planilhas são mantidas entre execuções (None = só memória)
+        """
+        self.path = Path(path) if path else None
+        self.calls: List[str] = []
+        self._data: Dict[str, Dict[str, Any]] = {}
+        if self.path and self.path.exists():
+            self._data = json.loads(self.path.read_text(encoding='utf-8'))
+
+    def spreadsheets(self) -> _Spreadsheets:
+        return _Spreadsheets(self)
+
+    def rows(self, spreadsheet_id: str, sheet: str) -> List[List[Any]]:
+        """Todas as linhas de uma aba."""
+        return self._sheet(spreadsheet_id, sheet)['rows']
+
+    def _persist(self) -> None:
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._data, ensure_ascii=False), encoding='utf-8')
+
+    def _spreadsheet(self, spreadsheet_id: str) -> Dict[str, Any]:
+        if spreadsheet_id not in self._data:
+            raise KeyError(f"Planilha não encontrada: {spreadsheet_id}")
+        return self._data[spreadsheet_id]
+
+    def _sheet(self, spreadsheet_id: str, name: str) -> Dict[str, Any]:
+        sheets = self._spreadsheet(spreadsheet_id)['sheets']
+        if name not in sheets:
+            raise KeyError(f"Aba não encontrada: {name}")
+        return sheets[name]
+
+    def _create(self, body: Dict) -> Dict[str, Any]:
+        spreadsheet_id = f"local-{len(self._data) + 1}"
+        self._data[spreadsheet_id] = {
+            'title': body.get('properties', {}).get('title', ''),
+            'sheets': {'Sheet1': {'sheetId': 0, 'rows': []}},
+        }
+        return {'spreadsheetId': spreadsheet_id}
+
+    def _describe(self, spreadsheet_id: str) -> Dict[str, Any]:
+        spreadsheet = self._spreadsheet(spreadsheet_id)
+        return {
+            'spreadsheetId': spreadsheet_id,
+            'properties': {'title': spreadsheet['title']},
+            'sheets': [{'properties': {'sheetId': sheet['sheetId'], 'title': name}}
+                       for name, sheet in spreadsheet['sheets'].items()],
+        }
+
+    def _batch_update(self, spreadsheet_id: str, requests: List[Dict]) -> Dict[str, Any]:
+        sheets = self._spreadsheet(spreadsheet_id)['sheets']
+        replies = []
+        for request in requests:
+            title = request['addSheet']['properties']['title']
+            if title in sheets:
+                raise ValueError(f"Já existe uma aba chamada {title}")
+            sheet_id = max((s['sheetId'] for s in sheets.values()), default=0) + 1
+            sheets[title] = {'sheetId': sheet_id, 'rows': []}
+            replies.append({'addSheet': {'properties': {'sheetId': sheet_id, 'title': title}}})
+        return {'spreadsheetId': spreadsheet_id, 'replies': replies}
+
+    def _get_values(self, spreadsheet_id: str, a1: str) -> Dict[str, Any]:
+        name, row0, col0, row1, col1 = parse_range(a1)
+        rows = self._sheet(spreadsheet_id, name)['rows']
+        rows = rows[row0:None if row1 is None else row1 + 1]
+        values = [row[col0:None if col1 is None else col1 + 1] for row in rows]
+        while values and not values[-1]:
+            values.pop()
+        result: Dict[str, Any] = {'range': a1}
+        if values:
+            result['values'] = values
+        return result
+
+    def _append_values(self, spreadsheet_id: str, a1: str, values: List[List[Any]]) -> Dict[str, Any]:
+        name = parse_range(a1)[0]
+        rows = self._sheet(spreadsheet_id, name)['rows']
+        while rows and not rows[-1]:
+            rows.pop()
+        rows.extend([list(v) for v in values])
+        return {'updates': {'updatedRows': len(values)}}
+
+    def _update_values(self, spreadsheet_id: str, a1: str, values: List[List[Any]]) -> Dict[str, Any]:
+        name, row0, col0, _, _ = parse_range(a1)
+        rows = self._sheet(spreadsheet_id, name)['rows']
+        for offset, new in enumerate(values):
+            while len(rows) <= row0 + offset:
+                rows.append([])
+            row = rows[row0 + offset]
+            row.extend([''] * (col0 + len(new) - len(row)))
+            row[col0:col0 + len(new)] = list(new)
+        return {'updatedRows': len(values)}
+
+    def _clear_values(self, spreadsheet_id: str, a1: str) -> Dict[str, Any]:
+        name, row0, col0, row1, col1 = parse_range(a1)
+        rows = self._sheet(spreadsheet_id, name)['rows']
+        for row in rows[row0:None if row1 is None else row1 + 1]:
+            end = len(row) if col1 is None else min(len(row), col1 + 1)
+            row[col0:end] = [''] * max(0, end - col0)
+        return {'clearedRange': a1}
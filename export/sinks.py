@@ -0,0 +1,278 @@
+"""
+Destinos de exportação e envio paralelo dos registros a todos eles.
+
+Cada destino (`Sink`) recebe a lista de registros em memória; `fan_out`
+escreve em todos os destinos ao mesmo tempo, com novas tentativas e prazo
+por destino, de modo que um destino lento ou com falha não atrasa nem
+derruba os demais.
+"""
+import asyncio
+import csv
+import datetime as dt
+import json
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import yaml
+
+from src.deadline import Deadline
+
+CONFIG_PATH = Path(__file__).parent.parent / 'src' / 'config' / 'sinks.yaml'
+
+
+@lru_cache()
+def load_config() -> Dict[str, Any]:
+    """Carrega a configuração dos destinos (sinks.yaml)."""
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _atomic_write(path: Path, write) -> None:
+    """Grava em um arquivo temporário e renomeia, para nunca deixar um arquivo pela metade."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with tmp.open('w', newline='', encoding='utf-8') as fh:
+        write(fh)
+    tmp.replace(path)
+
+
+class Sink(ABC):
+    """
+    Destino de exportação.
+
+    Subclasses implementam `write_sync`, que `write` executa em uma thread,
+    uma escrita por vez por destino. Destinos já assíncronos sobrescrevem
+    `write` e marcam `threaded = False`.
+    """
+
+    type = 'sink'
+    # Uma thread não pode ser cancelada: após um timeout ela continua escrevendo,
+    # então destinos em thread não têm nova tentativa depois de um timeout
+    threaded = True
+
+    def __init__(self, retries: int = 1, retry_delay: float = 1.0, timeout: Optional[float] = None):
+        """
+        Args:
+            retries: Novas tentativas após uma falha
+            retry_delay: Espera antes da primeira nova tentativa (dobra a cada uma)
+            timeout: Segundos por tentativa (None = sem limite)
+        """
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.type
+
+    async def write(self, records: List[Dict[str, Any]]) -> str:
+        """
+        Escreve os registros.
+
+        Returns:
+            str: Descrição do resultado (caminho, URL, linhas enviadas)
+        """
+        return await asyncio.to_thread(self._write_locked, records)
+
+    def _write_locked(self, records: List[Dict[str, Any]]) -> str:
+        with self._lock:
+            return self.write_sync(records)
+
+    @abstractmethod
+    def write_sync(self, records: List[Dict[str, Any]]) -> str:
+        """Escreve os registros de forma síncrona (ver `write`)."""
+
+
+class CsvSink(Sink):
+    """Arquivo CSV com uma linha por registro."""
+
+    type = 'csv'
+
+    def __init__(self, path: str, **options: Any):
+        super().__init__(**options)
+        self.path = Path(path)
+
+    @property
+    def name(self) -> str:
+        return f"csv:{self.path}"
+
+    def write_sync(self, records: List[Dict[str, Any]]) -> str:
+        fieldnames = list(dict.fromkeys(k for record in records for k in record))
+
+        def write(fh):
+            writer = csv.DictWriter(fh, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(records)
+
+        _atomic_write(self.path, write)
+        return str(self.path)
+
+
+class JsonlSink(Sink):
+    """Arquivo JSON Lines com um registro por linha."""
+
+    type = 'jsonl'
+
+    def __init__(self, path: str, **options: Any):
+        super().__init__(**options)
+        self.path = Path(path)
+
+    @property
+    def name(self) -> str:
+        return f"jsonl:{self.path}"
+
+    def write_sync(self, records: List[Dict[str, Any]]) -> str:
+        def write(fh):
+            for record in records:
+                fh.write(json.dumps(dict(record), ensure_ascii=False, default=str) + '\n')
+
+        _atomic_write(self.path, write)
+        return str(self.path)
+
+
+class SheetsSink(Sink):
+    """Aba mensal da planilha do Google Sheets (só linhas novas)."""
+
+    type = 'sheets'
+
+    def __init__(self, share_with_email: Optional[str] = None, **options: Any):
+        super().__init__(**options)
+        self.share_with_email = share_with_email
+
+    def write_sync(self, records: List[Dict[str, Any]]) -> str:
+        from export.google_sheets import upload_rows
+        return upload_rows(records, self.share_with_email)
+
+
+class IndexSink(Sink):
+    """Armazenamento local: JSON validado, cópia comprimida e índice SQLite."""
+
+    type = 'index'
+
+    def __init__(self, raw: bool = False, **options: Any):
+        super().__init__(**options)
+        self.raw = raw
+
+    def write_sync(self, records: List[Dict[str, Any]]) -> str:
+        from src.storage_utils import save
+        save(records, raw=self.raw)
+        return f"{len(records)} itens indexados"
+
+
+class WebhookSink(Sink):
+    """POST JSON com os registros para uma URL."""
+
+    type = 'webhook'
+    threaded = False
+
+    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None, **options: Any):
+        super().__init__(**options)
+        self.url = url
+        self.headers = headers or {}
+
+    @property
+    def name(self) -> str:
+        return f"webhook:{self.url}"
+
+    async def write(self, records: List[Dict[str, Any]]) -> str:
+        payload = json.dumps({'records': [dict(r) for r in records]}, ensure_ascii=False, default=str)
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.url, data=payload.encode('utf-8'),
+                                    headers={'Content-Type': 'application/json', **self.headers}) as rsp:
+                rsp.raise_for_status()
+                return f"{self.url} ({rsp.status})"
+
+    def write_sync(self, records: List[Dict[str, Any]]) -> str:
+        return asyncio.run(self.write(records))
+
+
+SINK_TYPES = {cls.type: cls for cls in (CsvSink, JsonlSink, SheetsSink, IndexSink, WebhookSink)}
+
+
+def build_sinks(stream: str, suffix: str = '', config: Optional[Dict[str, Any]] = None) -> List[Sink]:
+    """
+    Cria os destinos habilitados de um fluxo ("drafts" ou "articles").
+
+    Args:
+        stream: Nome do fluxo em sinks.yaml
+        suffix: Sufixo dos caminhos (perfil de audiência)
+        config: Configuração a usar no lugar de sinks.yaml
+
+    Returns:
+        List[Sink]: Destinos na ordem da configuração
+    """
+    config = load_config() if config is None else config
+    sinks = []
+    for entry in (config.get('sinks') or {}).get(stream) or []:
+        options = dict(entry)
+        if not options.pop('enabled', True):
+            continue
+        kind = options.pop('type')
+        if kind not in SINK_TYPES:
+            raise ValueError(f"Tipo de destino desconhecido: {kind}")
+        if 'path' in options:
+            options['path'] = options['path'].format(date=dt.date.today(), suffix=suffix)
+        sinks.append(SINK_TYPES[kind](**options))
+    return sinks
+
+
+async def _write_with_retries(sink: Sink, records: List[Dict[str, Any]], deadline: Deadline) -> str:
+    delay = sink.retry_delay
+    for attempt in range(sink.retries + 1):
+        timeout = min(sink.timeout or float('inf'), deadline.remaining())
+        try:
+            return await asyncio.wait_for(sink.write(records),
+                                          None if timeout == float('inf') else timeout)
+        except Exception as e:
+            if attempt == sink.retries or deadline.remaining() <= delay:
+                raise
+            if sink.threaded and isinstance(e, asyncio.TimeoutError):
+                # A tentativa ainda roda na thread; outra ao mesmo tempo duplicaria linhas
+                raise
+            print(f"⚠️ Falha ao exportar para {sink.name} ({e!r}), nova tentativa em {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+async def fan_out(records: List[Dict[str, Any]], sinks: List[Sink],
+                  deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Escreve os registros em todos os destinos em paralelo.
+
+    Cada destino tem suas próprias tentativas e prazo; erros ficam isolados
+    no resultado do destino que falhou.
+
+    Args:
+        records: Registros em memória
+        sinks: Destinos
+        deadline: Prazo da execução (tentativas param quando ele acaba)
+
+    Returns:
+        Dict: Nome do destino -> resultado de `write` ou a exceção da última tentativa
+    """
+    deadline = deadline or Deadline()
+    records = [dict(record) for record in records]
+    results = await asyncio.gather(*(_write_with_retries(sink, records, deadline) for sink in sinks),
+                                   return_exceptions=True)
+    outcome = {}
+    for sink, result in zip(sinks, results):
+        outcome[sink.name] = result
+        if isinstance(result, BaseException):
+            print(f"❌ Exportação para {sink.name} falhou: {result!r}")
+        else:
+            print(f"✓ Exportado para {sink.name}: {result}")
+    return outcome
+
+
+async def export_records(stream: str, records: List[Dict[str, Any]], suffix: str = '',
+                         deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Envia os registros aos destinos configurados do fluxo (ver `fan_out`)."""
+    sinks = build_sinks(stream, suffix)
+    if not records or not sinks:
+        return {}
+    return await fan_out(records, sinks, deadline)
@@ -1,33 +1,90 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import asyncio
 from src.collectors.rss_collector import fetch_all as fetch_rss
 from src.collectors.html_collector import fetch_all as fetch_html
 from src.processor.summarise import process_item as summarise_item
 from src.processor.classify import process_item as classify_item
 from src.processor.deduplicate import process_items as deduplicate_items
-from src.processor.relevance import process_item as calculate_relevance
-from src.storage_utils import save
+from src.processor.deduplicate import remove_near_duplicates, load_config as load_dedup_config
+from src.processor.relevance import process_items as calculate_relevance, load_profiles
+from src.processor.select import select_top_k
+from src.processor.cluster import StoryClusterer, load_config as load_cluster_config
+from src.processor.entities import process_items as extract_entities
+from src.processor.trends import open_tracker
+from src.storage_utils import save_run
+from src.storage.seen import SeenStore
+from src.storage.ledger import DraftLedger
+from src.deadline import Deadline
+from src.checkpoint import RunCheckpoint
+from src.article import Article
+from src.storage.keys import item_key
 from datetime import datetime
 
-async def run_agent(sources: List[str] = None, limit: int = 30) -> List[Dict[str, Any]]:
+# Share of the remaining run budget given to collection and to processing
+COLLECT_SHARE = 0.4
+PROCESS_SHARE = 0.7
+# Below this many seconds of processing budget, summaries are made locally
+LLM_CUTOFF_SECONDS = 30.0
+
+def open_seen_store() -> Optional[SeenStore]:
+    """Open the persistent seen-item store, if enabled in dedup.yaml."""
+    config = dict(load_dedup_config().get('seen_store') or {})
+    if not config.pop('enabled', True):
+        return None
+    return SeenStore(**config)
+
+def open_draft_ledger() -> Optional[DraftLedger]:
+    """Open the persistent draft ledger, if enabled in dedup.yaml."""
+    config = dict(load_dedup_config().get('draft_ledger') or {})
+    if not config.pop('enabled', True):
+        return None
+    return DraftLedger(**config)
+
+def open_story_clusterer() -> Optional[StoryClusterer]:
+    """Open the persistent story clusterer, if enabled in cluster.yaml."""
+    config = dict(load_cluster_config().get('stories') or {})
+    if not config.pop('enabled', True):
+        return None
+    return StoryClusterer(**config)
+
+def assign_stories(items: List[Dict[str, Any]]) -> None:
+    """Group the items into stories across sources and runs, setting 'story_id'."""
+    clusterer = open_story_clusterer()
+    if clusterer is None:
+        return
+    stats = clusterer.assign_items(items)
+    clusterer.close()
+    print(f"🧩 {len(items)} itens agrupados em {stats['stories']} histórias ({stats['new']} novas)")
+
+def update_trends(items: List[Dict[str, Any]]) -> None:
+    """Feed the collected items to the persistent trend tracker and report bursts."""
+    tracker = open_tracker()
+    if tracker is None:
+        return
+    tracker.observe(items)
+    tracker.save()
+    bursts = tracker.bursts(limit=5)
+    if bursts:
+        print("📈 Em alta: " + ", ".join(f"{b['term']} ({b['ratio']:.1f}x)" for b in bursts))
+
+async def collect_candidates(sources: List[str], seen: Optional[SeenStore],
+                             deadline: Deadline) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Run the agent to collect and process news articles.
+    Collect and deduplicate the items of a run.
     
-    Args:
-        sources (List[str], optional): List of news sources to collect from. Defaults to None.
-        limit (int, optional): Maximum number of items to process. Defaults to 30.
     Returns:
-        List[Dict[str, Any]]: Lista de artigos processados (pode ser vazia)
+        Tuple: (unique items in arrival order, every collected item including duplicates)
     """
     print(f"\n🔍 Coletando notícias das fontes: {sources}")
     
-    # Collect news from RSS feeds
-    rss_items = await fetch_rss(sources)
+    # Collect news from RSS feeds and HTML sources within the collection budget
+    collect_deadline = deadline.sub(COLLECT_SHARE)
+    rss_items, html_items = await asyncio.gather(
+        fetch_rss(sources, seen=seen, deadline=collect_deadline),
+        fetch_html(sources, seen=seen, deadline=collect_deadline),
+    )
     print(f"\nFeeds configurados: {len(rss_items)}")
     
-    # Collect news from HTML sources
-    html_items = await fetch_html(sources)
-    
     # Combine items
     all_items = rss_items + html_items
     print(f"\n📊 Encontrados {len(all_items)} artigos no total:")
@@ -35,34 +92,168 @@ async def run_agent(sources: List[str] = None, limit: int = 30) -> List[Dict[str
     print(f"   - {len(html_items)} artigos via HTML")
     
     # Remove duplicates
-    unique_items = deduplicate_items(all_items)
+    unique_items = deduplicate_items(all_items, seen=seen)
     print(f"\n🔄 {len(unique_items)} itens únicos após remoção de duplicatas")
     
-    # Process items
+    # Remove near-duplicates syndicated across sources
+    before = len(unique_items)
+    unique_items = remove_near_duplicates(unique_items)
+    print(f"🔄 {before - len(unique_items)} quase-duplicatas removidas entre fontes")
+    return unique_items, all_items
+
+def select_items(items: List[Dict[str, Any]], limit: int,
+                 per_source: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Score all items at once and keep the best candidates for the expensive stages.
+    
+    Returns:
+        List[Dict[str, Any]]: Selected items, in descending relevance
+    """
+    for item, relevance in zip(items, calculate_relevance(items)):
+        item['relevance'] = relevance
+    
+    if len(items) > limit:
+        print(f"\n⚠️ Selecionando os {limit} itens mais relevantes dos {len(items)} encontrados")
+    return select_top_k(items, limit, per_source=per_source)
+
+def select_for_profiles(items: List[Dict[str, Any]], profiles: List[str], limit: int,
+                        per_source: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Score the items for every audience profile and keep the union of each profile's top-k.
+    
+    Each selected item gets a 'profile_scores' mapping (profile -> relevance) and
+    its 'relevance' is the best of those scores, so shared stages such as
+    summarisation handle every item once.
+    
+    Returns:
+        List[Dict[str, Any]]: Selected items, in descending relevance
+    """
+    definitions = load_profiles()
+    selected: Dict[int, Dict[str, Any]] = {}
+    for name in profiles:
+        profile = definitions.get(name, {})
+        scores = calculate_relevance(items, profile=name)
+        min_relevance = profile.get('min_relevance', 0.0)
+        candidates = [
+            {'index': i, 'source': item.get('source', ''), 'relevance': score}
+            for i, (item, score) in enumerate(zip(items, scores)) if score >= min_relevance
+        ]
+        top = select_top_k(candidates, profile.get('limit', limit), per_source=per_source)
+        print(f"🎯 Perfil {name}: {len(top)} itens selecionados de {len(candidates)} elegíveis")
+        for candidate in top:
+            item = items[candidate['index']]
+            item.setdefault('profile_scores', {})[name] = candidate['relevance']
+            selected[candidate['index']] = item
+    
+    for item in selected.values():
+        item['relevance'] = max(item['profile_scores'].values())
+    return sorted(selected.values(), key=lambda x: x['relevance'], reverse=True)
+
+async def process_items(items: List[Dict[str, Any]], deadline: Deadline,
+                        checkpoint: RunCheckpoint) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Summarise and classify the selected items.
+    
+    Results already recorded in the checkpoint are reused; new results are
+    recorded as soon as each item is done.
+    
+    Returns:
+        Tuple: (processed items with relevance > 0, all items handled before the deadline)
+    """
     print("\n⚙️ Processando itens...")
     
-    # Limit items if necessary
-    if len(unique_items) > limit:
-        print(f"\n⚠️ Limitando para {limit} itens dos {len(unique_items)} encontrados")
-        unique_items = unique_items[:limit]
+    done = checkpoint.load_items()
+    if done:
+        print(f"♻️ {len(done)} itens já processados recuperados do checkpoint")
     
+    # Items arrive in descending relevance, so the best ones are handled first
+    process_deadline = deadline.sub(PROCESS_SHARE)
     processed_items = []
-    for item in unique_items:
-        # Calculate relevance
-        relevance = calculate_relevance(item)
-        item['relevance'] = relevance
+    handled_items = []
+    for item in items:
+        key = item_key(item)
+        if key in done:
+            item.update(done[key])
+            handled_items.append(item)
+            if item['relevance'] > 0:
+                processed_items.append(item)
+            continue
+        
+        if process_deadline.expired:
+            print(f"\n⏱️ Prazo atingido: {len(items) - len(handled_items)} itens não processados")
+            break
+        handled_items.append(item)
+        relevance = item['relevance']
         
         # Only process items with relevance > 0
         if relevance > 0:
-            # Add summary
-            summary = await summarise_item(item)
+            # Add summary, falling back to the local extractor when time runs low
+            use_llm = process_deadline.remaining() > LLM_CUTOFF_SECONDS
+            try:
+                summary = await process_deadline.run(summarise_item(item, use_llm=use_llm))
+            except asyncio.TimeoutError:
+                summary = await summarise_item(item, use_llm=False)
             item['summary'] = summary
             
             # Add categories
-            categories = await classify_item(item)
+            try:
+                categories = await process_deadline.run(classify_item(item))
+            except asyncio.TimeoutError:
+                categories = {}
             item['categories'] = categories
             
             processed_items.append(item)
+            checkpoint.record_item(key, {'summary': summary, 'categories': categories})
+        else:
+            checkpoint.record_item(key, {})
+    
+    return processed_items, handled_items
+
+async def _run_pipeline(select: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                        sources: Optional[List[str]], delta: bool,
+                        deadline: Optional[Deadline], resume: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Collect, select, process and save the items of a run.
+    
+    Args:
+        select: Stage that scores the collected candidates and returns the selected items
+        sources, delta, deadline, resume: See run_agent
+    Returns:
+        List[Dict[str, Any]]: Processed items, in descending relevance
+    """
+    if resume and not RunCheckpoint.exists(resume):
+        raise ValueError(f"Nenhum checkpoint encontrado para a execução '{resume}'")
+    RunCheckpoint.prune(keep=resume)
+    checkpoint = RunCheckpoint(resume)
+    print(f"\n🆔 Execução {checkpoint.run_id} (retome com --resume {checkpoint.run_id})")
+    
+    deadline = deadline or Deadline()
+    seen_store = open_seen_store()
+    seen = seen_store if delta else None
+    
+    unique_items = checkpoint.load_stage('selected')
+    if unique_items is not None:
+        unique_items = [Article(item) for item in unique_items]
+        print(f"♻️ {len(unique_items)} itens coletados recuperados do checkpoint")
+    else:
+        candidates, collected = await collect_candidates(sources, seen, deadline)
+        # Entities and trends cover everything collected, not just the selection
+        extract_entities(candidates)
+        update_trends(candidates)
+        unique_items = select(candidates)
+        # Clustered before the checkpoint so a resumed run does not count items twice
+        assign_stories(unique_items)
+        # Duplicates and items left out by scoring are done with: the next run skips them
+        selected_ids = {id(item) for item in unique_items}
+        dropped = {key for item in collected if id(item) not in selected_ids
+                   for key in SeenStore.keys_for(item)}
+        checkpoint.save_stage('dropped', sorted(dropped))
+        checkpoint.save_stage('selected', [dict(item) for item in unique_items])
+    dropped_keys = set(checkpoint.load_stage('dropped') or [])
+    
+    # Keys as collected: processing replaces the summary, which changes the content hash
+    seen_keys = {id(item): SeenStore.keys_for(item) for item in unique_items}
+    processed_items, handled_items = await process_items(unique_items, deadline, checkpoint)
     
     # Sort by relevance
     processed_items.sort(key=lambda x: x.get('relevance', 0), reverse=True)
@@ -73,11 +264,78 @@ async def run_agent(sources: List[str] = None, limit: int = 30) -> List[Dict[str
         print(f"📝 Sumário: {item['summary']}")
         print(f"🔍 Fonte: {item['source']}\n")
     
-    # Save data
-    save(unique_items, raw=True)  # Salva dados brutos
-    save(processed_items)  # Salva dados processados
+    # Save data (a resumed run that already saved does not save twice)
+    if checkpoint.load_stage('saved') is None:
+        # Brutos e processados em uma passada (cada item serializado uma vez)
+        save_run(unique_items, processed_items)
+        checkpoint.save_stage('saved', {'processed': len(processed_items)})
+    
+    # Remember everything this run is done with so the next run only sees new items;
+    # selected items cut by the deadline stay unseen and are collected again
+    if seen_store is not None:
+        handled_ids = {id(item) for item in handled_items}
+        pending = {key for item in unique_items if id(item) not in handled_ids
+                   for key in seen_keys[id(item)]}
+        handled = {key for item in handled_items for key in seen_keys[id(item)]}
+        seen_store.add_keys(sorted((handled | dropped_keys) - pending))
+        seen_store.close()
+    
+    # Nothing left to resume: the run's checkpoints would only pile up
+    checkpoint.remove()
 
     return processed_items
 
+async def run_agent(sources: List[str] = None, limit: int = 30, delta: bool = True,
+                    per_source: Optional[int] = None,
+                    deadline: Optional[Deadline] = None,
+                    resume: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run the agent to collect and process news articles.
+    
+    Args:
+        sources (List[str], optional): List of news sources to collect from. Defaults to None.
+        limit (int, optional): Maximum number of items to process. Defaults to 30.
+        delta (bool, optional): Skip items already ingested by earlier runs. Defaults to True.
+        per_source (int, optional): Maximum number of selected items per source. Defaults to None.
+        deadline (Deadline, optional): Run-wide time budget. Pending fetches are cancelled
+            when the collection share runs out, summaries switch to the local extractor
+            when processing time runs low, and whatever was processed is still saved.
+        resume (str, optional): ID of an interrupted run to resume from its checkpoints.
+            Completed stages and already processed items are not redone.
+    Returns:
+        List[Dict[str, Any]]: Lista de artigos processados (pode ser vazia)
+    """
+    return await _run_pipeline(lambda items: select_items(items, limit, per_source),
+                               sources, delta, deadline, resume)
+
+async def run_profiles(profiles: List[str], sources: List[str] = None, limit: int = 30,
+                       delta: bool = True, per_source: Optional[int] = None,
+                       deadline: Optional[Deadline] = None,
+                       resume: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Run one collection and deduplication pass and score it for several audience profiles.
+    
+    Items selected by more than one profile are summarised and classified only once.
+    
+    Args:
+        profiles (List[str]): Profile names from profiles.yaml
+        limit (int, optional): Items per profile when the profile sets no 'limit'. Defaults to 30.
+        sources, delta, per_source, deadline, resume: See run_agent
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Processed items per profile, each carrying that
+            profile's relevance, in descending relevance
+    """
+    processed_items = await _run_pipeline(
+        lambda items: select_for_profiles(items, profiles, limit, per_source),
+        sources, delta, deadline, resume)
+    
+    results = {}
+    for name in profiles:
+        results[name] = sorted(
+            (dict(item, relevance=item['profile_scores'][name])
+             for item in processed_items if name in item.get('profile_scores', {})),
+            key=lambda x: x['relevance'], reverse=True)
+    return results
+
 if __name__ == "__main__":
     asyncio.run(run_agent()) 
\ No newline at end of file
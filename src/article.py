@@ -0,0 +1,204 @@
+"""
+Registro compacto de notícia usado ao longo do pipeline.
+"""
+import tempfile
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Textos acima deste tamanho (em caracteres) vão para o ContentStore
+SPILL_THRESHOLD = 2048
+
+# Campos com slot próprio; campos desconhecidos ficam em um dicionário extra
+FIELDS = ('title', 'link', 'url', 'source', 'published', 'date', 'author', 'relevance',
+          'summary', 'content', 'description', 'categories', 'story_id', 'entities',
+          'profile_scores')
+
+# Campos de texto longo que podem ser enviados para o disco
+TEXT_FIELDS = frozenset(('content', 'summary', 'description'))
+
+# Campos dos quais as formas normalizadas do texto dependem
+NORMALIZED_FIELDS = TEXT_FIELDS | {'title'}
+
+_MISSING = object()
+
+
+class ContentStore:
+    """
+    Arquivo temporário só de acréscimo para textos longos.
+
+    Cada texto é gravado uma única vez e referenciado por (posição, tamanho);
+    o arquivo é apagado ao fechar o store ou ao fim do processo.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Diretório do arquivo temporário (padrão do sistema se None)
+        """
+        self._file = tempfile.TemporaryFile(dir=directory, buffering=0)
+        self._size = 0
+
+    def put(self, text: str) -> Tuple[int, int]:
+        """
+        Grava um texto.
+
+        Returns:
+            Tuple: Referência (posição, tamanho em bytes) para `get`
+        """
+        data = text.encode('utf-8')
+        self._file.seek(self._size)
+        self._file.write(data)
+        ref = (self._size, len(data))
+        self._size += len(data)
+        return ref
+
+    def get(self, ref: Tuple[int, int]) -> str:
+        """Lê o texto de uma referência devolvida por `put`."""
+        offset, length = ref
+        self._file.seek(offset)
+        return self._file.read(length).decode('utf-8')
+
+    def __len__(self) -> int:
+        """Bytes gravados."""
+        return self._size
+
+    def close(self) -> None:
+        self._file.close()
+
+
+_default_store: Optional[ContentStore] = None
+
+
+def get_content_store() -> ContentStore:
+    """Retorna o ContentStore compartilhado pelo processo, criado no primeiro uso."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ContentStore()
+    return _default_store
+
+
+class _Spilled:
+    """Referência a um texto gravado no ContentStore."""
+
+    __slots__ = ('store', 'ref')
+
+    def __init__(self, store: ContentStore, ref: Tuple[int, int]):
+        self.store = store
+        self.ref = ref
+
+
+class Article(MutableMapping):
+    """
+    Notícia com slots fixos e corpo longo mantido em disco.
+
+    Implementa a interface de dicionário (`item['title']`, `item.get`,
+    `item.update`, `dict(item)`), então os estágios que recebem dicionários
+    funcionam sem mudança. Textos de `content`, `summary` e `description`
+    maiores que `spill_threshold` são gravados no ContentStore e lidos de
+    novo só quando acessados, de modo que a memória por item não cresce com
+    o tamanho do texto. Use `dict(article)` nas fronteiras que serializam
+    (JSON, CSV, APIs).
+
+    Example:
+        >>> article = Article(title="Copom mantém Selic", content=long_text, source="Exame")
+        >>> article['content'] == long_text  # lido do disco
+        True
+    """
+
+    __slots__ = tuple(f'_{name}' for name in FIELDS) + ('_extra', '_store', '_threshold', 'text_forms')
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, *,
+                 store: Optional[ContentStore] = None,
+                 spill_threshold: int = SPILL_THRESHOLD, **fields: Any):
+        """
+        Args:
+            data: Campos iniciais (dicionário ou outro mapeamento)
+            store: ContentStore dos textos longos (padrão: o compartilhado)
+            spill_threshold: Tamanho a partir do qual um texto vai para o disco
+            **fields: Campos adicionais
+        """
+        for name in FIELDS:
+            setattr(self, f'_{name}', _MISSING)
+        self._extra: Optional[Dict[str, Any]] = None
+        self._store = store
+        self._threshold = spill_threshold
+        # Formas normalizadas do texto (src/processor/normalize.py), fora do mapeamento
+        self.text_forms = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOT_NAMES:
+            value = getattr(self, _SLOT_NAMES[key])
+            if value is _MISSING:
+                raise KeyError(key)
+            if isinstance(value, _Spilled):
+                return value.store.get(value.ref)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _SLOT_NAMES:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        if key in NORMALIZED_FIELDS:
+            self.text_forms = None
+        if key in TEXT_FIELDS and isinstance(value, str) and len(value) > self._threshold:
+            store = self._store if self._store is not None else get_content_store()
+            value = _Spilled(store, store.put(value))
+        setattr(self, _SLOT_NAMES[key], value)
+
+    def __delitem__(self, key: str) -> None:
+        if key in _SLOT_NAMES:
+            if getattr(self, _SLOT_NAMES[key]) is _MISSING:
+                raise KeyError(key)
+            if key in NORMALIZED_FIELDS:
+                self.text_forms = None
+            setattr(self, _SLOT_NAMES[key], _MISSING)
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in _SLOT_NAMES:
+            return getattr(self, _SLOT_NAMES[key]) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for name in FIELDS:
+            if getattr(self, f'_{name}') is not _MISSING:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def is_spilled(self, key: str) -> bool:
+        """True se o campo está gravado no ContentStore."""
+        return key in _SLOT_NAMES and isinstance(getattr(self, _SLOT_NAMES[key]), _Spilled)
+
+    def copy(self) -> "Article":
+        """Cópia rasa; textos em disco são compartilhados, não relidos."""
+        clone = Article(store=self._store, spill_threshold=self._threshold)
+        for name in FIELDS:
+            setattr(clone, f'_{name}', getattr(self, f'_{name}'))
+        clone._extra = dict(self._extra) if self._extra else None
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dicionário simples com todos os campos (textos lidos do disco)."""
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.get('title')!r}, source={self.get('source')!r})"
+
+
+_SLOT_NAMES = {name: f'_{name}' for name in FIELDS}
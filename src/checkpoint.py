@@ -0,0 +1,141 @@
+"""
+Módulo para checkpoints de execução, permitindo retomar uma execução interrompida.
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RUNS_DIR = Path(__file__).parent.parent / "data" / "runs"
+# Execuções interrompidas e nunca retomadas são apagadas depois deste prazo
+RUN_MAX_AGE_DAYS = 7
+
+
+class RunCheckpoint:
+    """
+    Checkpoints incrementais de uma execução do agente.
+
+    Cada etapa concluída (ex.: itens coletados e selecionados) é gravada
+    atomicamente em `<run_id>/<etapa>.json`, e o resultado de cada item
+    processado (resumo, categorias) é acrescentado a `<run_id>/items.jsonl`
+    assim que fica pronto. Ao retomar, o trabalho já feito é reaproveitado.
+    Uma execução concluída apaga seus checkpoints com `remove`.
+
+    Example:
+        >>> checkpoint = RunCheckpoint()
+        >>> checkpoint.save_stage("selected", items)  # doctest: +SKIP
+        >>> RunCheckpoint(checkpoint.run_id).load_stage("selected")  # doctest: +SKIP
+    """
+
+    def __init__(self, run_id: Optional[str] = None, base_dir: Optional[Path] = None):
+        """
+        Args:
+            run_id: Identificador da execução (padrão: timestamp atual)
+            base_dir: Diretório onde os checkpoints são gravados (padrão: data/runs)
+        """
+        self.run_id = run_id or datetime.now().strftime('%Y-%m-%dT%H-%M-%S')
+        self.path = Path(base_dir or RUNS_DIR) / self.run_id
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def exists(cls, run_id: str, base_dir: Optional[Path] = None) -> bool:
+        """Verifica se há checkpoints para a execução."""
+        return (Path(base_dir or RUNS_DIR) / run_id).is_dir()
+
+    @classmethod
+    def prune(cls, max_age_days: float = RUN_MAX_AGE_DAYS, base_dir: Optional[Path] = None,
+              keep: Optional[str] = None) -> int:
+        """
+        Apaga checkpoints de execuções sem alteração há mais de `max_age_days`.
+
+        Args:
+            max_age_days: Idade máxima, em dias
+            base_dir: Diretório dos checkpoints (padrão: data/runs)
+            keep: Execução que nunca é apagada (ex.: a que está sendo retomada)
+
+        Returns:
+            int: Número de execuções apagadas
+        """
+        base = Path(base_dir or RUNS_DIR)
+        if not base.is_dir():
+            return 0
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for path in base.iterdir():
+            if path.is_dir() and path.name != keep and path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def remove(self) -> None:
+        """Apaga os checkpoints da execução (depois que ela termina)."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def save_stage(self, name: str, data: Any) -> None:
+        """
+        Grava o resultado de uma etapa (escrita atômica: arquivo temporário + rename).
+
+        Args:
+            name: Nome da etapa
+            data: Dados serializáveis em JSON
+        """
+        target = self.path / f"{name}.json"
+        tmp = target.with_suffix('.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+
+    def load_stage(self, name: str) -> Optional[Any]:
+        """
+        Lê o resultado de uma etapa.
+
+        Returns:
+            Dados gravados, ou None se a etapa não foi concluída
+        """
+        target = self.path / f"{name}.json"
+        if not target.exists():
+            return None
+        with open(target, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def record_item(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Registra o resultado do processamento de um item.
+
+        Args:
+            key: Chave estável do item
+            result: Campos produzidos para o item (ex.: summary, categories)
+        """
+        with open(self.path / "items.jsonl", 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"key": key, **result}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_items(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Lê os resultados já registrados, por chave do item.
+
+        Uma última linha incompleta (execução interrompida durante a escrita)
+        é ignorada.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        path = self.path / "items.jsonl"
+        if not path.exists():
+            return results
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                results[record.pop("key")] = record
+        return results
+
+    def completed_stages(self) -> List[str]:
+        """Lista as etapas concluídas."""
+        return sorted(p.stem for p in self.path.glob("*.json"))
@@ -1,10 +1,9 @@
 import typer
 import asyncio
-import csv
-from pathlib import Path
-import datetime as dt
-from src.agent import run_agent
-from export.google_sheets import upload_csv
+from src.agent import run_agent, run_profiles, open_draft_ledger
+from src.processor.relevance import load_profiles
+from src.deadline import Deadline
+from export.sinks import export_records
 
 app = typer.Typer()
 
@@ -13,45 +12,134 @@ def run(
     sources: str = typer.Option("all", "--sources", "-s", help="Lista separada por vírgula de fontes (ex: valorinv,exame) ou tipos de fonte (html,rss)"),
     limit: int = typer.Option(30, "--limit", "-l", help="Número máximo de itens por fonte"),
     draft: bool = typer.Option(False, "--draft", help="Gera drafts de posts para Instagram"),
+    full: bool = typer.Option(False, "--full", help="Reprocessa também itens já coletados em execuções anteriores"),
+    per_source: int = typer.Option(None, "--per-source", help="Máximo de itens selecionados por fonte"),
+    deadline: str = typer.Option(None, "--deadline", help="Prazo da execução: duração (ex: 45m, 1h30m) ou horário (ex: 08:30)"),
+    resume: str = typer.Option(None, "--resume", help="Retoma uma execução interrompida a partir dos checkpoints (ID da execução)"),
+    profiles: str = typer.Option(None, "--profiles", "-p", help="Perfis de audiência separados por vírgula (ex: equities,crypto) ou 'all'"),
 ):
+    try:
+        run_deadline = Deadline.parse(deadline)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--deadline")
+
     # Se sources contém apenas 'html' e/ou 'rss', usar ['all'] para coletar todas as fontes daquele tipo
     source_list = sources.lower().split(",")
     if all(s in ['html', 'rss'] for s in source_list):
         source_list = ['all']
     
-    articles = asyncio.run(run_agent(source_list, limit))
+    # Perfis de audiência: uma coleta, pontuação e drafts por perfil
+    profile_list = None
+    if profiles:
+        available = list(load_profiles())
+        profile_list = available if profiles.lower() == "all" else [p.strip() for p in profiles.split(",")]
+        unknown = [p for p in profile_list if p not in available]
+        if unknown:
+            raise typer.BadParameter(f"Perfis desconhecidos: {', '.join(unknown)} "
+                                     f"(disponíveis: {', '.join(available)})", param_hint="--profiles")
+
+    if profile_list:
+        articles = asyncio.run(run_profiles(profile_list, source_list, limit, delta=not full,
+                                            per_source=per_source, deadline=run_deadline,
+                                            resume=resume))
+    else:
+        articles = asyncio.run(run_agent(source_list, limit, delta=not full, per_source=per_source,
+                                         deadline=run_deadline, resume=resume))
+
+    # Destinos extras dos artigos processados (sinks.yaml, fluxo "articles")
+    if profile_list:
+        for name, profile_articles in articles.items():
+            _run_async(export_records("articles", profile_articles, suffix=f"_{name}"))
+    else:
+        _run_async(export_records("articles", articles))
+
+    if not draft:
+        return
+    if profile_list:
+        definitions = load_profiles()
+        for name, profile_articles in articles.items():
+            draft_config = definitions[name].get("draft") or {}
+            print(f"\n✍️ Drafts do perfil {name}")
+            write_drafts(profile_articles, run_deadline, top_n=draft_config.get("top_n", 5),
+                         audience=draft_config.get("audience"), suffix=f"_{name}")
+    else:
+        write_drafts(articles, run_deadline)
+
+def _run_async(coro):
+    """Executa uma corrotina no loop do processo (recriado se já tiver sido fechado)."""
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            raise RuntimeError
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+def write_drafts(articles: list, run_deadline: Deadline, top_n: int = 5,
+                 audience: str = None, suffix: str = "") -> None:
+    """Gera drafts para os artigos mais relevantes e os envia aos destinos de sinks.yaml (CSV, Sheets...)."""
+    if not articles:
+        print("Nenhum artigo relevante encontrado para gerar drafts.")
+        return
+    from src.create_post import draft_posts
+    ranked = sorted(articles, key=lambda x: x.get("relevance", 0), reverse=True)
+    # Histórias com draft recente (em execuções anteriores) não ocupam vagas
+    ledger = open_draft_ledger()
+    scope = suffix.lstrip("_")
+    try:
+        top = ledger.select(ranked, top_n, scope=scope) if ledger is not None else ranked[:top_n]
+        if not top:
+            print("Nenhuma história nova para gerar drafts.")
+            return
+        # Concorrência limitada; drafts que não ficarem prontos até o prazo são descartados
+        posts = _run_async(draft_posts(top, audience=audience, deadline=run_deadline))
+        if not posts:
+            print("Nenhum draft gerado dentro do prazo.")
+            return
 
-    if draft:
-        if not articles:
-            print("Nenhum artigo relevante encontrado para gerar drafts.")
+        # Todos os destinos recebem os drafts em memória, em paralelo; o prazo da
+        # execução não vale aqui para não perder drafts já pagos
+        results = _run_async(export_records("drafts", posts, suffix=suffix))
+        if ledger is None:
+            return
+        # Só conta como coberta a história cujo draft chegou a algum destino
+        # (sem destinos configurados, os drafts gerados já contam como entregues)
+        if results and all(isinstance(result, BaseException) for result in results.values()):
+            print("⚠️ Nenhum destino recebeu os drafts; as histórias ficam liberadas para a próxima execução")
             return
-        from src.create_post import draft_post
-        top5 = sorted(articles, key=lambda x: x.get("relevance", 0), reverse=True)[:5]
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                raise RuntimeError
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        posts = loop.run_until_complete(asyncio.gather(*[draft_post(a) for a in top5]))
-
-        out = Path("output")
-        out.mkdir(exist_ok=True)
-        fname = out / f"posts_{dt.date.today()}.csv"
-        with fname.open("w", newline="", encoding="utf-8") as fh:
-            writer = csv.DictWriter(fh, fieldnames=posts[0].keys())
-            writer.writeheader()
-            writer.writerows(posts)
-
-        print(f"Drafts salvos em {fname}")
-        
-        # Upload para o Google Sheets
-        try:
-            sheet_url = upload_csv(fname)
-            print(f"\nDrafts enviados para o Google Sheets: {sheet_url}")
-        except Exception as e:
-            print(f"\nErro ao enviar para o Google Sheets: {e}")
+        drafted = {post["link"] for post in posts}
+        ledger.record([a for a in top if (a.get("link") or a.get("url", "")) in drafted], scope=scope)
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+@app.command()
+def trends(
+    limit: int = typer.Option(20, "--limit", "-l", help="Número máximo de termos exibidos"),
+    tickers: bool = typer.Option(False, "--tickers", help="Mostra apenas tickers"),
+    top: bool = typer.Option(False, "--top", help="Mostra os termos mais frequentes em vez dos picos"),
+):
+    """Mostra os termos e tickers em alta nas notícias coletadas."""
+    from src.processor.trends import open_tracker
+
+    tracker = open_tracker()
+    if tracker is None or tracker.updated is None:
+        print("Nenhum dado de tendências ainda. Execute uma coleta com 'run'.")
+        return
+    tracker.advance()
+    if top:
+        rows = [r for r in tracker.top(limit * 5) if not tickers or r["term"].startswith("$")][:limit]
+        for row in rows:
+            print(f"{row['count']:8.1f}  {row['term']}")
+        return
+
+    bursts = tracker.bursts(limit=limit, pattern=r"^\$" if tickers else None)
+    if not bursts:
+        print("Nenhum pico detectado.")
+        return
+    for burst in bursts:
+        print(f"{burst['ratio']:6.1f}x  {burst['count']:7.1f} (esperado {burst['expected']:.1f})  {burst['term']}")
 
 if __name__ == "__main__":
     app() 
\ No newline at end of file
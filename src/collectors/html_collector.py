@@ -8,6 +8,8 @@ import asyncio
 from bs4 import BeautifulSoup
 from dateutil import parser
 import re
+from src.deadline import Deadline
+from src.article import Article
 
 # Configurar logging para mostrar mais informações
 logging.basicConfig(level=logging.DEBUG)
@@ -80,21 +82,28 @@ async def fetch_article(session: aiohttp.ClientSession, url: str, source_config:
             logger.warning(f"Missing title or content for {url}")
             return None
             
-        return {
-            "title": title,
-            "content": content,
-            "date": clean_date(date_str),
-            "url": url,
-            "source": source_config["name"],
-            "author": author
-        }
+        return Article(
+            title=title,
+            content=content,
+            date=clean_date(date_str),
+            url=url,
+            source=source_config["name"],
+            author=author
+        )
         
     except Exception as e:
         logger.error(f"Error fetching article {url}: {str(e)}")
         return None
 
-async def fetch_source_articles(session: aiohttp.ClientSession, source_config: Dict, limit: int = 10) -> List[Dict]:
-    """Fetch articles from a single source."""
+async def fetch_source_articles(session: aiohttp.ClientSession, source_config: Dict, limit: int = 10,
+                                seen=None, deadline: Optional[Deadline] = None) -> List[Dict]:
+    """
+    Fetch articles from a single source, skipping URLs already in the seen store.
+
+    Article fetches still running when the deadline is reached are cancelled
+    and the articles fetched so far are returned.
+    """
+    deadline = deadline or Deadline()
     try:
         logger.info(f"Tentando buscar artigos de: {source_config['name']}")
         logger.info(f"URL da landing page: {source_config['landing_url']}")
@@ -120,12 +129,15 @@ async def fetch_source_articles(session: aiohttp.ClientSession, source_config: D
                 # Handle relative URLs
                 if not href.startswith(("http://", "https://")):
                     href = urljoin(source_config["base_url"], href)
+                if seen is not None and seen.seen_url(href):
+                    logger.debug(f"Artigo já coletado anteriormente: {href}")
+                    continue
                 article_urls.append(href)
                 logger.info(f"URL do artigo encontrada: {href}")
                 
         # Fetch articles concurrently
         tasks = [fetch_article(session, url, source_config) for url in article_urls]
-        articles = await asyncio.gather(*tasks)
+        articles = await deadline.gather(tasks, margin=1.0)
         valid_articles = [a for a in articles if a is not None]
         logger.info(f"Coletados {len(valid_articles)} artigos válidos de {len(article_urls)} URLs")
         return valid_articles
@@ -134,8 +146,16 @@ async def fetch_source_articles(session: aiohttp.ClientSession, source_config: D
         logger.error(f"Erro ao buscar fonte {source_config['name']}: {str(e)}")
         return []
 
-async def fetch_all(sources: Optional[List[str]] = None, limit: int = 10) -> List[Dict]:
-    """Fetch articles from all configured sources or specified sources."""
+async def fetch_all(sources: Optional[List[str]] = None, limit: int = 10, seen=None,
+                    deadline: Optional[Deadline] = None) -> List[Dict]:
+    """
+    Fetch articles from all configured sources or specified sources.
+
+    If a SeenStore is given, article pages already ingested by earlier runs
+    are not downloaded again. If a Deadline is given, fetches still pending
+    when it expires are cancelled and partial results are returned.
+    """
+    deadline = deadline or Deadline()
     all_articles = []
     config = load_config()
     
@@ -146,8 +166,9 @@ async def fetch_all(sources: Optional[List[str]] = None, limit: int = 10) -> Lis
         logger.debug(f"Fontes filtradas: {[s['id'] for s in config]}")
         
     async with aiohttp.ClientSession() as session:
-        tasks = [fetch_source_articles(session, source_config, limit) for source_config in config]
-        results = await asyncio.gather(*tasks)
+        tasks = [fetch_source_articles(session, source_config, limit, seen, deadline)
+                 for source_config in config]
+        results = await deadline.gather(tasks)
         
         for articles in results:
             all_articles.extend(articles)
@@ -10,19 +10,14 @@ from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
 import re
-from bs4 import BeautifulSoup
 from dateutil import parser as date_parser
+from src.deadline import Deadline
+from src.article import Article
+from src.processor.normalize import plain_text
 
 def clean_html(text: str) -> str:
     """Remove tags HTML e formata o texto."""
-    # Remove tags HTML
-    soup = BeautifulSoup(text, 'html.parser')
-    text = soup.get_text()
-    
-    # Remove espaços extras e quebras de linha
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    return plain_text(text)
 
 def extract_content(entry) -> str:
     """
@@ -85,13 +80,14 @@ def to_iso8601(date_str):
     except Exception:
         return datetime.now().isoformat()
 
-async def fetch_feed(session: aiohttp.ClientSession, url: str) -> List[Dict]:
+async def fetch_feed(session: aiohttp.ClientSession, url: str, seen=None) -> List[Dict]:
     """
     Busca e processa um feed RSS específico.
     
     Args:
         session: Sessão HTTP assíncrona
         url: URL do feed RSS
+        seen: SeenStore opcional; entradas já ingeridas são ignoradas
         
     Returns:
         Lista de artigos processados do feed
@@ -123,6 +119,10 @@ async def fetch_feed(session: aiohttp.ClientSession, url: str) -> List[Dict]:
                 
             articles = []
             for entry in feed.entries:
+                # Ignora entradas já ingeridas em execuções anteriores
+                if seen is not None and seen.seen_url(entry.get('link', '')):
+                    continue
+                
                 # Extrai o melhor conteúdo disponível
                 content = extract_content(entry)
                 
@@ -133,13 +133,13 @@ async def fetch_feed(session: aiohttp.ClientSession, url: str) -> List[Dict]:
                 if len(clean_content) < 10:  # Ignora conteúdo muito curto
                     continue
                 
-                article = {
-                    'title': entry.get('title', ''),
-                    'link': entry.get('link', ''),
-                    'published': to_iso8601(entry.get('published', '')),
-                    'summary': clean_content,
-                    'source': source
-                }
+                article = Article(
+                    title=entry.get('title', ''),
+                    link=entry.get('link', ''),
+                    published=to_iso8601(entry.get('published', '')),
+                    summary=clean_content,
+                    source=source
+                )
                 articles.append(article)
             
             print(f"Sucesso! Encontrados {len(articles)} artigos em {url}")
@@ -152,7 +152,8 @@ async def fetch_feed(session: aiohttp.ClientSession, url: str) -> List[Dict]:
         print(f"Erro ao processar feed {url}: {str(e)}")
         return []
 
-async def fetch_all(sources: Optional[List[str]] = None) -> List[Dict]:
+async def fetch_all(sources: Optional[List[str]] = None, seen=None,
+                    deadline: Optional[Deadline] = None) -> List[Dict]:
     """
     Busca todos os feeds RSS definidos no arquivo de configuração.
     
@@ -160,6 +161,8 @@ async def fetch_all(sources: Optional[List[str]] = None) -> List[Dict]:
         sources: Lista opcional de fontes a serem coletadas.
                 Se None ou ["all"], coleta de todas as fontes.
                 Ex: ["infomoney", "investing"]
+        seen: SeenStore opcional com os itens de execuções anteriores
+        deadline: Prazo opcional; feeds pendentes ao fim do prazo são cancelados
     
     Returns:
         Lista combinada de artigos de todos os feeds
@@ -181,16 +184,15 @@ async def fetch_all(sources: Optional[List[str]] = None) -> List[Dict]:
     
     print(f"\nFeeds configurados: {len(rss_urls)}")
     
+    deadline = deadline or Deadline()
     async with aiohttp.ClientSession() as session:
-        tasks = [fetch_feed(session, url) for url in rss_urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        tasks = [fetch_feed(session, url, seen) for url in rss_urls]
+        # Exceções não tratadas e feeds cancelados pelo prazo são ignorados
+        results = await deadline.gather(tasks)
         
     # Combina todos os resultados em uma única lista
     all_articles = []
     for result in results:
-        if isinstance(result, list):  # Ignora exceções não tratadas
-            all_articles.extend(result)
-        else:
-            print(f"Erro não tratado: {result}")
+        all_articles.extend(result)
             
     return all_articles 
\ No newline at end of file
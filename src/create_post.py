@@ -1,87 +1,350 @@
 # src/create_post.py
-from openai import AsyncClient
-import os, textwrap
+import os, re, textwrap
 import asyncio
-from tenacity import retry, stop_after_attempt, wait_exponential
+from contextlib import aclosing
+from typing import Dict, List, Optional, Tuple
+from openai import APIConnectionError, APITimeoutError, InternalServerError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from src.llm import chat_completion, stream_completion
+from src.deadline import Deadline
 
 MODEL = "gpt-4"  # Corrigindo o nome do modelo
-client = AsyncClient()
-
-def validate_content(hook: str, text: str) -> tuple[bool, str]:
-    """Valida o conteúdo gerado"""
-    if len(hook.split()) > 20:
-        return False, "Hook excede 20 palavras"
-    if not 600 <= len(text) <= 800:
-        return False, f"Texto tem {len(text)} caracteres (deve ter entre 600-800)"
-    return True, ""
-
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-async def generate_content(prompt: str) -> str:
-    """Gera conteúdo com retry em caso de falha"""
+
+# Regras do formato de post
+HOOK_MAX_WORDS = 20
+TEXT_MIN_CHARS = 600
+TEXT_MAX_CHARS = 800
+HASHTAGS_MIN = 3
+HASHTAGS_MAX = 5
+# Hashtags usadas para completar o mínimo sem nova chamada à API
+DEFAULT_HASHTAGS = ("#Investimentos", "#MercadoFinanceiro", "#AltaVistaInvestimentos")
+
+# Drafts gerados em paralelo (cada um faz de 1 a 1 + MAX_FIX_CALLS chamadas)
+DRAFT_CONCURRENCY = int(os.getenv("DRAFT_CONCURRENCY", "4"))
+MAX_FIX_CALLS = 2
+
+# Gera o post em streaming e interrompe a resposta que chega fora do formato
+DRAFT_STREAMING = os.getenv("DRAFT_STREAMING", "1") != "0"
+# Caracteres sem nenhum rótulo HOOK/TEXT até a resposta ser considerada fora do formato
+STREAM_LABEL_WINDOW = 300
+
+# Rótulo de campo tolerante: "HOOK:", "**Hook**:", "- TEXTO:", "Hashtags -"
+_LABEL = re.compile(
+    r'^[ \t>*_#-]*(HOOK|GANCHO|TEXT|TEXTO|HASHTAGS)[ \t*_]*[:\-–][ \t*_]*',
+    re.IGNORECASE | re.MULTILINE,
+)
+_LABEL_FIELD = {"hook": "hook", "gancho": "hook", "text": "text", "texto": "text",
+                "hashtags": "hashtags"}
+_HASHTAG = re.compile(r'#(\w+)')
+_TRAILING_HASHTAGS = re.compile(r'(?:\s*#\w+)+\s*$')
+_SENTENCE_END = re.compile(r'[.!?…](?=\s|$)')
+
+def validate_draft(fields: Dict[str, str]) -> Dict[str, str]:
+    """
+    Valida cada campo do draft.
+
+    Returns:
+        Dicionário campo -> erro (vazio se o draft for válido)
+    """
+    errors = {}
+    hook = fields.get("hook", "")
+    text = fields.get("text", "")
+    if not hook:
+        errors["hook"] = "HOOK ausente"
+    elif len(hook.split()) > HOOK_MAX_WORDS:
+        errors["hook"] = f"HOOK tem {len(hook.split())} palavras (máximo {HOOK_MAX_WORDS})"
+    if not text:
+        errors["text"] = "TEXT ausente"
+    elif not TEXT_MIN_CHARS <= len(text) <= TEXT_MAX_CHARS:
+        errors["text"] = (f"TEXT tem {len(text)} caracteres "
+                          f"(deve ter entre {TEXT_MIN_CHARS} e {TEXT_MAX_CHARS})")
+    count = len(fields.get("hashtags", "").split())
+    if not HASHTAGS_MIN <= count <= HASHTAGS_MAX:
+        errors["hashtags"] = f"{count} hashtags (devem ser de {HASHTAGS_MIN} a {HASHTAGS_MAX})"
+    return errors
+
+def parse_draft(raw: str) -> Dict[str, str]:
+    """
+    Extrai HOOK, TEXT e HASHTAGS da resposta do modelo.
+
+    Aceita rótulos em maiúsculas ou não, com markdown, em português e com o
+    TEXT em várias linhas; campos ausentes não aparecem no resultado.
+    """
+    raw = re.sub(r'^\s*(```\w*|---+)\s*$', '', raw or '', flags=re.MULTILINE)
+    labels = list(_LABEL.finditer(raw))
+    fields: Dict[str, str] = {}
+    for i, label in enumerate(labels):
+        end = labels[i + 1].start() if i + 1 < len(labels) else len(raw)
+        field = _LABEL_FIELD[label.group(1).lower()]
+        value = raw[label.end():end].strip().strip('*_"“”').strip()
+        if value and field not in fields:
+            fields[field] = value
+    return fields
+
+class StreamCheck:
+    """
+    Valida o formato do post enquanto a resposta chega.
+
+    Só acusa violações definitivas, que nenhum texto posterior corrige:
+    nenhum rótulo HOOK/TEXT nos primeiros STREAM_LABEL_WINDOW caracteres.
+    HOOK ou TEXT longos e hashtags fora do intervalo não interrompem a
+    resposta: `repair_draft` os corrige localmente, sem nova chamada.
+
+    Example:
+        >>> check = StreamCheck(label_window=20)
+        >>> check.feed("Claro! Segue o post pedido")
+        'resposta sem os rótulos HOOK/TEXT'
+    """
+
+    def __init__(self, label_window: int = STREAM_LABEL_WINDOW):
+        self.label_window = label_window
+        self.text = ""
+
+    def feed(self, delta: str) -> Optional[str]:
+        """
+        Acrescenta um trecho da resposta.
+
+        Returns:
+            Descrição da violação, ou None se a resposta ainda pode ser válida
+        """
+        self.text += delta
+        fields = parse_draft(self.text)
+        if not fields.get("hook") and not fields.get("text"):
+            if len(self.text.strip()) > self.label_window:
+                return "resposta sem os rótulos HOOK/TEXT"
+        return None
+
+def normalize_hashtags(value: str, extra: tuple = DEFAULT_HASHTAGS) -> str:
+    """Normaliza as hashtags (sem repetições, no máximo 5), completando o mínimo com `extra`."""
+    tags: Dict[str, str] = {}
+    for tag in _HASHTAG.findall(value or ""):
+        tags.setdefault(tag.lower(), f"#{tag}")
+    for tag in extra:
+        if len(tags) >= HASHTAGS_MIN:
+            break
+        tags.setdefault(tag.lstrip("#").lower(), tag)
+    return " ".join(list(tags.values())[:HASHTAGS_MAX])
+
+def truncate_text(text: str, max_chars: int = TEXT_MAX_CHARS, min_chars: int = TEXT_MIN_CHARS) -> str:
+    """Corta o texto no último fim de sentença antes de `max_chars` (vazio se ficar curto demais)."""
+    ends = [m.end() for m in _SENTENCE_END.finditer(text) if m.end() <= max_chars]
+    if ends and ends[-1] >= min_chars:
+        return text[:ends[-1]].strip()
+    return ""
+
+def repair_draft(fields: Dict[str, str]) -> Dict[str, str]:
+    """
+    Corrige localmente o que não precisa de nova chamada à API.
+
+    - HOOK longo: usa a primeira frase, se couber, ou corta em 20 palavras
+    - TEXT longo: corta no último fim de sentença dentro do limite
+    - HASHTAGS: move as do fim do TEXT, normaliza e completa o mínimo
+    """
+    fields = dict(fields)
+    # Hashtags no fim do TEXT vão para o campo HASHTAGS
+    text = fields.get("text", "")
+    trailing = _TRAILING_HASHTAGS.search(text)
+    if trailing:
+        fields["hashtags"] = f"{fields.get('hashtags', '')} {trailing.group(0)}"
+        text = text[:trailing.start()]
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) > TEXT_MAX_CHARS:
+        text = truncate_text(text) or text
+    if text:
+        fields["text"] = text
+
+    hook = re.sub(r'\s+', ' ', fields.get("hook", "")).strip().strip('"“”')
+    if len(hook.split()) > HOOK_MAX_WORDS:
+        clause = re.split(r'(?<=[.!?])\s', hook)[0]
+        words = clause.split() if len(clause.split()) <= HOOK_MAX_WORDS else hook.split()[:HOOK_MAX_WORDS]
+        hook = " ".join(words).rstrip(",;:-–")
+    if hook:
+        fields["hook"] = hook
+
+    fields["hashtags"] = normalize_hashtags(fields.get("hashtags", ""))
+    return fields
+
+@retry(
+    retry=retry_if_exception_type((APIConnectionError, APITimeoutError, InternalServerError)),
+    stop=stop_after_attempt(2),
+    wait=wait_exponential(multiplier=1, min=4, max=10),
+)
+async def generate_content(prompt: str, max_tokens: int = 400) -> str:
+    """Gera conteúdo, repetindo apenas em falhas transitórias de conexão ou do servidor"""
     try:
-        rsp = await client.chat.completions.create(
+        rsp = await chat_completion(
             model=MODEL,
             temperature=0.7,
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=400,
+            max_tokens=max_tokens,
         )
         return rsp.choices[0].message.content
     except Exception as e:
         print(f"Erro ao gerar conteúdo: {str(e)}")
         raise
 
-async def draft_post(article: dict) -> dict:
-    prompt = f"""
+@retry(
+    retry=retry_if_exception_type((APIConnectionError, APITimeoutError, InternalServerError)),
+    stop=stop_after_attempt(2),
+    wait=wait_exponential(multiplier=1, min=4, max=10),
+)
+async def stream_content(prompt: str, check: Optional[StreamCheck] = None,
+                         max_tokens: int = 400) -> Tuple[str, Optional[str]]:
+    """
+    Gera conteúdo em streaming, interrompendo a resposta na primeira violação de `check`.
+
+    Returns:
+        Tuple: (texto recebido, violação que interrompeu a resposta ou None)
+    """
+    text = ""
+    try:
+        async with aclosing(stream_completion(
+            model=MODEL,
+            temperature=0.7,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+        )) as chunks:
+            async for delta in chunks:
+                text += delta
+                violation = check.feed(delta) if check else None
+                if violation:
+                    return text, violation
+        return text, None
+    except Exception as e:
+        print(f"Erro ao gerar conteúdo: {str(e)}")
+        raise
+
+def build_prompt(article: dict, audience: Optional[str] = None) -> str:
+    """Monta o prompt do post completo"""
+    audience = audience or "investidores"
+    return f"""
     Você é copywriter da Alta Vista Investimentos.
     Crie conteúdo para Instagram a partir do artigo abaixo.
-    Use um tom profissional mas envolvente, adequado para investidores.
+    Use um tom profissional mas envolvente, adequado para {audience}.
 
     Título: {article['title']}
     Resumo: {article['summary']}
 
     Regras importantes:
-    - HOOK deve ter no máximo 20 palavras
-    - TEXT deve ter entre 600-800 caracteres
-    - Use 3-5 hashtags relevantes
+    - HOOK deve ter no máximo {HOOK_MAX_WORDS} palavras
+    - TEXT deve ter entre {TEXT_MIN_CHARS}-{TEXT_MAX_CHARS} caracteres
+    - Use {HASHTAGS_MIN}-{HASHTAGS_MAX} hashtags relevantes
     - Mantenha um tom inspirador e educativo
     - Inclua call-to-action sutil
     - Evite especulações sem fundamento
 
     Formato de saída (sem nada além disto):
     ---
-    HOOK: <máx 20 palavras>
-    TEXT: <600-800 caracteres, PT-BR>
+    HOOK: <máx {HOOK_MAX_WORDS} palavras>
+    TEXT: <{TEXT_MIN_CHARS}-{TEXT_MAX_CHARS} caracteres, PT-BR>
     HASHTAGS: #Hashtag1 #Hashtag2 #Hashtag3
     ---
     """
-    
-    max_attempts = 3
-    attempt = 0
-    
-    while attempt < max_attempts:
-        raw = await generate_content(prompt)
-        lines = [l.replace("HOOK:", "").replace("TEXT:", "").replace("HASHTAGS:", "").strip()
-                for l in raw.split("\n") if l and not l.startswith("---")]
-        
-        if len(lines) != 3:
-            attempt += 1
-            continue
-            
-        hook, text, hashtags = lines
-        is_valid, error = validate_content(hook, text)
-        
-        if is_valid:
-            return {
-                "title": article["title"],
-                "hook": hook,
-                "text": textwrap.fill(text, 90),
-                "hashtags": hashtags,
-                "link": article["link"],
-                "source": article["source"],
-                "score": article["relevance"],
-                "published": article.get("published", "")
-            }
-        
-        attempt += 1
-        
-    raise ValueError("Não foi possível gerar conteúdo válido após várias tentativas") 
\ No newline at end of file
+
+def build_fix_prompt(field: str, fields: Dict[str, str], article: dict, error: str) -> str:
+    """Monta o prompt que pede a correção de um único campo"""
+    rules = {
+        "hook": f"no máximo {HOOK_MAX_WORDS} palavras",
+        "text": f"entre {TEXT_MIN_CHARS} e {TEXT_MAX_CHARS} caracteres, PT-BR, com call-to-action sutil",
+        "hashtags": f"de {HASHTAGS_MIN} a {HASHTAGS_MAX} hashtags relevantes separadas por espaço",
+    }
+    label = field.upper()
+    return f"""
+    Você é copywriter da Alta Vista Investimentos e está revisando um post de Instagram
+    sobre a notícia "{article['title']}".
+
+    HOOK: {fields.get('hook', '')}
+    TEXT: {fields.get('text', '')}
+    HASHTAGS: {fields.get('hashtags', '')}
+
+    Problema: {error}.
+    Reescreva apenas o {label}, com {rules[field]}, mantendo o sentido e o tom.
+    Responda somente no formato:
+    {label}: <novo {label}>
+    """
+
+async def fix_field(field: str, fields: Dict[str, str], article: dict, error: str) -> Dict[str, str]:
+    """Pede ao modelo a correção de um único campo e devolve o draft atualizado"""
+    max_tokens = 400 if field == "text" else 80
+    raw = await generate_content(build_fix_prompt(field, fields, article, error), max_tokens=max_tokens)
+    fixed = parse_draft(raw).get(field) or (raw or "").strip()
+    return repair_draft({**fields, field: fixed})
+
+async def generate_draft(prompt: str, stream: bool, attempts: int = 2) -> Dict[str, str]:
+    """
+    Gera o post completo, já com as correções locais.
+
+    Em streaming, a resposta é interrompida assim que fica claro que não
+    segue o formato (ver `StreamCheck`) e o post é pedido de novo; a última tentativa vai até o fim e fica com as
+    correções locais. O post também é pedido de novo se a resposta não
+    tiver nem HOOK nem TEXT.
+    """
+    fields: Dict[str, str] = {}
+    for attempt in range(attempts):
+        if stream:
+            last = attempt == attempts - 1
+            raw, violation = await stream_content(prompt, None if last else StreamCheck())
+            if violation:
+                print(f"✂️ Resposta interrompida ({violation}), gerando de novo")
+                continue
+        else:
+            raw = await generate_content(prompt)
+        fields = repair_draft(parse_draft(raw))
+        if "hook" in fields or "text" in fields:
+            break
+    return fields
+
+async def draft_post(article: dict, audience: str = None, stream: Optional[bool] = None) -> dict:
+    """
+    Gera o draft de um post a partir de um artigo.
+
+    Faz uma chamada para o post completo (em streaming, se `stream` ou
+    DRAFT_STREAMING), corrige localmente o que for possível e, só para os
+    campos ainda inválidos, faz chamadas curtas de correção (no máximo
+    MAX_FIX_CALLS).
+    """
+    prompt = build_prompt(article, audience)
+    fields = await generate_draft(prompt, DRAFT_STREAMING if stream is None else stream)
+
+    fix_calls = 0
+    errors = validate_draft(fields)
+    while errors and fix_calls < MAX_FIX_CALLS:
+        # O TEXT é o campo mais caro; corrige-o primeiro
+        field = "text" if "text" in errors else next(iter(errors))
+        fields = await fix_field(field, fields, article, errors[field])
+        fix_calls += 1
+        errors = validate_draft(fields)
+
+    if errors:
+        raise ValueError(f"Não foi possível gerar conteúdo válido: {'; '.join(errors.values())}")
+
+    return {
+        "title": article["title"],
+        "hook": fields["hook"],
+        "text": textwrap.fill(fields["text"], 90),
+        "hashtags": fields["hashtags"],
+        "link": article.get("link") or article.get("url", ""),
+        "source": article["source"],
+        "score": article["relevance"],
+        "published": article.get("published", "")
+    }
+
+async def draft_posts(articles: List[dict], audience: str = None,
+                      concurrency: int = DRAFT_CONCURRENCY,
+                      deadline: Optional[Deadline] = None) -> List[dict]:
+    """
+    Gera os drafts de vários artigos com no máximo `concurrency` em andamento.
+
+    Drafts que falham são descartados; com um `deadline`, os que não ficarem
+    prontos a tempo também.
+
+    Returns:
+        Drafts gerados, na ordem dos artigos
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(article: dict) -> dict:
+        async with semaphore:
+            return await draft_post(article, audience=audience)
+
+    return await (deadline or Deadline()).gather([bounded(a) for a in articles])
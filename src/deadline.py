@@ -0,0 +1,139 @@
+"""
+Módulo para o orçamento de tempo de uma execução do agente.
+"""
+import asyncio
+import math
+import re
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Iterable, List, Optional
+
+
+class Deadline:
+    """
+    Prazo de uma execução, medido com relógio monotônico.
+
+    Um `Deadline` sem prazo (`seconds=None`) nunca expira, então o código
+    que o recebe não precisa tratar o caso "sem limite" à parte.
+
+    Example:
+        >>> deadline = Deadline.parse("45m")
+        >>> collect = deadline.sub(0.4)  # 40% do tempo restante para a coleta
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds: Tempo disponível a partir de agora (None = sem prazo)
+        """
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "Deadline":
+        """
+        Interpreta um prazo informado na linha de comando.
+
+        Aceita durações ("90s", "45m", "1h30m", "120") ou um horário do dia
+        ("08:30"); um horário que já passou hoje expira imediatamente.
+
+        Args:
+            value: Texto do prazo (None ou vazio = sem prazo)
+
+        Returns:
+            Deadline correspondente
+        """
+        if not value:
+            return cls(None)
+        value = value.strip().lower()
+
+        clock = re.fullmatch(r'(\d{1,2}):(\d{2})', value)
+        if clock:
+            now = datetime.now()
+            target = now.replace(hour=int(clock.group(1)), minute=int(clock.group(2)),
+                                 second=0, microsecond=0)
+            return cls(max(0.0, (target - now).total_seconds()))
+
+        if re.fullmatch(r'\d+(\.\d+)?', value):
+            return cls(float(value))
+
+        parts = re.findall(r'(\d+(?:\.\d+)?)\s*([hms])', value)
+        if not parts or ''.join(n + u for n, u in parts) != value.replace(' ', ''):
+            raise ValueError(f"Prazo inválido: '{value}' (use ex.: 90s, 45m, 1h30m ou 08:30)")
+        units = {'h': 3600, 'm': 60, 's': 1}
+        return cls(sum(float(n) * units[u] for n, u in parts))
+
+    def remaining(self) -> float:
+        """Segundos restantes (infinito se não houver prazo)."""
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.expires_at is None
+
+    def sub(self, fraction: float) -> "Deadline":
+        """
+        Cria um prazo parcial com uma fração do tempo restante.
+
+        Args:
+            fraction: Fração do tempo restante (0 a 1)
+        """
+        if self.expires_at is None:
+            return Deadline(None)
+        return Deadline(self.remaining() * fraction)
+
+    def timeout(self, margin: float = 0.0) -> Optional[float]:
+        """Tempo restante menos a margem, no formato aceito por `asyncio.wait`."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.remaining() - margin)
+
+    async def gather(self, awaitables: Iterable[Awaitable[Any]], margin: float = 0.0) -> List[Any]:
+        """
+        Executa as tarefas em paralelo até o prazo e cancela as pendentes.
+
+        Diferente de `asyncio.gather`, tarefas que falham ou não terminam a
+        tempo são descartadas em vez de interromper as demais.
+
+        Args:
+            awaitables: Corrotinas ou tarefas a executar
+            margin: Segundos antes do prazo em que as tarefas são cortadas
+
+        Returns:
+            Resultados das tarefas concluídas com sucesso, na ordem original
+        """
+        tasks = [asyncio.ensure_future(a) for a in awaitables]
+        if not tasks:
+            return []
+
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout(margin))
+        for task in pending:
+            task.cancel()
+        if pending:
+            # Aguarda o cancelamento para que sessões e conexões fechem limpas
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"⏱️ Prazo atingido: {len(pending)} tarefas canceladas")
+
+        results = []
+        for task in tasks:
+            if task not in done or task.cancelled():
+                continue
+            if task.exception() is not None:
+                print(f"Erro não tratado: {task.exception()}")
+                continue
+            results.append(task.result())
+        return results
+
+    async def run(self, awaitable: Awaitable[Any], margin: float = 0.0) -> Any:
+        """
+        Aguarda uma única tarefa até o prazo.
+
+        Raises:
+            asyncio.TimeoutError: Se o prazo acabar antes do resultado
+        """
+        return await asyncio.wait_for(awaitable, timeout=self.timeout(margin))
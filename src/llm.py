@@ -0,0 +1,109 @@
+"""
+Módulo com o ponto único de chamada à API de chat da OpenAI.
+
+Todas as chamadas (resumo, classificação, drafts) passam pelo mesmo
+RateLimiter, configurado por OPENAI_RPM e OPENAI_TPM.
+"""
+import os
+from typing import Any, AsyncIterator, Optional
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, RateLimitError
+
+from src.ratelimit import RateLimiter, estimate_tokens
+
+load_dotenv()
+
+limiter = RateLimiter(
+    requests_per_minute=float(os.getenv("OPENAI_RPM", "500")),
+    tokens_per_minute=float(os.getenv("OPENAI_TPM", "30000")),
+)
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_client() -> AsyncOpenAI:
+    """Retorna o cliente OpenAI compartilhado, criado no primeiro uso."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI()
+    return _client
+
+
+async def chat_completion(max_rate_limit_retries: int = 5, **kwargs: Any) -> Any:
+    """
+    Chama `chat.completions.create` respeitando o limite de taxa do processo.
+
+    Respostas 429 pausam o limitador e a chamada volta para a fila; outros
+    erros são propagados para o chamador.
+
+    Args:
+        max_rate_limit_retries: Número máximo de novas tentativas após um 429
+        **kwargs: Argumentos repassados para `chat.completions.create`
+
+    Returns:
+        ChatCompletion: Resposta da API
+    """
+    estimated = estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens'))
+
+    for attempt in range(max_rate_limit_retries + 1):
+        await limiter.acquire(estimated)
+        try:
+            raw = await get_client().chat.completions.with_raw_response.create(**kwargs)
+        except RateLimitError as e:
+            if attempt == max_rate_limit_retries:
+                raise
+            pause = limiter.on_rate_limited(e.response.headers)
+            print(f"⏳ Limite de taxa da API atingido, aguardando {pause:.1f}s")
+            continue
+
+        limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        if getattr(response, 'usage', None):
+            limiter.record_usage(estimated, response.usage.total_tokens)
+        return response
+
+
+async def stream_completion(max_rate_limit_retries: int = 5, **kwargs: Any) -> AsyncIterator[str]:
+    """
+    Como `chat_completion`, mas devolve o texto da resposta aos pedaços.
+
+    Quem consome pode parar a qualquer momento (use `contextlib.aclosing`):
+    o stream é fechado e o limitador é corrigido com a estimativa dos
+    tokens de fato recebidos, não com o `max_tokens` inteiro.
+
+    Args:
+        max_rate_limit_retries: Número máximo de novas tentativas após um 429
+        **kwargs: Argumentos repassados para `chat.completions.create`
+
+    Yields:
+        str: Trechos de texto, na ordem em que chegam
+    """
+    estimated = estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens'))
+    prompt_tokens = estimated - (kwargs.get('max_tokens') or 256)
+
+    for attempt in range(max_rate_limit_retries + 1):
+        await limiter.acquire(estimated)
+        try:
+            stream = await get_client().chat.completions.create(stream=True, **kwargs)
+            break
+        except RateLimitError as e:
+            if attempt == max_rate_limit_retries:
+                raise
+            pause = limiter.on_rate_limited(e.response.headers)
+            print(f"⏳ Limite de taxa da API atingido, aguardando {pause:.1f}s")
+
+    response = getattr(stream, 'response', None)
+    if response is not None:
+        limiter.update_from_headers(response.headers)
+
+    received = 0
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                received += len(text)
+                yield text
+    finally:
+        await stream.close()
+        limiter.record_usage(estimated, prompt_tokens + received // 4)
@@ -1,8 +1,8 @@
 import os
 import json
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from typing import Dict
+from src.llm import chat_completion
 
 # Carrega as variáveis de ambiente
 load_dotenv()
@@ -24,9 +24,6 @@ async def rank_relevance(item: Dict) -> int:
             "Por favor, configure a variável OPENAI_API_KEY=sua-chave-aqui"
         )
     
-    # Inicializa o cliente OpenAI
-    client = AsyncOpenAI()
-    
     # Monta o prompt com as informações do item
     system_prompt = "Você é analista da Alta Vista Investimentos especializado em renda variável."
     user_prompt = f"""
@@ -55,8 +52,8 @@ async def rank_relevance(item: Dict) -> int:
         }
     }
     
-    # Faz a chamada para a API com function calling
-    response = await client.chat.completions.create(
+    # Faz a chamada para a API com function calling (respeitando o limite de taxa compartilhado)
+    response = await chat_completion(
         model="gpt-4-0125-preview",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -0,0 +1,261 @@
+"""
+Agrupamento incremental de notícias em histórias (o mesmo evento em várias fontes e execuções).
+"""
+import sqlite3
+import uuid
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import yaml
+
+from src.processor.extractive import sentence_terms
+from src.processor.normalize import normalized
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'cluster.yaml'
+
+# Vetor esparso: (índices ordenados, pesos)
+Vector = Tuple[np.ndarray, np.ndarray]
+
+_EMPTY: Vector = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = str(CONFIG_PATH)) -> Dict[str, Any]:
+    """
+    Carrega a configuração de agrupamento.
+
+    Args:
+        path: Caminho do arquivo YAML
+
+    Returns:
+        Dict: Configuração carregada
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def item_terms(item: Dict, lead_terms: int = 150) -> List[str]:
+    """Termos usados no agrupamento: título com peso dobrado e o início do corpo (o lide)."""
+    forms = normalized(item)
+    return forms.title_terms * 2 + forms.body_terms[:lead_terms]
+
+
+def term_vector(text: str, dim: int = 1 << 18) -> Vector:
+    """
+    Vetor de termos com hashing (unigramas e bigramas), normalizado.
+
+    Args:
+        text: Texto da notícia
+        dim: Dimensão do espaço de hashing
+
+    Returns:
+        Vector: Índices ordenados e pesos 1 + log(tf), com norma 1
+    """
+    return hashed_vector(sentence_terms(text), dim)
+
+
+def hashed_vector(terms: List[str], dim: int = 1 << 18) -> Vector:
+    """Como `term_vector`, a partir dos termos já extraídos."""
+    terms = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+    if not terms:
+        return _EMPTY
+    hashes = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in terms),
+                         dtype=np.int64, count=len(terms)) % dim
+    indices, counts = np.unique(hashes, return_counts=True)
+    weights = (1.0 + np.log(counts)).astype(np.float32)
+    return indices, weights / np.linalg.norm(weights)
+
+
+def _prune(indices: np.ndarray, weights: np.ndarray, max_terms: int) -> Vector:
+    """Mantém os `max_terms` maiores pesos e renormaliza."""
+    if len(indices) > max_terms:
+        keep = np.sort(np.argpartition(-weights, max_terms)[:max_terms])
+        indices, weights = indices[keep], weights[keep]
+    norm = np.linalg.norm(weights)
+    return indices, (weights / norm if norm > 0 else weights).astype(np.float32)
+
+
+class StoryClusterer:
+    """
+    Agrupa notícias em histórias de forma incremental.
+
+    Cada história guarda um centróide esparso (média dos vetores dos seus
+    itens, limitada aos termos de maior peso). Um índice invertido termo ->
+    histórias seleciona as candidatas de cada item, e a similaridade com
+    todas as candidatas é calculada de uma vez. Os centróides persistem em
+    SQLite, então uma notícia de amanhã pode entrar na história de hoje;
+    histórias sem novos itens por `max_age_days` são encerradas.
+
+    Example:
+        >>> clusterer = StoryClusterer("data/stories.db")
+        >>> clusterer.assign_items(items)  # preenche item['story_id']
+        >>> clusterer.close()
+    """
+
+    def __init__(self, db_path: str = "data/stories.db", dim: int = 1 << 18,
+                 threshold: float = 0.3, max_terms: int = 64, max_age_days: int = 3):
+        """
+        Inicializa o agrupador e carrega as histórias ativas.
+
+        Args:
+            db_path: Caminho para o arquivo do banco de dados SQLite
+            dim: Dimensão do espaço de hashing dos termos
+            threshold: Similaridade de cosseno mínima para entrar numa história
+            max_terms: Termos mantidos em cada centróide
+            max_age_days: Dias sem novos itens até a história ser encerrada
+        """
+        self.db_path = db_path
+        self.dim = dim
+        self.threshold = threshold
+        self.max_terms = max_terms
+        self.max_age_days = max_age_days
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS stories (
+            story_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            term_indices BLOB NOT NULL,
+            term_weights BLOB NOT NULL,
+            first_seen TIMESTAMP NOT NULL,
+            updated TIMESTAMP NOT NULL
+        ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_stories_updated ON stories(updated)")
+        self.conn.commit()
+
+        self.story_ids: List[str] = []
+        self.titles: List[str] = []
+        self.sizes: List[int] = []
+        self.centroids: List[Vector] = []
+        self.postings: Dict[int, List[int]] = defaultdict(list)
+        self._dirty: set = set()
+        self._load()
+
+    def _load(self) -> None:
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        self.conn.execute("DELETE FROM stories WHERE updated < ?", (cutoff,))
+        self.conn.commit()
+        rows = self.conn.execute(
+            "SELECT story_id, title, size, term_indices, term_weights FROM stories ORDER BY updated")
+        for story_id, title, size, indices, weights in rows:
+            self._add_story(story_id, title, size, (np.frombuffer(indices, dtype=np.int64),
+                                                    np.frombuffer(weights, dtype=np.float32)))
+
+    def _add_story(self, story_id: str, title: str, size: int, centroid: Vector) -> int:
+        position = len(self.story_ids)
+        self.story_ids.append(story_id)
+        self.titles.append(title)
+        self.sizes.append(size)
+        self.centroids.append(centroid)
+        for term in centroid[0].tolist():
+            self.postings[term].append(position)
+        return position
+
+    def similarities(self, vector: Vector) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Similaridade de cosseno do vetor com as histórias que compartilham algum termo.
+
+        Returns:
+            Tuple: (posições das histórias candidatas, similaridades)
+        """
+        indices, weights = vector
+        candidates = {p for term in indices.tolist() for p in self.postings.get(term, ())}
+        if not candidates:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        candidates = np.fromiter(sorted(candidates), dtype=np.int64, count=len(candidates))
+
+        # Produto escalar esparso de todas as candidatas numa única passada
+        terms = np.concatenate([self.centroids[p][0] for p in candidates])
+        values = np.concatenate([self.centroids[p][1] for p in candidates])
+        lengths = np.array([len(self.centroids[p][0]) for p in candidates])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        positions = np.minimum(np.searchsorted(indices, terms), len(indices) - 1)
+        products = np.where(indices[positions] == terms, values * weights[positions], 0.0)
+        return candidates, np.add.reduceat(products, offsets)
+
+    def _merge(self, position: int, vector: Vector) -> None:
+        indices, weights = self.centroids[position]
+        size = self.sizes[position]
+        merged, inverse = np.unique(np.concatenate((indices, vector[0])), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate((weights * size, vector[1])),
+                             minlength=len(merged))
+        centroid = _prune(merged, totals / (size + 1), self.max_terms)
+
+        for term in np.setdiff1d(centroid[0], indices, assume_unique=True).tolist():
+            self.postings[term].append(position)
+        self.centroids[position] = centroid
+        self.sizes[position] = size + 1
+
+    def assign(self, item: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Associa um item à história mais parecida ou abre uma nova.
+
+        Args:
+            item: Dicionário com 'title' e, opcionalmente, o corpo
+
+        Returns:
+            Tuple: (ID da história, True se a história foi criada agora)
+        """
+        vector = hashed_vector(item_terms(item), self.dim)
+        candidates, scores = self.similarities(vector)
+        if len(candidates) and scores.max() >= self.threshold:
+            position = int(candidates[int(np.argmax(scores))])
+            self._merge(position, vector)
+            created = False
+        else:
+            position = self._add_story(uuid.uuid4().hex[:12], item.get('title', ''), 1,
+                                       _prune(*vector, self.max_terms))
+            created = True
+        self._dirty.add(position)
+        return self.story_ids[position], created
+
+    def assign_items(self, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Preenche 'story_id' em cada item e persiste os centróides alterados.
+
+        Args:
+            items: Lista de notícias
+
+        Returns:
+            Dict: Contagem de 'stories' distintas e de histórias 'new'
+        """
+        stories, new = set(), 0
+        for item in items:
+            story_id, created = self.assign(item)
+            item['story_id'] = story_id
+            stories.add(story_id)
+            new += created
+        self.save()
+        return {'stories': len(stories), 'new': new}
+
+    def save(self) -> None:
+        """Grava as histórias alteradas desde o último `save`."""
+        now = datetime.now().isoformat()
+        self.conn.executemany("""
+        INSERT INTO stories (story_id, title, size, term_indices, term_weights, first_seen, updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(story_id) DO UPDATE SET
+            size = excluded.size,
+            term_indices = excluded.term_indices,
+            term_weights = excluded.term_weights,
+            updated = excluded.updated
+        """, [
+            (self.story_ids[p], self.titles[p], self.sizes[p],
+             self.centroids[p][0].astype(np.int64).tobytes(),
+             self.centroids[p][1].astype(np.float32).tobytes(), now, now)
+            for p in sorted(self._dirty)
+        ])
+        self.conn.commit()
+        self._dirty.clear()
+
+    def __len__(self) -> int:
+        return len(self.story_ids)
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,13 +1,31 @@
 import hashlib
-from typing import List, Dict
+import re
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional
 
-def process_items(items: List[Dict]) -> List[Dict]:
+import numpy as np
+import yaml
+
+from src.processor.text import fold
+from src.processor.normalize import item_body, normalized, word_shingles
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'dedup.yaml'
+
+# Primo de Mersenne 2^31 - 1: mantém (a * x + b) dentro de 64 bits
+_PRIME = (1 << 31) - 1
+
+
+def process_items(items: List[Dict], seen=None) -> List[Dict]:
     """
     Remove itens duplicados de uma lista de dicionários usando um hash SHA256 como identificador único.
     O hash é gerado a partir da concatenação do título (em minúsculas) e fonte do item.
+    Se um SeenStore for informado, também remove itens ingeridos em execuções anteriores.
     
     Args:
         items (List[Dict]): Lista de dicionários contendo pelo menos as chaves 'title' e 'source'
+        seen (SeenStore, optional): Registro persistente de itens já vistos
         
     Returns:
         List[Dict]: Lista sem duplicatas, mantendo a ordem original dos itens
@@ -21,17 +39,183 @@ def process_items(items: List[Dict]) -> List[Dict]:
         >>> process_items(items)
         [{"title": "Notícia 1", "source": "site1"}, {"title": "Notícia 2", "source": "site2"}]
     """
-    seen = set()
+    seen_uids = set()
     result = []
     
     for item in items:
         # Gera o identificador único usando title + source
-        content = (item['title'].lower() + item['source']).encode('utf-8')
+        content = (normalized(item).folded_title + item['source']).encode('utf-8')
         uid = hashlib.sha256(content).hexdigest()
         
         # Adiciona o item apenas se ainda não foi visto
-        if uid not in seen:
-            seen.add(uid)
-            result.append(item)
+        if uid not in seen_uids:
+            seen_uids.add(uid)
+            if seen is None or not seen.is_seen(item):
+                result.append(item)
             
-    return result 
\ No newline at end of file
+    return result
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = str(CONFIG_PATH)) -> Dict[str, Any]:
+    """
+    Carrega a configuração de deduplicação.
+
+    Args:
+        path: Caminho do arquivo YAML
+
+    Returns:
+        Dict: Configuração carregada
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """
+    Calcula os hashes dos shingles de palavras de um texto.
+
+    Args:
+        text: Texto a ser analisado
+        size: Número de palavras por shingle
+
+    Returns:
+        np.ndarray: Hashes distintos (uint64) dos shingles
+    """
+    return word_shingles(re.findall(r'\w+', fold(text)), size)
+
+
+class MinHashLSH:
+    """
+    Detector de quase-duplicatas com MinHash e LSH por bandas.
+
+    Cada item recebe uma assinatura de `bands * rows` valores mínimos;
+    itens que coincidem em ao menos uma banda inteira viram candidatos e só
+    então têm a similaridade estimada comparada ao limiar. O custo é
+    praticamente linear no número de itens.
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4, threshold: float = 0.6,
+                 shingle_size: int = 3, seed: int = 42):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """Calcula a assinatura MinHash de um conjunto de hashes de shingles."""
+        values = (self._a[:, None] * (hashes[None, :] % _PRIME) + self._b[:, None]) % _PRIME
+        return values.min(axis=1)
+
+    def groups(self, texts: List[str]) -> List[List[int]]:
+        """
+        Agrupa os textos quase duplicados.
+
+        Args:
+            texts: Textos a comparar
+
+        Returns:
+            Lista de grupos (índices dos textos) com dois ou mais membros
+        """
+        return self.group_shingles([shingle_hashes(text, self.shingle_size) for text in texts])
+
+    def group_shingles(self, shingle_sets: List[np.ndarray]) -> List[List[int]]:
+        """
+        Como `groups`, a partir dos hashes de shingles já calculados.
+
+        Args:
+            shingle_sets: Hashes dos shingles de cada texto
+
+        Returns:
+            Lista de grupos (índices) com dois ou mais membros
+        """
+        signatures = {}
+        for i, hashes in enumerate(shingle_sets):
+            if hashes.size:
+                signatures[i] = self.signature(hashes)
+
+        # Candidatos: itens que caem no mesmo balde em alguma banda
+        candidates = set()
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            start = band * self.rows
+            for i, sig in signatures.items():
+                buckets[sig[start:start + self.rows].tobytes()].append(i)
+            for members in buckets.values():
+                for j in range(1, len(members)):
+                    candidates.add((members[0], members[j]))
+
+        # Union-find dos pares confirmados pela similaridade estimada
+        parent = list(range(len(shingle_sets)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in candidates:
+            similarity = np.mean(signatures[i] == signatures[j])
+            if similarity >= self.threshold:
+                parent[find(j)] = find(i)
+
+        clusters = defaultdict(list)
+        for i in signatures:
+            clusters[find(i)].append(i)
+        return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+
+def _representative(group: List[Dict], policy: str, source_priority: List[str]) -> Dict:
+    """Escolhe o item que representa um grupo de quase-duplicatas."""
+    if policy == 'earliest':
+        return min(group, key=lambda it: str(it.get('published') or '9999'))
+    if policy == 'source_priority':
+        rank = {s.lower(): i for i, s in enumerate(source_priority)}
+        return min(group, key=lambda it: (rank.get(str(it.get('source', '')).lower(), len(rank)),
+                                          -len(item_body(it))))
+    return max(group, key=lambda it: len(item_body(it)))
+
+
+def remove_near_duplicates(items: List[Dict], config: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    """
+    Remove notícias quase duplicadas, inclusive entre fontes diferentes.
+
+    Compara título e corpo com MinHash/LSH e mantém um único representativo
+    por grupo, escolhido segundo a política configurada. O representativo
+    ocupa a posição do primeiro membro do grupo na lista original.
+
+    Args:
+        items: Lista de itens (já sem duplicatas exatas)
+        config: Seção `near_duplicates` da configuração (padrão: dedup.yaml)
+
+    Returns:
+        List[Dict]: Lista sem quase-duplicatas
+    """
+    if config is None:
+        config = load_config()['near_duplicates']
+    if not config.get('enabled', True) or len(items) < 2:
+        return items
+
+    lsh = MinHashLSH(
+        bands=config.get('bands', 16),
+        rows=config.get('rows', 4),
+        threshold=config.get('threshold', 0.6),
+        shingle_size=config.get('shingle_size', 3),
+    )
+    # Shingles das formas normalizadas, compartilhadas com os demais estágios
+    shingle_sets = [normalized(item).shingles(lsh.shingle_size) for item in items]
+
+    replacement = {}
+    dropped = set()
+    for group in lsh.group_shingles(shingle_sets):
+        members = [items[i] for i in group]
+        best = _representative(members, config.get('representative', 'longest'),
+                               config.get('source_priority', []))
+        replacement[group[0]] = best
+        dropped.update(group[1:])
+
+    return [replacement.get(i, item) for i, item in enumerate(items) if i not in dropped]
@@ -0,0 +1,139 @@
+"""
+Extração de tickers da B3 e empresas citadas nas notícias.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+from src.processor.normalize import normalized
+from src.processor.text import trie_pattern, fold, strip_accents
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'entities.yaml'
+
+# Ticker da B3: 4 letras + classe (3 ON, 4 PN, 5/6 PNA/PNB, 11 units), F = fracionário.
+# Raízes com dígito (B3SA3) só valem se estiverem em entities.yaml: o padrão
+# genérico aceitaria siglas como COP26
+TICKER_PATTERN = r'[A-Z]{4}(?:11|[3456])F?'
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = str(CONFIG_PATH)) -> Dict[str, Any]:
+    """
+    Carrega o dicionário de empresas, tickers e apelidos.
+
+    Args:
+        path: Caminho do arquivo YAML
+
+    Returns:
+        Dict: Configuração carregada
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+class EntityExtractor:
+    """
+    Extrator de tickers e empresas compilado uma única vez.
+
+    Tickers, apelidos sem distinção de maiúsculas e apelidos exatos formam
+    uma única expressão regular (os apelidos fatorados em trie), então o
+    texto é percorrido uma vez só. A busca ignora acentos.
+
+    Example:
+        >>> extractor = EntityExtractor({"Petrobras": {"tickers": ["PETR4"], "aliases": ["Petrobras"]}})
+        >>> extractor.extract("Petrobras sobe; VALE3 cai")
+        {'tickers': ['PETR4', 'VALE3'], 'companies': ['Petrobras']}
+    """
+
+    def __init__(self, companies: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            companies: Empresas por nome, com 'tickers', 'aliases' e 'exact_aliases'
+        """
+        self._aliases: Dict[str, str] = {}
+        self._exact: Dict[str, str] = {}
+        self._ticker_company: Dict[str, str] = {}
+        self._tickers: Dict[str, List[str]] = {}
+        for name, spec in (companies or {}).items():
+            spec = spec or {}
+            self._tickers[name] = [t.upper() for t in spec.get('tickers') or []]
+            for ticker in self._tickers[name]:
+                self._ticker_company[ticker] = name
+            for alias in spec.get('aliases') or []:
+                self._aliases.setdefault(fold(alias), name)
+            for alias in spec.get('exact_aliases') or []:
+                self._exact.setdefault(strip_accents(alias), name)
+
+        ticker_pattern = TICKER_PATTERN
+        if self._ticker_company:
+            ticker_pattern = f'{trie_pattern(self._ticker_company)}|{TICKER_PATTERN}'
+        branches = [rf'(?P<ticker>{ticker_pattern})']
+        if self._exact:
+            branches.append(rf'(?P<exact>{trie_pattern(self._exact)})')
+        if self._aliases:
+            branches.append(rf'(?i:(?P<alias>{trie_pattern(self._aliases)}))')
+        self._regex = re.compile(r'(?<!\w)(?:' + '|'.join(branches) + r')(?!\w)')
+
+    def extract(self, text: str, stripped: bool = False) -> Dict[str, List[str]]:
+        """
+        Encontra os tickers e as empresas citados no texto.
+
+        Um apelido associa também os tickers da empresa, e um ticker
+        conhecido associa a empresa.
+
+        Args:
+            text: Texto a ser analisado
+            stripped: True se o texto já passou por `strip_accents`
+
+        Returns:
+            Dict: 'tickers' e 'companies', sem repetições, na ordem de ocorrência
+        """
+        tickers: Dict[str, None] = {}
+        companies: Dict[str, None] = {}
+        if not stripped:
+            text = strip_accents(text or '')
+        for match in self._regex.finditer(text):
+            if match.group('ticker'):
+                ticker = match.group('ticker')
+                tickers[ticker] = None
+                if ticker in self._ticker_company:
+                    companies[self._ticker_company[ticker]] = None
+                continue
+            if match.lastgroup == 'exact':
+                name = self._exact[match.group('exact')]
+            else:
+                name = self._aliases[match.group('alias').lower()]
+            companies[name] = None
+            tickers.update(dict.fromkeys(self._tickers[name]))
+        return {'tickers': list(tickers), 'companies': list(companies)}
+
+    def extract_item(self, item: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Extrai as entidades do título e do corpo de um item."""
+        return self.extract(normalized(item).accentless, stripped=True)
+
+
+@lru_cache(maxsize=1)
+def get_extractor() -> EntityExtractor:
+    """Retorna o extrator compilado a partir de entities.yaml."""
+    return EntityExtractor(load_config().get('companies') or {})
+
+
+def process_items(items: List[Dict[str, Any]]) -> List[Dict[str, List[str]]]:
+    """
+    Extrai as entidades de uma lista de notícias e as grava em item['entities'].
+
+    Args:
+        items: Lista de notícias
+
+    Returns:
+        Lista com as entidades de cada item, na mesma ordem
+    """
+    extractor = get_extractor()
+    results = []
+    for item in items:
+        item['entities'] = extractor.extract_item(item)
+        results.append(item['entities'])
+    return results
@@ -0,0 +1,142 @@
+"""
+Resumo extrativo local (sem API), baseado em TextRank.
+"""
+import re
+from typing import List
+
+import numpy as np
+
+from src.processor.text import fold
+
+# Stopwords do português (já sem acentos, pois os termos passam por `fold`)
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele
+deles depois do dos e ela elas ele eles em entre era eram essa essas esse esses esta
+estao estas este estes eu foi foram ha isso isto ja la lhe lhes mais mas me mesmo meu
+minha muito na nao nas nem no nos nossa nosso num numa o os ou para pela pelas pelo
+pelos por qual quando que quem se sem ser sera seu seus sao so sua suas tambem te tem
+ter teve tinha um uma umas uns vai sobre ainda apos segundo disse afirmou
+""".split())
+
+# Quebra de sentença: pontuação final seguida de espaço e início de nova frase
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+(?=["“(]?[A-ZÀ-Ý0-9])')
+
+# Abreviações comuns que não encerram sentença
+_ABBREVIATIONS = frozenset(('sr.', 'sra.', 'dr.', 'dra.', 'prof.', 'jan.', 'fev.', 'mar.', 'abr.',
+                            'jun.', 'jul.', 'ago.', 'set.', 'out.', 'nov.', 'dez.', 'etc.', 'p.', 'n.'))
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Divide um texto em sentenças.
+
+    Args:
+        text: Texto sem HTML
+
+    Returns:
+        Lista de sentenças, sem espaços extras
+    """
+    text = re.sub(r'\s+', ' ', text).strip()
+    if not text:
+        return []
+    sentences: List[str] = []
+    for piece in _SENTENCE_BREAK.split(text):
+        if sentences and sentences[-1].split()[-1].lower() in _ABBREVIATIONS:
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def folded_terms(folded: str) -> List[str]:
+    """Termos relevantes de um texto já normalizado com `fold` (sem stopwords)."""
+    return [w for w in re.findall(r'\w+', folded)
+            if len(w) > 2 and w not in STOPWORDS and not w.isdigit()]
+
+
+def sentence_terms(sentence: str) -> List[str]:
+    """Termos relevantes de uma sentença (sem acentos e sem stopwords)."""
+    return folded_terms(fold(sentence))
+
+
+def textrank(sentences: List[str], damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """
+    Pontua as sentenças por centralidade (TextRank) sobre vetores TF-IDF.
+
+    Args:
+        sentences: Lista de sentenças
+        damping: Fator de amortecimento do PageRank
+        iterations: Número máximo de iterações do método da potência
+
+    Returns:
+        np.ndarray: Pontuação de cada sentença (soma 1)
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+
+    terms = [sentence_terms(s) for s in sentences]
+    vocabulary = {t: i for i, t in enumerate(sorted({t for ts in terms for t in ts}))}
+    if not vocabulary:
+        return np.full(n, 1.0 / n)
+
+    # Matriz termo-frequência (sentenças x vocabulário) ponderada por IDF
+    tf = np.zeros((n, len(vocabulary)))
+    for row, ts in enumerate(terms):
+        for t in ts:
+            tf[row, vocabulary[t]] += 1
+    df = np.count_nonzero(tf, axis=0)
+    vectors = tf * (np.log((1 + n) / (1 + df)) + 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    # Grafo de similaridade de cosseno, normalizado por linha
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n),
+                           where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores / scores.sum()
+
+
+def summarise_extractive(text: str, max_sentences: int = 2, max_chars: int = 400) -> str:
+    """
+    Gera um resumo com as sentenças mais centrais do texto, na ordem original.
+
+    Args:
+        text: Texto sem HTML
+        max_sentences: Número máximo de sentenças no resumo
+        max_chars: Tamanho máximo do resumo
+
+    Returns:
+        str: Resumo extrativo
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return ''
+    if len(sentences) <= max_sentences:
+        chosen = sentences
+    else:
+        scores = textrank(sentences)
+        # Pequeno viés para o início do texto, onde está o lide
+        scores = scores * (1.0 + 0.1 / (1.0 + np.arange(len(sentences))))
+        top = sorted(np.argsort(-scores, kind='stable')[:max_sentences])
+        chosen = [sentences[i] for i in top]
+
+    summary = ''
+    for sentence in chosen:
+        candidate = f"{summary} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        summary = candidate
+    if not summary:
+        summary = chosen[0][:max_chars].rstrip() + '...'
+    return summary
@@ -0,0 +1,160 @@
+"""
+Formas normalizadas do texto de cada notícia, calculadas uma vez e compartilhadas pelos estágios.
+"""
+import hashlib
+import re
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+from bs4 import BeautifulSoup
+
+from src.article import Article
+from src.processor.extractive import folded_terms
+from src.processor.text import fold, strip_accents
+
+_TAG = re.compile(r'<[a-zA-Z/!][^>]*>')
+_SPACES = re.compile(r'\s+')
+_WORD = re.compile(r'\w+')
+
+
+def item_body(item: Dict) -> str:
+    """Retorna o corpo do item (conteúdo, resumo ou descrição, o que existir)."""
+    return item.get('content') or item.get('summary') or item.get('description') or ''
+
+
+def plain_text(text: str) -> str:
+    """
+    Remove tags HTML e espaços extras.
+
+    O parser de HTML só é usado quando o texto contém tags, o que evita uma
+    passada completa nos textos que os coletores já entregam limpos.
+    """
+    if not text:
+        return ''
+    if _TAG.search(text):
+        text = BeautifulSoup(text, 'html.parser').get_text()
+    return _SPACES.sub(' ', text).strip()
+
+
+def word_shingles(words: List[str], size: int = 3) -> np.ndarray:
+    """
+    Calcula os hashes dos shingles de uma lista de palavras.
+
+    Args:
+        words: Palavras já normalizadas
+        size: Número de palavras por shingle
+
+    Returns:
+        np.ndarray: Hashes distintos (uint64) dos shingles
+    """
+    if len(words) < size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    hashes = {zlib.crc32(s.encode('utf-8')) for s in shingles}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+class TextForms:
+    """
+    Formas canônicas do texto de uma notícia.
+
+    Só as formas compactas ficam guardadas: título, termos do título,
+    shingles e o hash do conteúdo. As formas do corpo inteiro (texto limpo, minúsculas,
+    tokens) são recalculadas a cada acesso a partir do item, para que um
+    corpo gravado em disco pelo `Article` não volte a ocupar memória pelo
+    resto da execução. Use `normalized(item)` para obter as formas já
+    associadas ao item em vez de criar uma instância nova.
+    """
+
+    __slots__ = ('title', '_item', '_cache')
+
+    def __init__(self, item: Dict[str, Any]):
+        self.title = plain_text(str(item.get('title') or ''))
+        self._item = item
+        self._cache: Dict[Any, Any] = {}
+
+    def _get(self, key: Any, compute) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def body(self) -> str:
+        """Corpo limpo (recalculado a cada acesso)."""
+        return plain_text(item_body(self._item))
+
+    @property
+    def text(self) -> str:
+        """Título e corpo limpos, separados por espaço."""
+        return f"{self.title} {self.body}".strip()
+
+    @property
+    def folded(self) -> str:
+        """Título e corpo em minúsculas e sem acentos."""
+        return fold(self.text)
+
+    @property
+    def folded_title(self) -> str:
+        return self._get('folded_title', lambda: fold(self.title))
+
+    @property
+    def folded_body(self) -> str:
+        return fold(self.body)
+
+    @property
+    def accentless(self) -> str:
+        """Título e corpo sem acentos, preservando maiúsculas."""
+        return strip_accents(f"{self.title}\n{self.body}")
+
+    @property
+    def tokens(self) -> List[str]:
+        """Palavras do texto normalizado."""
+        return _WORD.findall(self.folded)
+
+    @property
+    def digest(self) -> str:
+        """Hash SHA256 do texto normalizado (ver `content_hash`)."""
+        return self._get('digest', lambda: hashlib.sha256(self.folded.encode('utf-8')).hexdigest())
+
+    @property
+    def title_terms(self) -> List[str]:
+        """Termos relevantes do título (sem stopwords, números e palavras curtas)."""
+        return self._get('title_terms', lambda: folded_terms(self.folded_title))
+
+    @property
+    def body_terms(self) -> List[str]:
+        """Termos relevantes do corpo (recalculados a cada acesso)."""
+        return folded_terms(self.folded_body)
+
+    def shingles(self, size: int = 3) -> np.ndarray:
+        """Hashes dos shingles de `size` palavras do texto normalizado."""
+        return self._get(('shingles', size), lambda: word_shingles(self.tokens, size))
+
+    def folded_field(self, item: Dict[str, Any], name: str) -> str:
+        """Um campo qualquer do item, em minúsculas e sem acentos (só o título fica guardado)."""
+        if name == 'title':
+            return self.folded_title
+        return fold(str(item.get(name) or ''))
+
+
+def normalized(item: Dict[str, Any]) -> TextForms:
+    """
+    Formas normalizadas do texto de um item.
+
+    Em um `Article`, as formas ficam associadas ao item e são descartadas
+    quando o título ou o corpo mudam. Um dicionário simples recebe formas
+    novas a cada chamada, sem cache entre os estágios: o pipeline converte
+    os itens coletados em `Article` antes de normalizá-los.
+
+    Example:
+        >>> forms = normalized(article)
+        >>> forms.folded_title, forms.shingles(3)
+    """
+    if isinstance(item, Article):
+        forms = item.text_forms
+        if forms is None:
+            forms = item.text_forms = TextForms(item)
+        return forms
+    return TextForms(item)
@@ -1,50 +1,207 @@
-from typing import Dict, Any
-import openai
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+import yaml
+
+from src.processor.text import KeywordMatcher, fold
+from src.processor.normalize import normalized
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'relevance.yaml'
+PROFILES_PATH = Path(__file__).parent.parent / 'config' / 'profiles.yaml'
+
+# Campos de pontuação que um perfil pode sobrescrever
+SCORING_KEYS = ('base_score', 'fields', 'max_keyword_bonus', 'keywords', 'recency')
+
+SECONDS_PER_DAY = 86400.0
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = str(CONFIG_PATH)) -> Dict[str, Any]:
+    """
+    Carrega a configuração de relevância (palavras-chave, pesos e recência).
+
+    Args:
+        path: Caminho do arquivo YAML
+
+    Returns:
+        Dict: Configuração carregada
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+@lru_cache(maxsize=None)
+def load_profiles(path: str = str(PROFILES_PATH)) -> Dict[str, Dict[str, Any]]:
+    """
+    Carrega os perfis de audiência.
+
+    Args:
+        path: Caminho do arquivo YAML
+
+    Returns:
+        Dict: Perfis por nome
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f).get('profiles') or {}
+
+
+def parse_timestamp(value: Any) -> float:
+    """
+    Converte uma data ISO 8601 em timestamp POSIX.
+    Datas sem fuso horário são tratadas como UTC.
+
+    Returns:
+        float: Timestamp em segundos ou NaN se a data for inválida
+    """
+    if not value or not isinstance(value, str):
+        return float('nan')
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return float('nan')
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class RelevanceScorer:
+    """
+    Pontuador de relevância em lote.
+
+    As palavras-chave são compiladas uma única vez em um `KeywordMatcher`,
+    e a recência é calculada com NumPy sobre um único instante de referência.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.base_score = float(config.get('base_score', 3.0))
+        self.fields = list(config.get('fields', ['title', 'description']))
+        self.max_keyword_bonus = float(config.get('max_keyword_bonus', 1.0))
+        self.weights = {fold(k): float(v) for k, v in (config.get('keywords') or {}).items()}
+        self.matcher = KeywordMatcher(self.weights)
+        self.recency = config.get('recency') or {}
+
+    def keyword_bonus(self, items: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Soma dos pesos das palavras-chave distintas encontradas em cada item.
+
+        Os textos de todos os itens são concatenados e percorridos pelo
+        casador uma única vez; cada ocorrência é atribuída ao seu item pela
+        posição no texto concatenado.
+        """
+        texts = [' '.join(normalized(item).folded_field(item, field) for field in self.fields)
+                 for item in items]
+        starts = np.cumsum([0] + [len(t) + 1 for t in texts[:-1]])
+        hits = self.matcher.scan('\n'.join(texts), folded=True)
+        if not hits:
+            return np.zeros(len(items))
+
+        keys = list(self.weights)
+        column = {k: i for i, k in enumerate(keys)}
+        positions = np.fromiter((pos for pos, _ in hits), dtype=np.int64, count=len(hits))
+        kw_index = np.fromiter((column[fold(k)] for _, k in hits), dtype=np.int64, count=len(hits))
+        item_index = np.searchsorted(starts, positions, side='right') - 1
+
+        # Cada palavra-chave conta uma única vez por item
+        pairs = np.unique(item_index * len(keys) + kw_index)
+        weights = np.array([self.weights[k] for k in keys])
+        totals = np.bincount(pairs // len(keys), weights=weights[pairs % len(keys)],
+                             minlength=len(items))
+        return np.minimum(totals, self.max_keyword_bonus)
+
+    def recency_bonus(self, items: Sequence[Dict[str, Any]], now: datetime) -> np.ndarray:
+        """Ajuste de recência de cada item em relação a `now`."""
+        published = np.array([parse_timestamp(item.get('published')) for item in items],
+                             dtype=float)
+        with np.errstate(invalid='ignore'):
+            days_old = np.floor((now.timestamp() - published) / SECONDS_PER_DAY)
+
+        r = self.recency
+        return np.select(
+            [
+                days_old <= r.get('fresh_days', 1),
+                days_old <= r.get('recent_days', 3),
+                days_old >= r.get('stale_days', 7),
+            ],
+            [
+                r.get('fresh_bonus', 1.0),
+                r.get('recent_bonus', 0.5),
+                -r.get('stale_penalty', 1.0),
+            ],
+            default=0.0,
+        )
+
+    def score(self, items: Sequence[Dict[str, Any]], now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Calcula a relevância de todos os itens de uma vez.
+
+        Args:
+            items: Itens de notícia
+            now: Instante de referência (padrão: agora, em UTC)
+
+        Returns:
+            np.ndarray: Pontuações entre 0 e 5, na ordem dos itens
+        """
+        if not items:
+            return np.zeros(0)
+        if now is None:
+            now = datetime.now(timezone.utc)
+        elif now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+
+        scores = self.base_score + self.recency_bonus(items, now) + self.keyword_bonus(items)
+        return np.clip(scores, 0.0, 5.0)
+
+
+@lru_cache(maxsize=None)
+def get_scorer(path: str = str(CONFIG_PATH)) -> RelevanceScorer:
+    """Retorna o pontuador compilado para o arquivo de configuração."""
+    return RelevanceScorer(load_config(path))
+
+
+@lru_cache(maxsize=None)
+def get_profile_scorer(profile: str) -> RelevanceScorer:
+    """
+    Retorna o pontuador de um perfil de audiência.
+
+    Os campos de pontuação do perfil sobrescrevem os de relevance.yaml.
+
+    Raises:
+        ValueError: Se o perfil não existir
+    """
+    profiles = load_profiles()
+    if profile not in profiles:
+        raise ValueError(f"Perfil '{profile}' não encontrado. Disponíveis: {', '.join(profiles)}")
+    overrides = {k: v for k, v in profiles[profile].items() if k in SCORING_KEYS}
+    return RelevanceScorer({**load_config(), **overrides})
+
+
+def process_items(items: List[Dict[str, Any]], now: Optional[datetime] = None,
+                  profile: Optional[str] = None) -> List[float]:
+    """
+    Calcula a relevância de uma lista de notícias em lote.
+
+    Args:
+        items: Lista de itens de notícia
+        now: Instante de referência para a recência (padrão: agora)
+        profile: Perfil de audiência (padrão: configuração geral de relevance.yaml)
+
+    Returns:
+        List[float]: Pontuações entre 0 e 5, na ordem dos itens
+    """
+    scorer = get_profile_scorer(profile) if profile else get_scorer()
+    return scorer.score(items, now).tolist()
+
 
 def process_item(item: Dict[str, Any]) -> float:
     """
     Processa um item de notícia e retorna uma pontuação de relevância.
-    
+
     Args:
         item: Dicionário contendo informações da notícia (título, descrição, etc.)
-    
+
     Returns:
         float: Pontuação de relevância entre 0 e 5
     """
-    # Combina título e descrição para análise
-    content = f"{item.get('title', '')} {item.get('description', '')}"
-    
-    # Critérios de relevância
-    relevance_score = 3.0  # Pontuação base
-    
-    # Verifica a data de publicação (notícias mais recentes são mais relevantes)
-    pub_date = item.get('published')
-    if pub_date:
-        try:
-            pub_date = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
-            days_old = (now - pub_date).days
-            
-            if days_old <= 1:
-                relevance_score += 1.0
-            elif days_old <= 3:
-                relevance_score += 0.5
-            elif days_old >= 7:
-                relevance_score -= 1.0
-        except (ValueError, TypeError):
-            pass
-    
-    # Palavras-chave que aumentam a relevância
-    keywords = [
-        'mercado', 'investimento', 'economia', 'bolsa',
-        'ações', 'dólar', 'ibovespa', 'análise',
-        'tendência', 'oportunidade', 'risco'
-    ]
-    
-    content_lower = content.lower()
-    keyword_matches = sum(1 for keyword in keywords if keyword in content_lower)
-    relevance_score += min(keyword_matches * 0.2, 1.0)
-    
-    # Garante que a pontuação está entre 0 e 5
-    return max(0.0, min(5.0, relevance_score)) 
\ No newline at end of file
+    return process_items([item])[0]
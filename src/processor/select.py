@@ -0,0 +1,47 @@
+import heapq
+from typing import List, Dict, Optional
+
+
+def select_top_k(items: List[Dict], k: int, key: str = 'relevance',
+                 per_source: Optional[int] = None) -> List[Dict]:
+    """
+    Seleciona os k itens de maior pontuação antes das etapas caras (resumo, classificação).
+
+    Usa um heap sobre todos os itens, então o custo é O(n + k log n). Empates
+    são resolvidos pela ordem original dos itens.
+
+    Args:
+        items: Itens já pontuados
+        k: Número máximo de itens a manter
+        key: Campo com a pontuação de cada item
+        per_source: Máximo de itens por fonte, para manter a diversidade (opcional)
+
+    Returns:
+        List[Dict]: Itens selecionados, em ordem decrescente de pontuação
+
+    Example:
+        >>> items = [{"relevance": 3.0, "source": "a"}, {"relevance": 4.5, "source": "a"},
+        ...          {"relevance": 4.0, "source": "b"}]
+        >>> [it["relevance"] for it in select_top_k(items, 2, per_source=1)]
+        [4.5, 4.0]
+    """
+    if k <= 0:
+        return []
+    if per_source is None:
+        # nsmallest equivale a sorted(...)[:k], que é estável para empates
+        return heapq.nsmallest(k, items, key=lambda item: -(item.get(key) or 0))
+
+    heap = [(-(item.get(key) or 0), i) for i, item in enumerate(items)]
+    heapq.heapify(heap)
+
+    selected = []
+    per_source_count: Dict[str, int] = {}
+    while heap and len(selected) < k:
+        _, i = heapq.heappop(heap)
+        source = items[i].get('source', '')
+        if per_source_count.get(source, 0) >= per_source:
+            continue
+        per_source_count[source] = per_source_count.get(source, 0) + 1
+        selected.append(items[i])
+    return selected
+
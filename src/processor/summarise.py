@@ -1,13 +1,17 @@
 import os
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from typing import Optional
-from bs4 import BeautifulSoup
-import re
+from src.llm import chat_completion
+from src.processor.extractive import summarise_extractive
+from src.processor.normalize import normalized, plain_text
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
 
+# Roteamento: apenas textos longos e relevantes são resumidos pela API
+LLM_MIN_CHARS = 1200
+LLM_MIN_RELEVANCE = 3.5
+
 def extract_first_paragraph(text: str, max_chars: int = 300) -> str:
     """
     Extrai o primeiro parágrafo relevante do texto.
@@ -20,12 +24,8 @@ def extract_first_paragraph(text: str, max_chars: int = 300) -> str:
     Returns:
         Primeiro parágrafo do texto, limitado a max_chars
     """
-    # Remove tags HTML
-    soup = BeautifulSoup(text, 'html.parser')
-    text = soup.get_text()
-    
-    # Remove espaços extras e quebras de linha
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Remove tags HTML, espaços extras e quebras de linha
+    text = plain_text(text)
     
     # Pega o primeiro parágrafo não vazio
     paragraphs = [p.strip() for p in text.split('.') if p.strip()]
@@ -35,10 +35,37 @@ def extract_first_paragraph(text: str, max_chars: int = 300) -> str:
     first_par = paragraphs[0] + '.'
     return first_par[:max_chars] + '...' if len(first_par) > max_chars else first_par
 
+def summarise_local(text: str) -> str:
+    """
+    Gera um resumo localmente, sem chamar a API.
+    Usa o resumo extrativo (TextRank) e, se não houver sentenças, o primeiro parágrafo.
+    
+    Args:
+        text: Texto a ser resumido (pode conter HTML)
+        
+    Returns:
+        str: Resumo extrativo
+    """
+    return summarise_extractive(plain_text(text)) or extract_first_paragraph(text)
+
+def should_use_llm(item: dict, text: str) -> bool:
+    """
+    Decide se o item merece um resumo via API.
+    Itens curtos ou pouco relevantes recebem o resumo extrativo local.
+    
+    Args:
+        item: Dicionário contendo informações da notícia
+        text: Texto que seria resumido
+        
+    Returns:
+        bool: True se o resumo deve ser gerado pela API
+    """
+    return len(text) >= LLM_MIN_CHARS and item.get('relevance', 0) >= LLM_MIN_RELEVANCE
+
 async def summarise(text: str, url: str) -> str:
     """
     Gera um resumo conciso de 2-3 linhas em português do texto fornecido.
-    Se a chave da API OpenAI não estiver disponível, extrai o primeiro parágrafo.
+    Se a chave da API OpenAI não estiver disponível, usa o resumo extrativo local.
     
     Args:
         text (str): Texto a ser resumido
@@ -52,15 +79,11 @@ async def summarise(text: str, url: str) -> str:
     """
     # Se não houver chave da API, usa o método alternativo
     if not os.getenv("OPENAI_API_KEY"):
-        return extract_first_paragraph(text)
+        return summarise_local(text)
     
     try:
-        # Inicializa o cliente OpenAI
-        client = AsyncOpenAI()
-        
         # Limita o texto a 4000 caracteres se necessário
-        if len(text) > 4000:
-            text = text[-4000:]
+        prompt_text = text[-4000:] if len(text) > 4000 else text
         
         # Define o prompt do sistema e do usuário
         system_prompt = "Você é analista da Alta Vista Investimentos."
@@ -70,11 +93,11 @@ async def summarise(text: str, url: str) -> str:
         
         Fonte: {url}
         
-        Texto: {text}
+        Texto: {prompt_text}
         """
         
-        # Faz a chamada para a API
-        response = await client.chat.completions.create(
+        # Faz a chamada para a API (respeitando o limite de taxa compartilhado)
+        response = await chat_completion(
             model="gpt-4-0125-preview",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -89,21 +112,31 @@ async def summarise(text: str, url: str) -> str:
     except Exception as e:
         print(f"Erro ao gerar resumo via OpenAI: {e}")
         # Em caso de erro, usa o método alternativo
-        return extract_first_paragraph(text)
+        return summarise_local(text)
 
-async def process_item(item: dict) -> str:
+async def process_item(item: dict, use_llm: bool = True) -> str:
     """
     Processa um item de notícia e retorna um resumo.
+    Itens curtos ou pouco relevantes são resumidos localmente (ver `should_use_llm`).
     
     Args:
         item: Dicionário contendo informações da notícia
+        use_llm: Se False, usa sempre o resumo local sem chamar a API
         
     Returns:
         str: Resumo da notícia
     """
-    # Combina título e conteúdo para o resumo
-    content = f"{item.get('title', '')} {item.get('content', '')}"
+    # Combina título e conteúdo (já limpos) para o resumo
+    forms = normalized(item)
+    title, body = forms.title, forms.body
+    # Garante que o título forme uma sentença própria para o resumo extrativo
+    if title and body and not title.endswith(('.', '!', '?')):
+        title += '.'
+    content = f"{title} {body}".strip()
     url = item.get('url', '')
     
+    if not use_llm or not should_use_llm(item, body):
+        return summarise_local(content)
+    
     # Gera o resumo
-    return await summarise(content, url) 
\ No newline at end of file
+    return await summarise(content, url)
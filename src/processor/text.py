@@ -0,0 +1,130 @@
+"""
+Utilitários de texto compartilhados pelos processadores.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def strip_accents(text: str) -> str:
+    """
+    Remove acentos preservando maiúsculas ("Itaú" -> "Itau").
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto sem diacríticos
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def fold(text: str) -> str:
+    """
+    Converte o texto para minúsculas e remove acentos.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto em minúsculas sem diacríticos ("Ações" -> "acoes")
+    """
+    return strip_accents(text.lower()) if text else ""
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Monta uma expressão regular a partir de uma trie das palavras.
+
+    Prefixos comuns são fatorados ("acao|acoes" -> "ac(?:ao|oes)"), de modo
+    que o motor de regex percorre o texto uma única vez sem testar cada
+    alternativa do início.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Casador de múltiplas palavras-chave compilado uma única vez.
+
+    As palavras são normalizadas com `fold`, então a busca é insensível a
+    acentos e maiúsculas, e só casa palavras inteiras.
+
+    Example:
+        >>> matcher = KeywordMatcher(["ações", "bolsa"])
+        >>> matcher.find("Acoes sobem na Bolsa")
+        ['ações', 'bolsa']
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._canonical: Dict[str, str] = {}
+        for keyword in keywords:
+            folded = fold(keyword).strip()
+            if folded:
+                self._canonical.setdefault(folded, keyword)
+
+        if self._canonical:
+            self._regex = re.compile(
+                r'(?<!\w)(' + trie_pattern(self._canonical) + r')(?!\w)'
+            )
+        else:
+            self._regex = None
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def find(self, text: str, folded: bool = False) -> List[str]:
+        """
+        Retorna as palavras-chave encontradas no texto, na ordem de ocorrência.
+
+        Args:
+            text: Texto a ser analisado
+            folded: True se o texto já passou por `fold`
+
+        Returns:
+            Lista de palavras-chave (na grafia original da configuração)
+        """
+        if self._regex is None or not text:
+            return []
+        if not folded:
+            text = fold(text)
+        return [self._canonical[m.group(1)] for m in self._regex.finditer(text)]
+
+    def scan(self, text: str, folded: bool = False) -> List[Tuple[int, str]]:
+        """
+        Como `find`, mas retorna também a posição de cada ocorrência.
+
+        Returns:
+            Lista de tuplas (posição no texto normalizado, palavra-chave)
+        """
+        if self._regex is None or not text:
+            return []
+        if not folded:
+            text = fold(text)
+        return [(m.start(), self._canonical[m.group(1)]) for m in self._regex.finditer(text)]
+
+    def find_unique(self, text: str, folded: bool = False) -> List[str]:
+        """Como `find`, mas sem repetições."""
+        return list(dict.fromkeys(self.find(text, folded=folded)))
+
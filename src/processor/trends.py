@@ -0,0 +1,244 @@
+"""
+Detecção contínua de tendências e picos de termos e entidades entre execuções.
+"""
+import hashlib
+import os
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import yaml
+
+from src.processor.normalize import normalized
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'trends.yaml'
+
+SECONDS_PER_HOUR = 3600.0
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = str(CONFIG_PATH)) -> Dict[str, Any]:
+    """
+    Carrega a configuração de tendências.
+
+    Args:
+        path: Caminho do arquivo YAML
+
+    Returns:
+        Dict: Configuração carregada
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def item_terms(item: Dict[str, Any]) -> List[str]:
+    """
+    Termos acompanhados de um item: tickers, empresas e termos do título.
+
+    Cada termo conta uma vez por item, então a contagem é o número de
+    notícias que o citam.
+    """
+    entities = item.get('entities') or {}
+    terms = [f"${ticker}" for ticker in entities.get('tickers', [])]
+    terms += [f"@{company}" for company in entities.get('companies', [])]
+    words = normalized(item).title_terms
+    terms += words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return list(dict.fromkeys(terms))
+
+
+class CountMinSketch:
+    """
+    Count-min sketch com contadores em ponto flutuante, para decaimento exponencial.
+
+    A estimativa nunca fica abaixo da contagem real; o excesso é limitado
+    pela largura da tabela.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4, table: Optional[np.ndarray] = None):
+        """
+        Args:
+            width: Contadores por linha
+            depth: Número de linhas (funções de hash)
+            table: Tabela já preenchida, ao restaurar um estado salvo
+        """
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width))
+
+    def _columns(self, keys: List[str]) -> np.ndarray:
+        """Colunas de cada chave em cada linha (depth x len(keys)), por hashing duplo."""
+        digests = [hashlib.blake2b(k.encode('utf-8'), digest_size=16).digest() for k in keys]
+        h1 = np.array([int.from_bytes(d[:8], 'little') for d in digests], dtype=np.uint64)
+        h2 = np.array([int.from_bytes(d[8:], 'little') | 1 for d in digests], dtype=np.uint64)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, keys: List[str], amount: float = 1.0) -> None:
+        """Soma `amount` à contagem de cada chave (repetições contam de novo)."""
+        if keys:
+            columns = self._columns(keys)
+            np.add.at(self.table, (np.arange(self.depth)[:, None], columns), amount)
+
+    def estimate(self, keys: List[str]) -> np.ndarray:
+        """Contagem estimada de cada chave."""
+        if not keys:
+            return np.zeros(0)
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def decay(self, factor: float) -> None:
+        """Multiplica todas as contagens por `factor`."""
+        self.table *= factor
+
+
+class TrendTracker:
+    """
+    Acompanha a frequência de termos ao longo do tempo e aponta picos.
+
+    Duas contagens com decaimento exponencial são mantidas em count-min
+    sketches: uma janela recente (meia-vida curta) e uma linha de base
+    (meia-vida longa). Para um termo com frequência estável, a contagem
+    recente fica em torno de `baseline * short / long`; um pico é um termo
+    cuja contagem recente supera essa expectativa por `burst_ratio`.
+    Apenas os `max_candidates` termos mais frequentes na janela recente são
+    lembrados pelo nome, então a memória é constante qualquer que seja o
+    histórico ingerido. O estado é salvo em um arquivo `.npz`.
+
+    Example:
+        >>> tracker = TrendTracker.load("data/trends.npz")
+        >>> tracker.observe(items)
+        >>> tracker.bursts()[:5]
+        >>> tracker.save()
+    """
+
+    def __init__(self, state_path: str = "data/trends.npz", width: int = 4096, depth: int = 4,
+                 short_half_life_hours: float = 6.0, long_half_life_hours: float = 96.0,
+                 max_candidates: int = 500, min_count: float = 3.0, burst_ratio: float = 3.0):
+        """
+        Args:
+            state_path: Arquivo onde o estado é salvo
+            width, depth: Dimensões dos count-min sketches
+            short_half_life_hours: Meia-vida da janela recente
+            long_half_life_hours: Meia-vida da linha de base
+            max_candidates: Termos acompanhados pelo nome
+            min_count: Contagem recente mínima para um pico
+            burst_ratio: Razão mínima entre a contagem recente e a esperada
+        """
+        self.state_path = state_path
+        self.short_half_life = short_half_life_hours * SECONDS_PER_HOUR
+        self.long_half_life = long_half_life_hours * SECONDS_PER_HOUR
+        self.max_candidates = max_candidates
+        self.min_count = min_count
+        self.burst_ratio = burst_ratio
+        self.recent = CountMinSketch(width, depth)
+        self.baseline = CountMinSketch(width, depth)
+        self.candidates: Dict[str, float] = {}
+        self.updated: Optional[float] = None
+
+    @classmethod
+    def load(cls, state_path: str = "data/trends.npz", **kwargs: Any) -> "TrendTracker":
+        """
+        Restaura o estado salvo, ou cria um acompanhamento vazio.
+
+        Um estado salvo com outras dimensões de sketch é descartado.
+        """
+        tracker = cls(state_path, **kwargs)
+        if not os.path.exists(state_path):
+            return tracker
+        with np.load(state_path, allow_pickle=False) as state:
+            if state['recent'].shape != tracker.recent.table.shape:
+                print(f"⚠️ Estado de tendências em {state_path} tem outras dimensões; recomeçando")
+                return tracker
+            tracker.recent.table = state['recent']
+            tracker.baseline.table = state['baseline']
+            tracker.candidates = dict(zip(state['terms'].tolist(), state['counts'].tolist()))
+            tracker.updated = float(state['updated'])
+        return tracker
+
+    def save(self) -> None:
+        """Grava o estado de forma atômica (arquivo temporário + rename)."""
+        Path(self.state_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp.npz"
+        terms = list(self.candidates)
+        np.savez_compressed(
+            tmp_path, recent=self.recent.table, baseline=self.baseline.table,
+            terms=np.array(terms, dtype=str), counts=np.array([self.candidates[t] for t in terms]),
+            updated=np.float64(self.updated if self.updated is not None else time.time()))
+        os.replace(tmp_path, self.state_path)
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """Aplica o decaimento do tempo decorrido desde a última atualização."""
+        now = time.time() if now is None else now
+        if self.updated is not None and now > self.updated:
+            elapsed = now - self.updated
+            short = 0.5 ** (elapsed / self.short_half_life)
+            self.recent.decay(short)
+            self.baseline.decay(0.5 ** (elapsed / self.long_half_life))
+            self.candidates = {t: c * short for t, c in self.candidates.items()}
+        self.updated = now if self.updated is None else max(self.updated, now)
+
+    def observe(self, items: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """
+        Conta os termos de novos itens.
+
+        Args:
+            items: Notícias recebidas
+            now: Instante da observação (timestamp POSIX; padrão: agora)
+
+        Returns:
+            int: Número de ocorrências de termos contadas
+        """
+        self.advance(now)
+        terms = [term for item in items for term in item_terms(item)]
+        if not terms:
+            return 0
+        self.recent.add(terms)
+        self.baseline.add(terms)
+
+        unique = list(dict.fromkeys(terms))
+        for term, count in zip(unique, self.recent.estimate(unique).tolist()):
+            self.candidates[term] = count
+        if len(self.candidates) > self.max_candidates:
+            keep = sorted(self.candidates, key=self.candidates.get, reverse=True)[:self.max_candidates]
+            self.candidates = {t: self.candidates[t] for t in keep}
+        return len(terms)
+
+    def bursts(self, limit: int = 20, pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Termos em pico, do mais forte para o mais fraco.
+
+        Args:
+            limit: Número máximo de termos
+            pattern: Expressão regular para filtrar os termos (ex: r'^\\$' para tickers)
+
+        Returns:
+            Lista de dicionários com 'term', 'count', 'expected' e 'ratio'
+        """
+        terms = [t for t in self.candidates if pattern is None or re.search(pattern, t)]
+        if not terms:
+            return []
+        recent = self.recent.estimate(terms)
+        # Contagem recente esperada para um termo com frequência estável
+        expected = self.baseline.estimate(terms) * (self.short_half_life / self.long_half_life)
+        ratio = recent / np.maximum(expected, 1.0)
+        mask = (recent >= self.min_count) & (ratio >= self.burst_ratio)
+        order = np.argsort(-ratio[mask], kind='stable')[:limit]
+        indices = np.flatnonzero(mask)[order]
+        return [{'term': terms[i], 'count': float(recent[i]), 'expected': float(expected[i]),
+                 'ratio': float(ratio[i])} for i in indices]
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Termos mais frequentes na janela recente."""
+        terms = sorted(self.candidates, key=self.candidates.get, reverse=True)[:limit]
+        return [{'term': t, 'count': self.candidates[t]} for t in terms]
+
+
+def open_tracker() -> Optional[TrendTracker]:
+    """Restaura o acompanhamento de tendências, se habilitado em trends.yaml."""
+    config = dict(load_config().get('trends') or {})
+    if not config.pop('enabled', True):
+        return None
+    return TrendTracker.load(**config)
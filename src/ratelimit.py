@@ -0,0 +1,179 @@
+"""
+Módulo para limitar a taxa de chamadas à API de LLM em todo o processo.
+"""
+import asyncio
+import re
+import time
+from typing import Dict, List, Mapping, Optional
+from weakref import WeakKeyDictionary
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Converte as durações dos cabeçalhos de rate limit em segundos.
+
+    Aceita números simples ("20", "0.5") e o formato da OpenAI ("6m0s", "1s", "20ms").
+
+    Returns:
+        float: Duração em segundos, ou None se o valor for inválido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if not parts:
+        return None
+    units = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+    return sum(float(n) * units[u] for n, u in parts)
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: Optional[int] = None) -> int:
+    """
+    Estima os tokens de uma chamada (prompt + resposta máxima).
+
+    Usa a aproximação de ~4 caracteres por token, suficiente para o controle
+    de vazão; o valor é corrigido pelo uso real informado pela API.
+    """
+    chars = sum(len(str(m.get('content') or '')) for m in messages)
+    return chars // 4 + (max_tokens or 256)
+
+
+class _Bucket:
+    """Balde de fichas reabastecido continuamente até `capacity` por minuto."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+
+def _exhausted(headers: Mapping[str, str], kind: str) -> bool:
+    """Verifica se o cabeçalho `x-ratelimit-remaining-<kind>` indica o limite esgotado."""
+    try:
+        return float(headers.get(f'x-ratelimit-remaining-{kind}', 'nan')) <= 0
+    except ValueError:
+        return False
+
+
+class RateLimiter:
+    """
+    Limitador por requisições e tokens por minuto, compartilhado por todas as chamadas.
+
+    Os chamadores são atendidos em ordem de chegada (fila justa). O orçamento
+    se ajusta aos cabeçalhos `x-ratelimit-*` devolvidos pela API, e um 429
+    pausa todos os chamadores pelo tempo indicado em vez de deixá-los falhar.
+
+    Example:
+        >>> limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=30000)
+        >>> await limiter.acquire(tokens=1200)  # doctest: +SKIP
+    """
+
+    # Fração dos limites informados pela API efetivamente usada
+    SAFETY_FACTOR = 0.95
+    # Pausa máxima sem retry-after explícito (backoff e cabeçalhos de reset)
+    MAX_PAUSE = 60.0
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 30000):
+        self.requests = _Bucket(requests_per_minute)
+        self.tokens = _Bucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.backoff = 1.0
+        self._locks: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = WeakKeyDictionary()
+
+    def _lock(self) -> asyncio.Lock:
+        # Um lock por event loop: a CLI usa loops diferentes para coleta e drafts
+        loop = asyncio.get_running_loop()
+        if loop not in self._locks:
+            self._locks[loop] = asyncio.Lock()
+        return self._locks[loop]
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Aguarda até haver orçamento para uma requisição com `tokens` estimados.
+
+        Args:
+            tokens: Estimativa de tokens da chamada (prompt + resposta)
+        """
+        async with self._lock():
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                wait = max(self.paused_until - now,
+                           self.requests.wait_time(1),
+                           self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.level -= 1
+            self.tokens.level -= min(tokens, self.tokens.capacity)
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Corrige o balde de tokens com o uso real informado pela API."""
+        self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+        self.backoff = 1.0
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Ajusta o orçamento aos cabeçalhos de rate limit da resposta.
+
+        Args:
+            headers: Cabeçalhos HTTP da resposta da API
+        """
+        for bucket, kind in ((self.requests, 'requests'), (self.tokens, 'tokens')):
+            limit = headers.get(f'x-ratelimit-limit-{kind}')
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            try:
+                if limit is not None:
+                    bucket.capacity = float(limit) * self.SAFETY_FACTOR
+                    bucket.level = min(bucket.level, bucket.capacity)
+                if remaining is not None:
+                    bucket.level = min(bucket.level, float(remaining))
+            except ValueError:
+                continue
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        Registra um 429: esvazia os baldes e pausa todos os chamadores.
+
+        A pausa segue `retry-after` quando presente; senão, o
+        `x-ratelimit-reset-*` do limite esgotado (o de `x-ratelimit-remaining-*`
+        zerado) ou um backoff exponencial, ambos limitados a `MAX_PAUSE`.
+
+        Returns:
+            float: Segundos de pausa aplicados
+        """
+        headers = headers or {}
+        pause = None
+        if headers.get('retry-after-ms'):
+            pause = (parse_duration(headers.get('retry-after-ms')) or 0) / 1000.0
+        if pause is None:
+            pause = parse_duration(headers.get('retry-after'))
+        if pause is None:
+            resets = [parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                      for kind in ('requests', 'tokens') if _exhausted(headers, kind)]
+            resets = [reset for reset in resets if reset is not None]
+            if resets:
+                pause = min(max(resets), self.MAX_PAUSE)
+        if pause is None:
+            pause = self.backoff
+            self.backoff = min(self.backoff * 2, self.MAX_PAUSE)
+
+        self.requests.level = min(self.requests.level, 0.0)
+        self.tokens.level = min(self.tokens.level, 0.0)
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        return pause
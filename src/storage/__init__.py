@@ -4,5 +4,8 @@ Pacote para armazenamento de dados do sistema de notícias.
 from .indexer import NewsIndex
 from .validator import NewsValidator
 from .compressor import NewsCompressor
+from .seen import SeenStore
+from .ledger import DraftLedger
+from .archive import RecordArchive
 
-__all__ = ['NewsIndex', 'NewsValidator', 'NewsCompressor'] 
\ No newline at end of file
+__all__ = ['NewsIndex', 'NewsValidator', 'NewsCompressor', 'SeenStore', 'DraftLedger', 'RecordArchive'] 
\ No newline at end of file
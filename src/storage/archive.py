@@ -0,0 +1,244 @@
+"""
+Módulo para arquivos comprimidos com acesso direto a cada registro.
+
+O arquivo é um gzip de vários membros: cada membro comprime um bloco de
+até `block_records` registros e pode ser descomprimido sozinho. Juntos, os
+membros formam o mesmo array JSON (um registro por linha) do arquivo sem
+compressão, então `gzip.open` e `NewsCompressor.decompress_json` continuam
+lendo o arquivo inteiro. Ao lado fica um índice (`<arquivo>.idx`) com a
+posição de cada bloco; ler um registro custa descomprimir um único bloco.
+"""
+import json
+import gzip
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Optional, Union
+
+# Registros por bloco: blocos maiores comprimem melhor, menores leem menos por registro
+ARCHIVE_BLOCK_RECORDS = 64
+
+INDEX_SUFFIX = '.idx'
+_INDEX_MAGIC = b'AVRA'
+_INDEX_HEADER = struct.Struct('<4sIQ')
+
+
+def index_path(path: Union[str, Path]) -> Path:
+    """Caminho do índice de blocos de um arquivo."""
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+class ArchiveWriter:
+    """
+    Grava registros já serializados em blocos gzip independentes.
+
+    Os bytes descomprimidos são exatamente `[\\n<r0>,\\n<r1>...\\n]\\n`, o mesmo
+    formato do JSON sem compressão gravado por `storage_utils`.
+    """
+
+    def __init__(self, fileobj: BinaryIO, block_records: int = ARCHIVE_BLOCK_RECORDS,
+                 compresslevel: int = 9):
+        """
+        Inicializa o gravador.
+
+        Args:
+            fileobj: Arquivo binário de destino (aberto para escrita)
+            block_records: Registros por bloco
+            compresslevel: Nível de compressão do gzip
+        """
+        if block_records < 1:
+            raise ValueError("block_records deve ser pelo menos 1")
+        self.fileobj = fileobj
+        self.block_records = block_records
+        self.compresslevel = compresslevel
+        self.count = 0
+        self.offsets: List[int] = []
+        self._start = fileobj.tell()
+        self._block: List[bytes] = []
+        self._pending = 0
+
+    def write(self, data: bytes) -> bytes:
+        """
+        Acrescenta um registro (JSON em UTF-8, sem quebras de linha).
+
+        Returns:
+            bytes: Trecho do array JSON correspondente ao registro
+        """
+        chunk = (b'[\n' if self.count == 0 else b',\n') + data
+        self._block.append(chunk)
+        self._pending += 1
+        self.count += 1
+        if self._pending == self.block_records:
+            self._flush()
+        return chunk
+
+    def _flush(self, tail: bytes = b'') -> None:
+        if self._pending:
+            self.offsets.append(self.fileobj.tell() - self._start)
+        self._block.append(tail)
+        self.fileobj.write(gzip.compress(b''.join(self._block), self.compresslevel, mtime=0))
+        self._block, self._pending = [], 0
+
+    def close(self) -> bytes:
+        """
+        Fecha o array JSON e grava o último bloco.
+
+        Returns:
+            bytes: Fim do array JSON
+        """
+        tail = b'\n]\n' if self.count else b'[]\n'
+        if self._pending or not self.count:
+            self._flush(tail)
+            end = self.fileobj.tell() - self._start
+        else:
+            # Último bloco já cheio: o fim do array vai em um membro próprio
+            end = self.fileobj.tell() - self._start
+            self._flush(tail)
+        self.offsets.append(end)
+        return tail
+
+    def write_index(self, path: Union[str, Path]) -> None:
+        """
+        Grava o índice de blocos (depois de `close`).
+
+        Args:
+            path: Caminho do índice
+        """
+        with open(path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self.block_records, self.count))
+            f.write(struct.pack(f'<{len(self.offsets)}Q', *self.offsets))
+
+
+def write_archive(records: List[Any], output_path: Union[str, Path],
+                  block_records: int = ARCHIVE_BLOCK_RECORDS) -> None:
+    """
+    Grava uma lista de registros como arquivo em blocos, com índice.
+
+    Args:
+        records: Registros serializáveis em JSON
+        output_path: Caminho do arquivo .gz
+        block_records: Registros por bloco
+    """
+    with open(output_path, 'wb') as f:
+        writer = ArchiveWriter(f, block_records)
+        for record in records:
+            writer.write(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+        writer.close()
+    writer.write_index(index_path(output_path))
+
+
+class RecordArchive:
+    """
+    Leitura direta de registros de um arquivo em blocos.
+
+    O arquivo é mapeado em memória e cada bloco lido é descomprimido a
+    partir do mapeamento; o último bloco lido fica em cache, então percorrer
+    os registros em ordem descomprime cada bloco uma vez. Arquivos antigos,
+    sem índice, são lidos inteiros na primeira consulta.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Abre o arquivo.
+
+        Args:
+            path: Caminho do arquivo .gz
+
+        Raises:
+            ValueError: Se o índice for inválido
+        """
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._map: Optional[mmap.mmap] = None
+        self._records: Optional[List[Any]] = None
+        self._cached = (-1, [])
+        self.block_records = 0
+        self.offsets: List[int] = []
+        idx = index_path(self.path)
+        if not idx.exists():
+            return
+
+        raw = idx.read_bytes()
+        magic, self.block_records, count = _INDEX_HEADER.unpack_from(raw)
+        if magic != _INDEX_MAGIC:
+            raise ValueError(f"Índice inválido: {idx}")
+        n = (len(raw) - _INDEX_HEADER.size) // 8
+        self.offsets = list(struct.unpack_from(f'<{n}Q', raw, _INDEX_HEADER.size))
+        self._count = count
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        if self.offsets:
+            return self._count
+        return len(self._all())
+
+    def _all(self) -> List[Any]:
+        if self._records is None:
+            with gzip.open(self.path, 'rb') as f:
+                self._records = json.loads(f.read())
+        return self._records
+
+    def block(self, number: int) -> List[Any]:
+        """
+        Descomprime um bloco.
+
+        Args:
+            number: Número do bloco
+
+        Returns:
+            Registros do bloco
+        """
+        if self._cached[0] == number:
+            return self._cached[1]
+        start, end = self.offsets[number], self.offsets[number + 1]
+        with memoryview(self._map)[start:end] as view:
+            text = zlib.decompress(view, wbits=31)
+        # Cada bloco começa com "[\n" ou ",\n"; o último termina com "\n]\n"
+        body = text[2:-3] if text.endswith(b'\n]\n') else text[2:]
+        records = json.loads(b'[' + body + b']')
+        self._cached = (number, records)
+        return records
+
+    def __getitem__(self, index: int) -> Any:
+        """
+        Lê um registro pela posição.
+
+        Args:
+            index: Posição do registro (aceita negativos)
+
+        Returns:
+            O registro
+        """
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"Registro {index} fora do arquivo ({count} registros)")
+        if not self.offsets:
+            return self._all()[index]
+        return self.block(index // self.block_records)[index % self.block_records]
+
+    def __iter__(self) -> Iterator[Any]:
+        if not self.offsets:
+            yield from self._all()
+            return
+        for number in range(len(self.offsets) - 1):
+            yield from self.block(number)
+
+    def close(self) -> None:
+        """Libera o mapeamento e o arquivo."""
+        self._cached = (-1, [])
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> 'RecordArchive':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
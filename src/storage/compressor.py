@@ -7,6 +7,8 @@ import lzma
 from pathlib import Path
 from typing import List, Dict, Any, Union
 
+from .archive import write_archive
+
 class NewsCompressor:
     """Compressor de dados de notícias."""
     
@@ -15,11 +17,18 @@ class NewsCompressor:
         """
         Comprime dados JSON usando o método especificado.
         
+        Listas em gzip são gravadas em blocos independentes, com índice de
+        blocos ao lado, para leitura direta de cada item com `RecordArchive`.
+        
         Args:
             data: Dados a serem comprimidos (lista ou dicionário)
             output_path: Caminho do arquivo de saída
             method: Método de compressão ('gzip' ou 'lzma')
         """
+        if method == 'gzip' and isinstance(data, list):
+            write_archive(data, output_path)
+            return
+        
         # Converte dados para JSON
         json_str = json.dumps(data, ensure_ascii=False)
         
@@ -2,12 +2,373 @@
 Módulo para indexação de notícias armazenadas.
 """
 import json
+import re
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
-import sqlite3
+
+from src.processor.normalize import plain_text
+from src.storage.keys import item_key, legacy_key
+
+# Ajustes da conexão: WAL permite leituras durante a escrita e, com
+# synchronous=NORMAL, cada commit não força um fsync do banco inteiro
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Pesos do BM25 por coluna da busca textual (título, resumo, conteúdo)
+BM25_WEIGHTS = (10.0, 3.0, 1.0)
+# Dias em que a pontuação textual de uma notícia cai pela metade
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+# Pasta dos arquivos salvos; bancos copiados de outra máquina guardam os
+# caminhos absolutos de lá, e os arquivos são procurados aqui
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+_FTS_TOKEN = re.compile(r'"[^"]*"|\S+')
+
+def fts_query(text: str) -> str:
+    """
+    Converte o texto de busca em uma consulta FTS5 segura.
+
+    Mantém "frases entre aspas", prefixos (petro*) e os operadores AND, OR e
+    NOT; os demais termos são citados, para que pontuação (S&P, 10,75%) não
+    vire sintaxe da consulta. NOT é binário no FTS5: em uma sequência de
+    operadores, NOT prevalece ("AND NOT" e "OR NOT" viram NOT) e os demais
+    repetidos são descartados; um NOT no início, sem termo à esquerda, é
+    descartado junto com o termo negado. Um termo negado nunca vira positivo.
+
+    Example:
+        >>> fts_query('"taxa selic" petro* S&P')
+        '"taxa selic" "petro"* "S&P"'
+        >>> fts_query('selic OR NOT juros AND AND copom')
+        '"selic" NOT "juros" AND "copom"'
+    """
+    operators = ('AND', 'OR', 'NOT')
+    terms = []
+    for token in _FTS_TOKEN.findall(text or ''):
+        if token in operators:
+            if terms and terms[-1] in operators:
+                if token == 'NOT':
+                    terms[-1] = 'NOT'
+                continue
+            terms.append(token)
+            continue
+        prefix = token.endswith('*') and not token.startswith('"')
+        token = token.strip('"').rstrip('*').replace('"', '""')
+        if token:
+            terms.append(f'"{token}"' + ('*' if prefix else ''))
+    # Operadores soltos no início ou no fim seriam erro de sintaxe
+    while terms and terms[0] in operators:
+        if terms.pop(0) == 'NOT' and terms:
+            terms.pop(0)
+    while terms and terms[-1] in operators:
+        terms.pop()
+    return ' '.join(terms)
+
+def _fts_row(news_id: int, item: Dict[str, Any]) -> Tuple:
+    return (news_id, item.get('title') or '',
+            plain_text(item.get('summary') or item.get('description') or ''),
+            plain_text(item.get('content') or ''))
+
+def merge_items(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Une duas versões da mesma notícia.
+
+    Os campos da versão nova prevalecem, exceto os vazios, de modo que uma
+    cópia bruta salva depois não apaga o resumo e as categorias da processada.
+    """
+    merged = dict(old)
+    merged.update({k: v for k, v in new.items() if v not in (None, '', {}, [])})
+    return merged
+
+def _existing_rows(cursor: sqlite3.Cursor, keys: List[str]) -> Dict[str, Tuple[int, Optional[bytes]]]:
+    """Linhas já indexadas (id, payload) das chaves, consultadas em blocos."""
+    found = {}
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for news_id, key, payload in cursor.execute(
+                f"SELECT id, item_id, payload FROM news WHERE item_id IN ({placeholders})", chunk):
+            found[key] = (news_id, payload)
+    return found
+
+def _insert_children(cursor: sqlite3.Cursor, stored: List[Tuple[int, Dict[str, Any]]]) -> None:
+    """Insere categorias, entidades e texto de busca das notícias (id, item)."""
+    category_rows: List[Tuple] = []
+    entity_rows: List[Tuple] = []
+    for news_id, item in stored:
+        category_rows.extend((news_id, category) for category in (item.get('categories') or {}))
+        entities = item.get('entities') or {}
+        entity_rows.extend((news_id, 'ticker', ticker) for ticker in entities.get('tickers', []))
+        entity_rows.extend((news_id, 'company', company) for company in entities.get('companies', []))
+    cursor.executemany("INSERT INTO categories (news_id, category) VALUES (?, ?)", category_rows)
+    cursor.executemany("INSERT INTO entities (news_id, kind, value) VALUES (?, ?, ?)", entity_rows)
+    cursor.executemany("INSERT INTO news_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                       [_fts_row(news_id, item) for news_id, item in stored])
+
+def _migration_1(cursor: sqlite3.Cursor) -> None:
+    """Esquema inicial: notícias, categorias, entidades e índices."""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS news (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        source TEXT NOT NULL,
+        published TIMESTAMP,
+        relevance FLOAT,
+        file_path TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        story_id TEXT
+    )
+    """)
+    
+    # Bancos criados antes do agrupamento em histórias não têm a coluna story_id
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(news)")}
+    if 'story_id' not in columns:
+        cursor.execute("ALTER TABLE news ADD COLUMN story_id TEXT")
+    
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        news_id INTEGER,
+        category TEXT NOT NULL,
+        FOREIGN KEY (news_id) REFERENCES news(id)
+    )
+    """)
+    
+    # Tickers e empresas citados
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS entities (
+        news_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        value TEXT NOT NULL,
+        FOREIGN KEY (news_id) REFERENCES news(id)
+    )
+    """)
+    
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_title ON news(title)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_source ON news(source)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_published ON news(published)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_relevance ON news(relevance)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_story ON news(story_id)")
+    # Índice de cobertura: a busca por ticker resolve os news_id sem ler a tabela
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_lookup ON entities(kind, value, news_id)")
+
+def _migration_2(cursor: sqlite3.Cursor) -> None:
+    """Índice das categorias por notícia (reindexação e junção da busca por categoria)."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_categories_news ON categories(news_id, category)")
+
+def encode_payload(data: bytes) -> bytes:
+    """Comprime o JSON de uma notícia para a coluna payload."""
+    return zlib.compress(data, 6)
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Notícia guardada na coluna payload."""
+    return json.loads(zlib.decompress(payload))
+
+def _resolve_snapshot(file_path: str) -> Optional[Path]:
+    """
+    Arquivo de origem de uma linha do índice.
+
+    Se o caminho guardado não existe, procura em DATA_DIR pelo trecho depois
+    de "data/" (ex.: processed/<arquivo>.json) e, por fim, pelo nome do arquivo.
+    """
+    path = Path(file_path)
+    if path.is_file():
+        return path
+    parts = path.parts
+    if 'data' in parts:
+        last = max(i for i, part in enumerate(parts) if part == 'data')
+        candidate = DATA_DIR.joinpath(*parts[last + 1:])
+        if candidate.is_file():
+            return candidate
+    if not path.name:
+        return None
+    matches = sorted(DATA_DIR.rglob(path.name))
+    same_dir = [match for match in matches if match.parent.name == path.parent.name]
+    return (same_dir or matches or [None])[0]
+
+def _backfill_payloads(cursor: sqlite3.Cursor) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Preenche item_id e payload das linhas sem payload a partir dos arquivos.
+
+    Os arquivos são lidos um por vez; os que não são encontrados nem em
+    DATA_DIR deixam suas linhas como estão.
+
+    Returns:
+        As linhas preenchidas (id, item)
+    """
+    paths = [row[0] for row in cursor.execute(
+        "SELECT DISTINCT file_path FROM news WHERE payload IS NULL")]
+    filled: List[Tuple[int, Dict[str, Any]]] = []
+    for file_path in paths:
+        snapshot = _resolve_snapshot(file_path)
+        if snapshot is None:
+            continue
+        try:
+            with open(snapshot, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not items:
+            continue
+        by_title = {}
+        for item in items:
+            by_title.setdefault(item.get('title'), item)
+        # As linhas de um arquivo foram inseridas na ordem do arquivo; a posição
+        # resolve títulos repetidos, e o título cobre o resto
+        rows = cursor.execute("SELECT id, title FROM news WHERE file_path = ? AND payload IS NULL "
+                              "ORDER BY id", (file_path,)).fetchall()
+        updates = []
+        for position, (news_id, title) in enumerate(rows):
+            item = items[position % len(items)]
+            if item.get('title') != title:
+                item = by_title.get(title)
+            if item is not None:
+                updates.append((item_key(item),
+                                encode_payload(json.dumps(item, ensure_ascii=False).encode('utf-8')),
+                                news_id))
+                filled.append((news_id, item))
+        cursor.executemany("UPDATE news SET item_id = ?, payload = ? WHERE id = ?", updates)
+    return filled
+
+def _migration_3(cursor: sqlite3.Cursor) -> None:
+    """
+    Guarda a notícia inteira (JSON comprimido) e a chave estável de cada linha.
+
+    Linhas antigas são preenchidas uma vez a partir dos arquivos
+    (`_backfill_payloads`); as de arquivos que não existem mais ficam sem payload.
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(news)")}
+    if 'item_id' not in columns:
+        cursor.execute("ALTER TABLE news ADD COLUMN item_id TEXT")
+    if 'payload' not in columns:
+        cursor.execute("ALTER TABLE news ADD COLUMN payload BLOB")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_item ON news(item_id)")
+    # A busca por categoria passa a ser uma subconsulta (sem junção nem DISTINCT)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_categories_lookup ON categories(category, news_id)")
+    _backfill_payloads(cursor)
+
+def _migration_4(cursor: sqlite3.Cursor) -> None:
+    """Busca textual FTS5 em título, resumo e conteúdo, sem distinção de acentos."""
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+        title, summary, content,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """)
+    rows = cursor.execute(
+        "SELECT id, title, payload FROM news WHERE id NOT IN (SELECT rowid FROM news_fts)").fetchall()
+    cursor.executemany("INSERT INTO news_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)", [
+        _fts_row(news_id, decode_payload(payload) if payload is not None else {'title': title})
+        for news_id, title, payload in rows
+    ])
+
+def _merge_duplicates(cursor: sqlite3.Cursor) -> None:
+    """
+    Une as linhas com o mesmo item_id.
+
+    Cada grupo vira a linha mais recente, com os payloads unidos do mais
+    antigo para o mais novo; sem nenhum payload, a linha mais recente fica
+    como está e as outras são removidas.
+    """
+    groups: Dict[str, List[Tuple[int, Optional[bytes]]]] = {}
+    for news_id, key, payload in cursor.execute("""
+        SELECT id, item_id, payload FROM news
+        WHERE item_id IN (SELECT item_id FROM news WHERE item_id IS NOT NULL
+                          GROUP BY item_id HAVING COUNT(*) > 1)
+        ORDER BY id
+    """).fetchall():
+        groups.setdefault(key, []).append((news_id, payload))
+    
+    removed: List[Tuple[int]] = []
+    stored: List[Tuple[int, Dict[str, Any]]] = []
+    updates: List[Tuple] = []
+    for rows in groups.values():
+        merged: Dict[str, Any] = {}
+        for _, payload in rows:
+            if payload is not None:
+                merged = merge_items(merged, decode_payload(payload))
+        keep = rows[-1][0]
+        removed.extend((news_id,) for news_id, _ in rows[:-1])
+        if merged:
+            stored.append((keep, merged))
+            updates.append((merged.get('relevance', 0.0), merged.get('story_id'),
+                            encode_payload(json.dumps(merged, ensure_ascii=False).encode('utf-8')),
+                            keep))
+    
+    # A linha mantida tem categorias, entidades e texto refeitos a partir da união
+    cleared = removed + [(news_id,) for news_id, _ in stored]
+    cursor.executemany("DELETE FROM categories WHERE news_id = ?", cleared)
+    cursor.executemany("DELETE FROM entities WHERE news_id = ?", cleared)
+    cursor.executemany("DELETE FROM news_fts WHERE rowid = ?", cleared)
+    cursor.executemany("DELETE FROM news WHERE id = ?", removed)
+    cursor.executemany("UPDATE news SET relevance = ?, story_id = ?, payload = ? WHERE id = ?", updates)
+    _insert_children(cursor, stored)
+
+def _migration_5(cursor: sqlite3.Cursor) -> None:
+    """Uma linha por notícia: remove as cópias repetidas e torna item_id único."""
+    _merge_duplicates(cursor)
+    cursor.execute("DROP INDEX IF EXISTS idx_news_item")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_news_item_id ON news(item_id)")
+
+def _migration_6(cursor: sqlite3.Cursor) -> None:
+    """
+    Recupera as linhas antigas que ficaram sem payload nem item_id.
+
+    Os arquivos são procurados de novo, agora também em DATA_DIR. As linhas
+    cujo arquivo se perdeu recebem a chave de título e fonte (`legacy_key`),
+    ou a chave real de outra linha recuperada da mesma notícia, e as
+    repetidas são unidas.
+    """
+    # Linhas recuperadas podem repetir chaves até serem unidas
+    cursor.execute("DROP INDEX IF EXISTS idx_news_item_id")
+    filled = _backfill_payloads(cursor)
+    cursor.executemany("DELETE FROM news_fts WHERE rowid = ?", [(news_id,) for news_id, _ in filled])
+    cursor.executemany("INSERT INTO news_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                       [_fts_row(news_id, item) for news_id, item in filled])
+    
+    recovered: Dict[str, str] = {}
+    for title, source, key in cursor.execute(
+            "SELECT title, source, item_id FROM news WHERE item_id IS NOT NULL ORDER BY id"):
+        recovered.setdefault(legacy_key(title, source), key)
+    rows = cursor.execute("SELECT id, title, source FROM news WHERE item_id IS NULL").fetchall()
+    keys = [(legacy_key(title, source), news_id) for news_id, title, source in rows]
+    cursor.executemany("UPDATE news SET item_id = ? WHERE id = ?",
+                       [(recovered.get(key, key), news_id) for key, news_id in keys])
+    
+    _merge_duplicates(cursor)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_news_item_id ON news(item_id)")
+
+# Migrações em ordem; a versão aplicada fica em PRAGMA user_version.
+# Para mudar o esquema, acrescente uma função ao fim (nunca altere as existentes).
+MIGRATIONS = [_migration_1, _migration_2, _migration_3, _migration_4, _migration_5,
+              _migration_6]
 
 class NewsIndex:
+    """
+    Índice SQLite das notícias salvas.
+
+    Mantém uma única conexão (em modo WAL) durante a vida do objeto,
+    protegida por uma trava para uso a partir de várias threads. O esquema
+    é criado e atualizado por migrações versionadas, aplicadas uma vez por
+    banco. Use como gerenciador de contexto ou chame `close()` ao terminar.
+
+    Example:
+        >>> with NewsIndex("data/news_index.db") as index:
+        ...     index.index_items(items, "data/processed/2025-04-28T16-46-52.json")
+        ...     index.search(ticker="PETR4")
+    """
+
     def __init__(self, db_path: str = "data/news_index.db"):
         """
         Inicializa o indexador de notícias.
@@ -16,44 +377,51 @@ class NewsIndex:
             db_path: Caminho para o arquivo do banco de dados SQLite
         """
         self.db_path = db_path
-        self._init_db()
-    
-    def _init_db(self):
-        """Inicializa o banco de dados com as tabelas necessárias."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Cria tabela principal de notícias
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS news (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            source TEXT NOT NULL,
-            published TIMESTAMP,
-            relevance FLOAT,
-            file_path TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        
-        # Cria tabela de categorias
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            news_id INTEGER,
-            category TEXT NOT NULL,
-            FOREIGN KEY (news_id) REFERENCES news(id)
-        )
-        """)
-        
-        # Cria índices para melhorar performance de busca
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_title ON news(title)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_source ON news(source)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_published ON news(published)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_relevance ON news(relevance)")
-        
-        conn.commit()
-        conn.close()
+        self._lock = threading.RLock()
+        # Transações controladas explicitamente (BEGIN/COMMIT) em _transaction
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
+        self._migrate()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Transação com trava de escrita desde o início (BEGIN IMMEDIATE)."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn.cursor()
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+    
+    def _migrate(self) -> None:
+        """Aplica as migrações pendentes, cada uma em sua transação."""
+        with self._lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self._transaction() as cursor:
+                # Outro processo pode ter migrado enquanto esperávamos a trava
+                if cursor.execute("PRAGMA user_version").fetchone()[0] >= number:
+                    continue
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {number}")
+    
+    @property
+    def schema_version(self) -> int:
+        with self._lock:
+            return self.conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+    
+    def __enter__(self) -> "NewsIndex":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
     
     def index_file(self, file_path: str) -> None:
         """
@@ -65,38 +433,141 @@ class NewsIndex:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 items = json.load(f)
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            for item in items:
-                # Insere notícia
-                cursor.execute("""
-                INSERT INTO news (title, source, published, relevance, file_path)
-                VALUES (?, ?, ?, ?, ?)
-                """, (
-                    item['title'],
-                    item['source'],
-                    item.get('published'),
-                    item.get('relevance', 0.0),
-                    file_path
-                ))
-                
-                news_id = cursor.lastrowid
-                
-                # Insere categorias
-                for category in item.get('categories', {}).keys():
-                    cursor.execute("""
-                    INSERT INTO categories (news_id, category)
-                    VALUES (?, ?)
-                    """, (news_id, category))
-            
-            conn.commit()
-            conn.close()
-            
+            self.index_items(items, file_path)
         except Exception as e:
             print(f"Erro ao indexar arquivo {file_path}: {e}")
     
+    def index_files(self, file_paths: Iterable[str]) -> int:
+        """
+        Indexa vários arquivos em uma única transação (carga inicial de um acervo).
+        
+        Args:
+            file_paths: Caminhos dos arquivos JSON com as notícias
+            
+        Returns:
+            int: Número de notícias indexadas
+        """
+        batches = []
+        for file_path in file_paths:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    batches.append((json.load(f), str(file_path)))
+            except Exception as e:
+                print(f"Erro ao ler arquivo {file_path}: {e}")
+        with self._transaction() as cursor:
+            return sum(self._insert(cursor, items, file_path) for items, file_path in batches)
+    
+    def index_items(self, items: List[Dict[str, Any]], file_path: str,
+                    encoded: Optional[List[bytes]] = None) -> int:
+        """
+        Indexa notícias já em memória, sem reler o arquivo em que foram salvas.
+        
+        Todas as linhas entram em uma transação, com uma inserção em lote por
+        tabela. Cada linha guarda a notícia inteira (JSON comprimido), então a
+        busca não precisa abrir `file_path`.
+        
+        Args:
+            items: Notícias gravadas em `file_path`
+            file_path: Caminho do arquivo JSON com as notícias
+            encoded: JSON (UTF-8) de cada item, se já serializado, para não serializar de novo
+            
+        Returns:
+            int: Número de notícias indexadas
+        """
+        with self._transaction() as cursor:
+            return self._insert(cursor, items, file_path, encoded)
+    
+    def _insert(self, cursor: sqlite3.Cursor, items: List[Dict[str, Any]], file_path: str,
+                encoded: Optional[List[bytes]] = None) -> int:
+        """
+        Insere ou atualiza as notícias pela chave estável (`item_key`).
+        
+        Uma notícia já indexada (de outra execução ou do conjunto bruto)
+        mantém sua linha: os campos novos e não vazios prevalecem sobre os
+        antigos, e categorias, entidades e texto de busca são refeitos.
+        """
+        if not items:
+            return 0
+        if encoded is None:
+            encoded = [None] * len(items)
+        
+        # Repetições dentro do próprio lote são unidas antes de gravar
+        batch: Dict[str, Tuple[Dict[str, Any], Optional[bytes]]] = {}
+        for item, data in zip(items, encoded):
+            key = item_key(item)
+            if key in batch:
+                batch[key] = (merge_items(batch[key][0], item), None)
+            else:
+                batch[key] = (item, data)
+        
+        existing = _existing_rows(cursor, list(batch))
+        # Linhas antigas sem arquivo de origem, achadas por título e fonte, passam à chave real
+        legacy = {legacy_key(item['title'], item['source']): key
+                  for key, (item, _) in batch.items() if key not in existing}
+        if legacy:
+            claimed = _existing_rows(cursor, list(legacy))
+            cursor.executemany("UPDATE news SET item_id = ? WHERE id = ?",
+                               [(legacy[old], news_id) for old, (news_id, _) in claimed.items()])
+            existing.update((legacy[old], row) for old, row in claimed.items())
+        # IDs reservados de antemão para inserir categorias e entidades em lote
+        # (a transação já tem a trava de escrita, então ninguém mais os usa)
+        next_id = cursor.execute("""
+        SELECT MAX(COALESCE((SELECT MAX(id) FROM news), 0),
+                   COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'news'), 0))
+        """).fetchone()[0] + 1
+        news_rows: List[Tuple] = []
+        stored: List[Tuple[int, Dict[str, Any]]] = []
+        for key, (item, data) in batch.items():
+            if key in existing:
+                news_id, payload = existing[key]
+                if payload is not None:
+                    item, data = merge_items(decode_payload(payload), item), None
+                # id nulo: a linha existente é encontrada pelo conflito em item_id
+                row_id = None
+            else:
+                news_id = row_id = next_id
+                next_id += 1
+            if data is None:
+                data = json.dumps(item, ensure_ascii=False).encode('utf-8')
+            news_rows.append((row_id, item['title'], item['source'], item.get('published'),
+                              item.get('relevance', 0.0), file_path, item.get('story_id'),
+                              key, encode_payload(data)))
+            stored.append((news_id, item))
+        
+        cursor.executemany("""
+        INSERT INTO news (id, title, source, published, relevance, file_path, story_id,
+                          item_id, payload)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(item_id) DO UPDATE SET
+            title = excluded.title,
+            source = excluded.source,
+            published = excluded.published,
+            relevance = excluded.relevance,
+            file_path = excluded.file_path,
+            story_id = excluded.story_id,
+            payload = excluded.payload
+        """, news_rows)
+        
+        updated = [(existing[key][0],) for key in batch if key in existing]
+        cursor.executemany("DELETE FROM categories WHERE news_id = ?", updated)
+        cursor.executemany("DELETE FROM entities WHERE news_id = ?", updated)
+        cursor.executemany("DELETE FROM news_fts WHERE rowid = ?", updated)
+        _insert_children(cursor, stored)
+        return len(news_rows)
+    
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Notícia pela chave estável (URL canônica ou hash do conteúdo, ver `item_key`).
+        
+        Returns:
+            A notícia indexada, ou None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload FROM news WHERE item_id = ? AND payload IS NOT NULL",
+                (item_id,)).fetchone()
+        return decode_payload(row[0]) if row else None
+    
     def search(self, 
               query: Optional[str] = None,
               source: Optional[str] = None,
@@ -104,38 +575,56 @@ class NewsIndex:
               min_relevance: Optional[float] = None,
               start_date: Optional[datetime] = None,
               end_date: Optional[datetime] = None,
-              limit: int = 100) -> List[Dict[str, Any]]:
+              story_id: Optional[str] = None,
+              ticker: Optional[str] = None,
+              company: Optional[str] = None,
+              limit: int = 100,
+              recency_half_life_days: float = RECENCY_HALF_LIFE_DAYS) -> List[Dict[str, Any]]:
         """
         Busca notícias no índice.
         
+        Com `query`, a busca é textual (FTS5) em título, resumo e conteúdo,
+        sem distinção de acentos e maiúsculas, e os resultados vêm ordenados
+        pela pontuação BM25 atenuada pela idade da notícia; sem `query`, do
+        mais recente para o mais antigo.
+        
         Args:
-            query: Texto para buscar no título
+            query: Texto para buscar; aceita "frase exata", prefixo* e AND/OR/NOT
             source: Fonte específica para filtrar
             category: Categoria específica para filtrar
             min_relevance: Relevância mínima
             start_date: Data inicial
             end_date: Data final
+            story_id: História específica (todas as notícias do mesmo evento)
+            ticker: Ticker citado na notícia (ex: PETR4)
+            company: Empresa citada na notícia, como em entities.yaml
             limit: Limite de resultados
+            recency_half_life_days: Idade (em dias) em que a pontuação textual cai pela metade
             
         Returns:
             Lista de notícias encontradas
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        sql = "SELECT DISTINCT n.* FROM news n"
+        sql = ("SELECT n.id, n.title, n.source, n.published, n.relevance, n.story_id, "
+               "n.payload FROM news n")
         params = []
         where_clauses = []
         
+        match = fts_query(query) if query else ''
+        if match:
+            # Pontuação calculada só sobre o FTS, antes da junção com as notícias
+            weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+            sql = (f"WITH hits AS (SELECT rowid AS id, -bm25(news_fts, {weights}) AS score "
+                   "FROM news_fts WHERE news_fts MATCH ?) " + sql + " JOIN hits ON hits.id = n.id")
+            params.append(match)
+        elif query:
+            # Só pontuação, sem termos: nada a encontrar
+            return []
+        
         if category:
-            sql += " LEFT JOIN categories c ON n.id = c.news_id"
-            where_clauses.append("c.category = ?")
+            where_clauses.append(
+                "n.id IN (SELECT news_id FROM categories WHERE category = ?)")
             params.append(category)
         
-        if query:
-            where_clauses.append("n.title LIKE ?")
-            params.append(f"%{query}%")
-            
         if source:
             where_clauses.append("n.source = ?")
             params.append(source)
@@ -152,22 +641,39 @@ class NewsIndex:
             where_clauses.append("n.published <= ?")
             params.append(end_date.isoformat())
         
+        if story_id:
+            where_clauses.append("n.story_id = ?")
+            params.append(story_id)
+        
+        for kind, value in (('ticker', ticker and ticker.upper()), ('company', company)):
+            if value:
+                where_clauses.append(
+                    "n.id IN (SELECT news_id FROM entities WHERE kind = ? AND value = ?)")
+                params.extend([kind, value])
+        
         if where_clauses:
             sql += " WHERE " + " AND ".join(where_clauses)
             
-        sql += " ORDER BY n.published DESC LIMIT ?"
+        if match:
+            # BM25 (com sinal invertido: maior é melhor) dividido por 1 + idade / meia-vida
+            sql += (" ORDER BY hits.score / (1.0 + MAX(0.0, julianday('now') - "
+                    "COALESCE(julianday(n.published), julianday(n.created_at))) / ?) DESC")
+            params.append(recency_half_life_days)
+        else:
+            sql += " ORDER BY n.published DESC"
+        sql += " LIMIT ?"
         params.append(limit)
         
-        cursor.execute(sql, params)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        # A notícia vem da própria linha; sem payload (arquivo perdido antes
+        # da migração), só os campos indexados
         results = []
+        for news_id, title, source, published, relevance, story_id, payload in rows:
+            if payload is not None:
+                results.append(decode_payload(payload))
+            else:
+                results.append({'title': title, 'source': source, 'published': published,
+                                'relevance': relevance, 'story_id': story_id})
         
-        for row in cursor.fetchall():
-            with open(row[5], 'r', encoding='utf-8') as f:
-                items = json.load(f)
-                for item in items:
-                    if item['title'] == row[1]:
-                        results.append(item)
-                        break
-        
-        conn.close()
         return results 
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Módulo para chaves estáveis de identificação de notícias.
+"""
+import hashlib
+from typing import Dict, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from src.processor.normalize import normalized
+
+# Parâmetros de rastreamento que não mudam o conteúdo da página
+TRACKING_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid'}
+
+
+def item_link(item: Dict[str, Any]) -> str:
+    """Retorna o link do item (coletores RSS usam 'link', os HTML usam 'url')."""
+    return item.get('link') or item.get('url') or ''
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normaliza uma URL para servir de chave.
+
+    Remove fragmento, "www.", barra final e parâmetros de rastreamento, e
+    ordena os parâmetros restantes.
+
+    Args:
+        url: URL original
+
+    Returns:
+        str: URL canônica (vazia se a URL for vazia)
+
+    Example:
+        >>> canonical_url("https://WWW.Exame.com/mercado/?utm_source=x&b=2&a=1#topo")
+        'https://exame.com/mercado?a=1&b=2'
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith(TRACKING_PREFIXES) or k.lower() in TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip('/')
+    return urlunsplit((parts.scheme.lower() or 'https', host, path, urlencode(query), ''))
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """
+    Calcula um hash do conteúdo do item (título e corpo normalizados).
+
+    Args:
+        item: Dicionário contendo informações da notícia
+
+    Returns:
+        str: Hash SHA256 em hexadecimal
+    """
+    return normalized(item).digest
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """
+    Chave estável de um item: URL canônica ou, sem link, o hash do conteúdo.
+
+    Args:
+        item: Dicionário contendo informações da notícia
+
+    Returns:
+        str: Chave do item
+    """
+    return canonical_url(item_link(item)) or f"sha256:{content_hash(item)}"
+
+
+def legacy_key(title: str, source: str) -> str:
+    """
+    Chave de linhas antigas do índice cujo arquivo de origem se perdeu.
+
+    Sem a notícia inteira não há link nem corpo; título e fonte são o que
+    resta para reconhecer a mesma notícia quando ela for salva de novo.
+
+    Args:
+        title: Título da notícia
+        source: Fonte da notícia
+
+    Returns:
+        str: Chave "legacy:" seguida do SHA256 de fonte e título
+    """
+    text = f"{' '.join((source or '').split())}\n{' '.join((title or '').split())}"
+    return f"legacy:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
@@ -0,0 +1,194 @@
+"""
+Módulo para o registro persistente de drafts já gerados.
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.processor.normalize import normalized
+from src.storage.keys import canonical_url, content_hash, item_link
+
+# Termos do título usados na impressão digital de itens sem história
+FINGERPRINT_TERMS = 8
+
+
+def story_fingerprint(item: Dict[str, Any]) -> str:
+    """
+    Impressão digital da história de um item.
+
+    Usa o `story_id` do agrupamento em histórias; sem ele, um hash dos
+    principais termos do título, em ordem alfabética. Um título sem termos
+    úteis não identifica a história: vale a URL canônica (ou o conteúdo).
+
+    Args:
+        item: Dicionário contendo informações da notícia
+
+    Returns:
+        str: Identificador estável da história
+    """
+    if item.get('story_id'):
+        return f"story:{item['story_id']}"
+    terms = sorted(set(normalized(item).title_terms[:FINGERPRINT_TERMS]))
+    if not terms:
+        link = canonical_url(item_link(item))
+        return f"link:{link}" if link else f"hash:{content_hash(item)}"
+    digest = hashlib.sha1(' '.join(terms).encode('utf-8')).hexdigest()[:16]
+    return f"terms:{digest}"
+
+
+def _entities(item: Dict[str, Any]) -> List[str]:
+    entities = item.get('entities') or {}
+    return sorted(set(entities.get('tickers', [])) | set(entities.get('companies', [])))
+
+
+class DraftLedger:
+    """
+    Registro dos drafts gerados nos últimos dias.
+
+    Cada draft é registrado pela URL canônica do artigo e pela impressão
+    digital da história. Um artigo cuja URL ou história já teve draft
+    dentro de `lookback_days` é suprimido, a menos que seja uma atualização
+    significativa: relevância pelo menos `update_relevance_gain` acima da do
+    draft anterior ou ao menos `update_new_entities` tickers/empresas novos.
+    O mesmo artigo sem mudança no conteúdo nunca conta como atualização.
+    """
+
+    def __init__(self, db_path: str = "data/drafts_ledger.db", lookback_days: float = 3,
+                 update_relevance_gain: float = 1.0, update_new_entities: int = 1):
+        """
+        Inicializa o registro.
+
+        Args:
+            db_path: Caminho para o arquivo do banco de dados SQLite
+            lookback_days: Dias em que um draft suprime novos drafts da mesma história
+            update_relevance_gain: Aumento de relevância que libera um novo draft
+            update_new_entities: Tickers/empresas novos que liberam um novo draft (0 = desativado)
+        """
+        self.db_path = db_path
+        self.lookback_days = lookback_days
+        self.update_relevance_gain = update_relevance_gain
+        self.update_new_entities = update_new_entities
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS drafts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scope TEXT NOT NULL,
+            link TEXT,
+            story TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            relevance FLOAT,
+            entities TEXT,
+            title TEXT,
+            drafted_at TIMESTAMP NOT NULL
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_link ON drafts(scope, link)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_story ON drafts(scope, story)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_drafts_drafted_at ON drafts(drafted_at)")
+        self.conn.commit()
+        self.expire()
+
+    def _previous(self, item: Dict[str, Any], scope: str, now: datetime) -> List[Tuple]:
+        cutoff = (now - timedelta(days=self.lookback_days)).isoformat()
+        link = canonical_url(item_link(item))
+        return self.conn.execute("""
+        SELECT link, content_hash, relevance, entities, title FROM drafts
+        WHERE scope = ? AND drafted_at >= ? AND (story = ? OR (link != '' AND link = ?))
+        ORDER BY drafted_at DESC
+        """, (scope, cutoff, story_fingerprint(item), link)).fetchall()
+
+    def check(self, item: Dict[str, Any], scope: str = '',
+              now: Optional[datetime] = None) -> Optional[str]:
+        """
+        Verifica se um artigo deve ficar sem draft.
+
+        Args:
+            item: Artigo candidato
+            scope: Escopo do draft (perfil de audiência; '' = padrão)
+            now: Momento da verificação (padrão: agora)
+
+        Returns:
+            Motivo da supressão, ou None se o artigo pode receber draft
+        """
+        previous = self._previous(item, scope, now or datetime.now())
+        if not previous:
+            return None
+
+        link = canonical_url(item_link(item))
+        digest = content_hash(item)
+        relevance = float(item.get('relevance') or 0.0)
+        entities = set(_entities(item))
+        for prev_link, prev_hash, prev_relevance, prev_entities, prev_title in previous:
+            if link and prev_link == link and prev_hash == digest:
+                return f"draft já gerado para este link ({prev_title})"
+        # Atualização significativa em relação ao draft mais forte da história
+        best = max(float(p[2] or 0.0) for p in previous)
+        if relevance >= best + self.update_relevance_gain:
+            return None
+        known = set().union(*(json.loads(p[3] or '[]') for p in previous))
+        if self.update_new_entities and len(entities - known) >= self.update_new_entities:
+            return None
+        return f"história já coberta por um draft ({previous[0][4]})"
+
+    def select(self, items: Iterable[Dict[str, Any]], limit: int, scope: str = '',
+               now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Escolhe até `limit` artigos, na ordem dada, sem histórias já cobertas.
+
+        Também evita dois drafts da mesma história na mesma execução.
+
+        Returns:
+            Artigos selecionados
+        """
+        selected, stories = [], set()
+        for item in items:
+            if len(selected) >= limit:
+                break
+            story = story_fingerprint(item)
+            reason = "outro artigo da mesma história nesta execução" if story in stories \
+                else self.check(item, scope, now)
+            if reason:
+                print(f"⏭️ Sem draft para '{item.get('title', '')}': {reason}")
+                continue
+            stories.add(story)
+            selected.append(item)
+        return selected
+
+    def record(self, items: Iterable[Dict[str, Any]], scope: str = '',
+               now: Optional[datetime] = None) -> None:
+        """
+        Registra os artigos que receberam draft.
+
+        Args:
+            items: Artigos com draft gerado
+            scope: Escopo do draft (perfil de audiência; '' = padrão)
+            now: Momento do registro (padrão: agora)
+        """
+        drafted_at = (now or datetime.now()).isoformat()
+        self.conn.executemany("""
+        INSERT INTO drafts (scope, link, story, content_hash, relevance, entities, title, drafted_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(scope, canonical_url(item_link(item)), story_fingerprint(item), content_hash(item),
+               item.get('relevance'), json.dumps(_entities(item), ensure_ascii=False),
+               item.get('title'), drafted_at) for item in items])
+        self.conn.commit()
+
+    def expire(self) -> int:
+        """
+        Remove registros mais antigos que a janela de `lookback_days`.
+
+        Returns:
+            int: Número de registros removidos
+        """
+        cutoff = (datetime.now() - timedelta(days=self.lookback_days)).isoformat()
+        cursor = self.conn.execute("DELETE FROM drafts WHERE drafted_at < ?", (cutoff,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
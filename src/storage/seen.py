@@ -0,0 +1,158 @@
+"""
+Módulo para o registro persistente de notícias já vistas em execuções anteriores.
+"""
+import hashlib
+import math
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List
+
+import numpy as np
+
+from src.storage.keys import canonical_url, content_hash, item_link
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom em memória para respostas negativas rápidas.
+
+    Um resultado negativo é definitivo; um positivo precisa ser confirmado
+    na tabela exata.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Inicializa o filtro.
+
+        Args:
+            capacity: Número esperado de chaves
+            error_rate: Taxa de falsos positivos desejada
+        """
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(h1 + i * h2) % self.size for i in range(self.num_hashes)],
+                        dtype=np.int64)
+
+    def add(self, key: str) -> None:
+        positions = self._positions(key)
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def __contains__(self, key: str) -> bool:
+        positions = self._positions(key)
+        return bool(np.all(self.bits[positions >> 3] & (1 << (positions & 7))))
+
+
+class SeenStore:
+    """
+    Conjunto persistente de notícias já ingeridas.
+
+    Cada notícia é registrada pela URL canônica e pelo hash do conteúdo em
+    uma tabela SQLite; um filtro de Bloom carregado na inicialização evita
+    consultas ao banco para itens novos. Registros mais antigos que
+    `max_age_days` expiram.
+    """
+
+    def __init__(self, db_path: str = "data/seen_items.db", max_age_days: int = 30,
+                 capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        Inicializa o registro.
+
+        Args:
+            db_path: Caminho para o arquivo do banco de dados SQLite
+            max_age_days: Dias até um registro expirar
+            capacity: Número esperado de chaves (dimensiona o filtro de Bloom)
+            error_rate: Taxa de falsos positivos do filtro de Bloom
+        """
+        self.db_path = db_path
+        self.max_age_days = max_age_days
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS seen (
+            key TEXT PRIMARY KEY,
+            last_seen TIMESTAMP NOT NULL
+        ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_last_seen ON seen(last_seen)")
+        self.conn.commit()
+
+        self.expire()
+        self.bloom = BloomFilter(capacity, error_rate)
+        for (key,) in self.conn.execute("SELECT key FROM seen"):
+            self.bloom.add(key)
+
+    @staticmethod
+    def keys_for(item: Dict[str, Any]) -> List[str]:
+        """Chaves de um item: URL canônica (se houver) e hash do conteúdo."""
+        keys = []
+        url = canonical_url(item_link(item))
+        if url:
+            keys.append(f"url:{url}")
+        keys.append(f"hash:{content_hash(item)}")
+        return keys
+
+    def _contains(self, key: str) -> bool:
+        if key not in self.bloom:
+            return False
+        row = self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def seen_url(self, url: str) -> bool:
+        """Verifica se a URL já foi ingerida (usado antes de baixar o artigo)."""
+        url = canonical_url(url)
+        return bool(url) and self._contains(f"url:{url}")
+
+    def is_seen(self, item: Dict[str, Any]) -> bool:
+        """Verifica se o item já foi ingerido, pela URL ou pelo conteúdo."""
+        return any(self._contains(key) for key in self.keys_for(item))
+
+    def add_items(self, items: Iterable[Dict[str, Any]]) -> None:
+        """
+        Registra os itens como vistos.
+
+        Args:
+            items: Itens ingeridos nesta execução
+        """
+        self.add_keys([key for item in items for key in self.keys_for(item)])
+
+    def add_keys(self, keys: List[str]) -> None:
+        """
+        Registra chaves já calculadas com `keys_for`.
+
+        Útil quando o item muda depois da coleta (ex.: o resumo é trocado
+        pelo do LLM) e o hash do conteúdo precisa ser o da coleta.
+
+        Args:
+            keys: Chaves a registrar
+        """
+        now = datetime.now().isoformat()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO seen (key, last_seen) VALUES (?, ?)",
+            [(key, now) for key in keys]
+        )
+        self.conn.commit()
+        for key in keys:
+            self.bloom.add(key)
+
+    def expire(self) -> int:
+        """
+        Remove registros mais antigos que `max_age_days`.
+
+        Returns:
+            int: Número de registros removidos
+        """
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        cursor = self.conn.execute("DELETE FROM seen WHERE last_seen < ?", (cutoff,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
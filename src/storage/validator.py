@@ -104,12 +104,12 @@ class NewsValidator:
         Limpa e normaliza os dados de um item.
         
         Args:
-            item: Dicionário contendo os dados da notícia
+            item: Dicionário (ou Article) contendo os dados da notícia
             
         Returns:
-            Dicionário com dados limpos e normalizados
+            Dicionário simples com dados limpos e normalizados, pronto para serializar
         """
-        cleaned = item.copy()
+        cleaned = dict(item)
         
         # Remove espaços extras do título
         if 'title' in cleaned:
@@ -6,11 +6,11 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.storage.validator import NewsValidator
-from src.storage.compressor import NewsCompressor
 from src.storage.indexer import NewsIndex
+from src.storage.archive import ArchiveWriter, index_path
 
 def ensure_data_dirs():
     """Ensure data directories exist."""
@@ -25,6 +25,81 @@ def ensure_data_dirs():
     
     return raw_dir, processed_dir, compressed_dir
 
+def _encode_items(items: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], bytes]]:
+    """
+    Valida, limpa e serializa cada item uma única vez.
+
+    Returns:
+        Lista de (item limpo, JSON do item em UTF-8)
+
+    Raises:
+        ValueError: Se algum item for inválido (com os erros de todos os itens)
+    """
+    validator = NewsValidator()
+    errors = {}
+    encoded = []
+    for i, item in enumerate(items):
+        item_errors = validator.validate_item(item)
+        if item_errors:
+            errors[i] = item_errors
+            continue
+        cleaned = validator.clean_item(item)
+        encoded.append((cleaned, json.dumps(cleaned, ensure_ascii=False).encode('utf-8')))
+    if errors:
+        raise ValueError(f"Erros de validação encontrados: {errors}")
+    return encoded
+
+def _set_paths(directory: Path, compressed_dir: Path, timestamp: str,
+               raw: bool = False) -> Tuple[Path, Path]:
+    """Caminhos do arquivo JSON e da cópia comprimida (brutos e processados não colidem)."""
+    prefix = "raw-" if raw else ""
+    return directory / f"{timestamp}.json", compressed_dir / f"{prefix}{timestamp}.json.gz"
+
+def _write_set(encoded: List[Tuple[Dict[str, Any], bytes]], filepath: Path, compressed_path: Path,
+               indexer: Optional[NewsIndex] = None) -> Tuple[Path, Path, float]:
+    """
+    Grava um conjunto de itens já serializados em uma única passada.
+
+    Os bytes de cada item vão ao mesmo tempo para o arquivo JSON e para a
+    cópia gzip em blocos (com a posição dos blocos em `.idx`), todos em
+    arquivos temporários renomeados no fim (um arquivo nunca fica pela
+    metade); o índice recebe os itens da memória, depois que o arquivo
+    final existe.
+
+    Returns:
+        Tuple: (arquivo JSON, arquivo comprimido, taxa de compressão)
+    """
+    plain_tmp = filepath.with_name(filepath.name + '.tmp')
+    gz_tmp = compressed_path.with_name(compressed_path.name + '.tmp')
+    idx_tmp = index_path(gz_tmp)
+
+    # Um item por linha dentro de um array JSON: o arquivo continua sendo um JSON válido.
+    # A cópia comprimida tem os mesmos bytes, em blocos com acesso direto (RecordArchive).
+    plain_size = 0
+    with open(plain_tmp, 'wb') as plain, open(gz_tmp, 'wb') as gz_file:
+        archive = ArchiveWriter(gz_file)
+        for _, data in encoded:
+            chunk = archive.write(data)
+            plain.write(chunk)
+            plain_size += len(chunk)
+        tail = archive.close()
+        plain.write(tail)
+        plain_size += len(tail)
+        compressed_size = gz_file.tell()
+    archive.write_index(idx_tmp)
+    os.replace(plain_tmp, filepath)
+    os.replace(gz_tmp, compressed_path)
+    os.replace(idx_tmp, index_path(compressed_path))
+
+    items = [item for item, _ in encoded]
+    payloads = [data for _, data in encoded]
+    if indexer is not None:
+        indexer.index_items(items, str(filepath.absolute()), payloads)
+    else:
+        with NewsIndex() as index:
+            index.index_items(items, str(filepath.absolute()), payloads)
+    return filepath, compressed_path, compressed_size / plain_size
+
 def save_raw_data(items: List[Dict[str, Any]], timestamp: str) -> str:
     """
     Save raw data to a JSON file.
@@ -36,22 +111,8 @@ def save_raw_data(items: List[Dict[str, Any]], timestamp: str) -> str:
     Returns:
         str: Path to the saved file
     """
-    raw_dir, _, _ = ensure_data_dirs()
-    filepath = raw_dir / f"{timestamp}.json"
-    
-    # Valida os dados antes de salvar
-    validator = NewsValidator()
-    errors = validator.validate_items(items)
-    if errors:
-        raise ValueError(f"Erros de validação encontrados: {errors}")
-    
-    # Limpa e normaliza os dados
-    cleaned_items = [validator.clean_item(item) for item in items]
-    
-    # Salva os dados
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(cleaned_items, f, ensure_ascii=False, indent=2)
-    
+    raw_dir, _, compressed_dir = ensure_data_dirs()
+    filepath, _, _ = _write_set(_encode_items(items), *_set_paths(raw_dir, compressed_dir, timestamp, raw=True))
     return str(filepath.absolute())
 
 def save_processed_data(items: List[Dict[str, Any]], timestamp: str) -> str:
@@ -65,27 +126,18 @@ def save_processed_data(items: List[Dict[str, Any]], timestamp: str) -> str:
     Returns:
         str: Path to the saved file
     """
-    _, processed_dir, _ = ensure_data_dirs()
-    filepath = processed_dir / f"{timestamp}.json"
-    
-    # Valida os dados antes de salvar
-    validator = NewsValidator()
-    errors = validator.validate_items(items)
-    if errors:
-        raise ValueError(f"Erros de validação encontrados: {errors}")
-    
-    # Limpa e normaliza os dados
-    cleaned_items = [validator.clean_item(item) for item in items]
-    
-    # Salva os dados
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(cleaned_items, f, ensure_ascii=False, indent=2)
-    
+    _, processed_dir, compressed_dir = ensure_data_dirs()
+    filepath, _, _ = _write_set(_encode_items(items), *_set_paths(processed_dir, compressed_dir, timestamp))
     return str(filepath.absolute())
 
+def _report(count: int, filepath: Path, compressed_path: Path, ratio: float) -> None:
+    print(f"✓ {count} itens salvos em {filepath.absolute()}")
+    print(f"✓ Dados comprimidos em {compressed_path}")
+    print(f"✓ Taxa de compressão: {ratio:.2%}")
+
 def save(items: List[Dict], raw: bool = False) -> None:
     """
-    Salva os itens em um arquivo JSON com timestamp.
+    Salva os itens em um arquivo JSON com timestamp, comprime e indexa em uma passada.
     
     Args:
         items: Lista de itens a serem salvos
@@ -96,30 +148,39 @@ def save(items: List[Dict], raw: bool = False) -> None:
         >>> save(items, raw=True)  # Salva em data/raw/2024-03-21T14-30-00.json
         >>> save(items)  # Salva em data/processed/2024-03-21T14-30-00.json
     """
-    # Gera timestamp
     timestamp = datetime.now().strftime('%Y-%m-%dT%H-%M-%S')
-    
-    # Salva os dados
-    if raw:
-        filepath = save_raw_data(items, timestamp)
-    else:
-        filepath = save_processed_data(items, timestamp)
-    
-    # Comprime os dados
-    _, _, compressed_dir = ensure_data_dirs()
-    compressed_path = compressed_dir / f"{timestamp}.json.gz"
-    NewsCompressor.compress_file(filepath, str(compressed_path))
-    
-    # Indexa os dados
-    indexer = NewsIndex()
-    indexer.index_file(filepath)
-    
-    print(f"✓ {len(items)} itens salvos em {filepath}")
-    print(f"✓ Dados comprimidos em {compressed_path}")
-    
-    # Mostra taxa de compressão
-    ratio = NewsCompressor.get_compression_ratio(filepath, str(compressed_path))
-    print(f"✓ Taxa de compressão: {ratio:.2%}")
+    raw_dir, processed_dir, compressed_dir = ensure_data_dirs()
+    encoded = _encode_items(items)
+    paths = _write_set(encoded, *_set_paths(raw_dir if raw else processed_dir, compressed_dir,
+                                            timestamp, raw=raw))
+    _report(len(encoded), *paths)
+
+def save_run(raw_items: List[Dict], processed_items: List[Dict]) -> None:
+    """
+    Salva os itens brutos e os processados de uma execução.
+
+    Os itens processados são os mesmos objetos dos brutos (com resumo e
+    categorias), então cada item é validado, limpo e serializado uma única
+    vez e os mesmos bytes vão para os dois conjuntos.
+
+    Args:
+        raw_items: Itens selecionados na execução
+        processed_items: Itens processados (um subconjunto de `raw_items`)
+    """
+    timestamp = datetime.now().strftime('%Y-%m-%dT%H-%M-%S')
+    raw_dir, processed_dir, compressed_dir = ensure_data_dirs()
+    encoded_raw = _encode_items(raw_items)
+    by_id = {id(item): encoded for item, encoded in zip(raw_items, encoded_raw)}
+    missing = [item for item in processed_items if id(item) not in by_id]
+    extra = iter(_encode_items(missing))
+    encoded_processed = [by_id[id(item)] if id(item) in by_id else next(extra)
+                         for item in processed_items]
+
+    with NewsIndex() as indexer:
+        _report(len(encoded_raw), *_write_set(
+            encoded_raw, *_set_paths(raw_dir, compressed_dir, timestamp, raw=True), indexer))
+        _report(len(encoded_processed), *_write_set(
+            encoded_processed, *_set_paths(processed_dir, compressed_dir, timestamp), indexer))
 
 def search_news(
     query: str = None,
@@ -128,30 +189,40 @@ def search_news(
     min_relevance: float = None,
     start_date: datetime = None,
     end_date: datetime = None,
+    story_id: str = None,
+    ticker: str = None,
+    company: str = None,
     limit: int = 100
 ) -> List[Dict[str, Any]]:
     """
     Busca notícias no índice.
     
     Args:
-        query: Texto para buscar no título
+        query: Texto para buscar em título, resumo e conteúdo; aceita "frase exata",
+            prefixo* e AND/OR/NOT (resultados por relevância textual e recência)
         source: Fonte específica para filtrar
         category: Categoria específica para filtrar
         min_relevance: Relevância mínima
         start_date: Data inicial
         end_date: Data final
+        story_id: História específica (todas as notícias do mesmo evento)
+        ticker: Ticker citado na notícia (ex: PETR4)
+        company: Empresa citada na notícia, como em entities.yaml
         limit: Limite de resultados
         
     Returns:
         Lista de notícias encontradas
     """
-    indexer = NewsIndex()
-    return indexer.search(
-        query=query,
-        source=source,
-        category=category,
-        min_relevance=min_relevance,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit
-    )
\ No newline at end of file
+    with NewsIndex() as indexer:
+        return indexer.search(
+            query=query,
+            source=source,
+            category=category,
+            min_relevance=min_relevance,
+            start_date=start_date,
+            end_date=end_date,
+            story_id=story_id,
+            ticker=ticker,
+            company=company,
+            limit=limit
+        )
\ No newline at end of file
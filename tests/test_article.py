@@ -0,0 +1,53 @@
+"""
+Testes para o registro compacto de notícias.
+"""
+import json
+import sys
+
+from src.article import Article, ContentStore
+from src.storage.validator import NewsValidator
+
+LONG = "Copom mantém a Selic em 10,75% ao ano. " * 200
+
+
+def test_article_behaves_like_dict():
+    """Testa a interface de dicionário usada pelos estágios."""
+    article = Article(title="Notícia", source="Site", link="https://a.com/1")
+    article["relevance"] = 3.5
+    article["extra_field"] = [1, 2]
+    article.setdefault("profile_scores", {})["equities"] = 4.0
+
+    assert article.get("summary") is None
+    assert "title" in article and "summary" not in article
+    assert dict(article) == {"title": "Notícia", "link": "https://a.com/1", "source": "Site",
+                             "relevance": 3.5, "profile_scores": {"equities": 4.0},
+                             "extra_field": [1, 2]}
+    assert dict(article, relevance=1.0)["relevance"] == 1.0
+    del article["extra_field"]
+    assert len(article) == 5
+
+
+def test_long_text_spilled_and_loaded_lazily(tmp_path):
+    """Testa que o corpo longo vai para o disco e volta intacto."""
+    store = ContentStore(str(tmp_path))
+    article = Article(title="Selic", content=LONG, summary="curto", store=store)
+
+    assert article.is_spilled("content")
+    assert not article.is_spilled("summary")
+    assert len(store) >= len(LONG)
+    assert article["content"] == LONG
+    assert sys.getsizeof(article) < 1024
+
+    # Cópias compartilham o texto em disco
+    clone = article.copy()
+    assert clone["content"] == LONG and len(store) < 2 * len(LONG.encode("utf-8"))
+    store.close()
+
+
+def test_serialization_boundary():
+    """Testa a conversão em dicionário simples na gravação."""
+    article = Article(title=" Notícia ", source="Site", link="https://a.com/1", content=LONG)
+    cleaned = NewsValidator.clean_item(article)
+    assert type(cleaned) is dict
+    assert cleaned["title"] == "Notícia"
+    assert json.loads(json.dumps(cleaned))["content"] == LONG
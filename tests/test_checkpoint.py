@@ -0,0 +1,149 @@
+"""
+Testes para os checkpoints e a retomada de execuções.
+"""
+import asyncio
+
+import pytest
+
+import src.agent as agent
+import src.checkpoint as checkpoint_module
+from src.checkpoint import RunCheckpoint
+
+ITEMS = [
+    {"title": "Ibovespa sobe com bancos", "link": "https://example.com/1", "source": "A",
+     "summary": "Bolsa em alta.", "published": "2025-04-28T10:00:00+00:00"},
+    {"title": "Dólar cai frente ao real", "link": "https://example.com/2", "source": "B",
+     "summary": "Câmbio em queda.", "published": "2025-04-28T11:00:00+00:00"},
+]
+
+
+def test_stage_and_item_records(tmp_path):
+    """Testa a gravação e leitura de etapas e resultados por item."""
+    checkpoint = RunCheckpoint("run-1", base_dir=tmp_path)
+    assert checkpoint.load_stage("selected") is None
+    checkpoint.save_stage("selected", ITEMS)
+    checkpoint.record_item("k1", {"summary": "s1"})
+    with open(checkpoint.path / "items.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"key": "k2", "summ')  # escrita interrompida
+
+    reopened = RunCheckpoint("run-1", base_dir=tmp_path)
+    assert reopened.load_stage("selected") == ITEMS
+    assert reopened.load_items() == {"k1": {"summary": "s1"}}
+    assert RunCheckpoint.exists("run-1", base_dir=tmp_path)
+    assert not RunCheckpoint.exists("run-2", base_dir=tmp_path)
+
+
+def test_prune_old_runs(tmp_path):
+    """Testa a limpeza de execuções antigas, preservando a que será retomada."""
+    import os
+    import time
+
+    for run_id in ("velha", "retomada", "nova"):
+        RunCheckpoint(run_id, base_dir=tmp_path).save_stage("selected", ITEMS)
+    old = time.time() - 8 * 86400
+    for run_id in ("velha", "retomada"):
+        os.utime(tmp_path / run_id, (old, old))
+
+    assert RunCheckpoint.prune(7, base_dir=tmp_path, keep="retomada") == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["nova", "retomada"]
+
+
+def test_resume_skips_completed_work(tmp_path, monkeypatch):
+    """Testa que a retomada não recoleta nem ressume itens já processados."""
+    calls = {"collect": 0, "summarise": 0, "save": 0}
+
+    async def fake_fetch(sources, seen=None, deadline=None):
+        calls["collect"] += 1
+        return [dict(item) for item in ITEMS]
+
+    async def fake_summarise(item, use_llm=True):
+        calls["summarise"] += 1
+        return f"resumo {item['title']}"
+
+    async def fake_classify(item):
+        return {}
+
+    def failing_save(raw_items, processed_items):
+        calls["save"] += 1
+        raise ValueError("Erros de validação encontrados")
+
+    monkeypatch.setattr(checkpoint_module, "RUNS_DIR", tmp_path)
+    monkeypatch.setattr(agent, "fetch_rss", fake_fetch)
+    monkeypatch.setattr(agent, "fetch_html", lambda *a, **k: asyncio.sleep(0, result=[]))
+    monkeypatch.setattr(agent, "summarise_item", fake_summarise)
+    monkeypatch.setattr(agent, "classify_item", fake_classify)
+    monkeypatch.setattr(agent, "open_seen_store", lambda: None)
+    monkeypatch.setattr(agent, "open_story_clusterer", lambda: None)
+    monkeypatch.setattr(agent, "open_tracker", lambda: None)
+    monkeypatch.setattr(agent, "save_run", failing_save)
+
+    with pytest.raises(ValueError):
+        asyncio.run(agent.run_agent(["all"], limit=10))
+    assert calls == {"collect": 1, "summarise": 2, "save": 1}
+
+    run_id = next(tmp_path.iterdir()).name
+    monkeypatch.setattr(agent, "save_run", lambda raw_items, processed_items: None)
+    processed = asyncio.run(agent.run_agent(["all"], limit=10, resume=run_id))
+
+    assert calls["collect"] == 1
+    assert calls["summarise"] == 2
+    assert {item["summary"] for item in processed} == {
+        "resumo Ibovespa sobe com bancos", "resumo Dólar cai frente ao real"}
+    assert not RunCheckpoint.exists(run_id)  # execução concluída não deixa checkpoints
+
+    with pytest.raises(ValueError):
+        asyncio.run(agent.run_agent(["all"], resume="inexistente"))
+
+
+def test_seen_keys_use_collected_content(tmp_path, monkeypatch):
+    """Testa que o hash gravado no registro de vistos é o da coleta, não o do resumo do LLM."""
+    from src.storage.seen import SeenStore
+
+    async def fake_fetch(sources, seen=None, deadline=None):
+        return [dict(item) for item in ITEMS]
+
+    async def fake_summarise(item, use_llm=True):
+        return f"resumo {item['title']}"
+
+    store = SeenStore(str(tmp_path / "seen.db"))
+    monkeypatch.setattr(checkpoint_module, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(agent, "fetch_rss", fake_fetch)
+    monkeypatch.setattr(agent, "fetch_html", lambda *a, **k: asyncio.sleep(0, result=[]))
+    monkeypatch.setattr(agent, "summarise_item", fake_summarise)
+    monkeypatch.setattr(agent, "classify_item", lambda item: asyncio.sleep(0, result={}))
+    monkeypatch.setattr(agent, "open_seen_store", lambda: store)
+    monkeypatch.setattr(agent, "open_story_clusterer", lambda: None)
+    monkeypatch.setattr(agent, "open_tracker", lambda: None)
+    monkeypatch.setattr(agent, "save_run", lambda raw_items, processed_items: None)
+
+    asyncio.run(agent.run_agent(["all"], limit=10))
+
+    reopened = SeenStore(str(tmp_path / "seen.db"))
+    # Mesma notícia republicada em outro link: só o hash do conteúdo coletado a encontra
+    assert reopened.is_seen(dict(ITEMS[0], link="https://mirror.example.org/noticia"))
+    assert not reopened.is_seen(dict(ITEMS[0], link="https://mirror.example.org/noticia",
+                                     summary="resumo Ibovespa sobe com bancos"))
+
+
+def test_seen_records_dropped_candidates(tmp_path, monkeypatch):
+    """Testa que duplicatas e itens não selecionados também ficam como vistos."""
+    from src.storage.seen import SeenStore
+
+    async def fake_fetch(sources, seen=None, deadline=None):
+        return [dict(item) for item in ITEMS] + [dict(ITEMS[0], link="https://example.com/1?utm_source=x")]
+
+    store = SeenStore(str(tmp_path / "seen.db"))
+    monkeypatch.setattr(checkpoint_module, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(agent, "fetch_rss", fake_fetch)
+    monkeypatch.setattr(agent, "fetch_html", lambda *a, **k: asyncio.sleep(0, result=[]))
+    monkeypatch.setattr(agent, "summarise_item", lambda item, use_llm=True: asyncio.sleep(0, result="r"))
+    monkeypatch.setattr(agent, "classify_item", lambda item: asyncio.sleep(0, result={}))
+    monkeypatch.setattr(agent, "open_seen_store", lambda: store)
+    monkeypatch.setattr(agent, "open_story_clusterer", lambda: None)
+    monkeypatch.setattr(agent, "open_tracker", lambda: None)
+    monkeypatch.setattr(agent, "save_run", lambda raw_items, processed_items: None)
+
+    asyncio.run(agent.run_agent(["all"], limit=1))
+
+    reopened = SeenStore(str(tmp_path / "seen.db"))
+    assert all(reopened.seen_url(item["link"]) for item in ITEMS)
@@ -0,0 +1,59 @@
+"""
+Testes para o agrupamento de notícias em histórias.
+"""
+import json
+import os
+
+from src.processor.cluster import StoryClusterer, term_vector
+from src.storage.indexer import NewsIndex
+
+COPOM = [
+    {"title": "Copom mantém Selic em 10,75% ao ano",
+     "summary": "O Comitê de Política Monetária do Banco Central manteve a taxa Selic em 10,75% ao ano."},
+    {"title": "Banco Central mantém taxa Selic em 10,75%",
+     "summary": "O Copom decidiu manter a Selic em 10,75% ao ano, em decisão unânime do comitê."},
+]
+PETROBRAS = {"title": "Petrobras anuncia dividendos bilionários",
+             "summary": "A estatal aprovou a distribuição de dividendos aos acionistas."}
+
+
+def test_term_vector_normalized():
+    """Testa que o vetor de termos tem norma 1 e índices ordenados."""
+    indices, weights = term_vector("Copom mantém a Selic; Selic segue alta", dim=1024)
+    assert list(indices) == sorted(indices)
+    assert abs(float((weights ** 2).sum()) - 1.0) < 1e-5
+    assert len(term_vector("a o e", dim=1024)[0]) == 0
+
+
+def test_same_event_grouped_across_runs(tmp_path):
+    """Testa o agrupamento do mesmo evento, inclusive numa execução seguinte."""
+    db_path = str(tmp_path / "stories.db")
+    clusterer = StoryClusterer(db_path)
+    items = [dict(COPOM[0]), dict(PETROBRAS)]
+    stats = clusterer.assign_items(items)
+    clusterer.close()
+    assert stats == {"stories": 2, "new": 2}
+
+    # Nova instância: os centróides são recarregados do banco
+    clusterer = StoryClusterer(db_path)
+    later = dict(COPOM[1])
+    assert clusterer.assign_items([later]) == {"stories": 1, "new": 0}
+    assert later["story_id"] == items[0]["story_id"]
+    clusterer.close()
+
+
+def test_index_filters_by_story(tmp_path):
+    """Testa que o índice guarda o story_id e filtra por ele."""
+    items = [dict(item, source="Site", relevance=3.0) for item in COPOM + [PETROBRAS]]
+    clusterer = StoryClusterer(str(tmp_path / "stories.db"))
+    clusterer.assign_items(items)
+    clusterer.close()
+
+    path = os.path.join(tmp_path, "news.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(items, f)
+    index = NewsIndex(str(tmp_path / "index.db"))
+    index.index_file(path)
+
+    results = index.search(story_id=items[0]["story_id"])
+    assert sorted(r["title"] for r in results) == sorted(item["title"] for item in COPOM)
@@ -0,0 +1,129 @@
+"""
+Testes para a geração de drafts com correção local.
+"""
+import asyncio
+
+import pytest
+
+import src.create_post as create_post
+from src.create_post import (StreamCheck, draft_post, draft_posts, parse_draft, repair_draft,
+                             validate_draft)
+
+ARTICLE = {"title": "Copom mantém Selic", "summary": "O Copom manteve a Selic em 10,75%.",
+           "link": "https://a.com/1", "source": "Site", "relevance": 4.0}
+SENTENCE = "O Copom manteve a taxa Selic em 10,75% ao ano nesta quarta-feira. "
+
+
+def test_parse_tolerates_markdown_and_multiline():
+    """Testa rótulos com markdown, em português e TEXT em várias linhas."""
+    raw = "```\n**Hook:** Selic parada\n**Texto:** Primeira linha.\nSegunda linha.\n- hashtags: #Selic #Copom\n```"
+    assert parse_draft(raw) == {"hook": "Selic parada", "text": "Primeira linha.\nSegunda linha.",
+                                "hashtags": "#Selic #Copom"}
+
+
+def test_repair_fixes_length_and_hashtags_locally():
+    """Testa o corte no fim de sentença, o hook longo e as hashtags do fim do texto."""
+    fields = repair_draft({
+        "hook": " ".join(["palavra"] * 25),
+        "text": SENTENCE * 14 + "#Selic #selic #Juros",
+    })
+    assert validate_draft(fields) == {}
+    assert fields["text"].endswith(".")
+    assert len(fields["hook"].split()) == 20
+    assert fields["hashtags"] == "#Selic #Juros #Investimentos"
+
+
+def test_short_text_fixed_with_single_field_call(monkeypatch):
+    """Testa que um TEXT curto gera uma chamada só para o TEXT, não um post novo."""
+    prompts = []
+
+    async def fake_generate(prompt, max_tokens=400):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return "HOOK: Selic parada\nTEXT: Curto demais.\nHASHTAGS: #Selic #Copom #Juros"
+        return "TEXT: " + SENTENCE * 10
+
+    monkeypatch.setattr(create_post, "generate_content", fake_generate)
+    post = asyncio.run(draft_post(ARTICLE, stream=False))
+    assert len(prompts) == 2
+    assert "Reescreva apenas o TEXT" in prompts[1]
+    assert post["hook"] == "Selic parada"
+    assert post["hashtags"] == "#Selic #Copom #Juros"
+
+
+def test_invalid_after_fix_calls_raises(monkeypatch):
+    """Testa o limite de chamadas de correção."""
+    calls = []
+
+    async def fake_generate(prompt, max_tokens=400):
+        calls.append(prompt)
+        return "HOOK: Selic\nTEXT: Curto."
+
+    monkeypatch.setattr(create_post, "generate_content", fake_generate)
+    with pytest.raises(ValueError):
+        asyncio.run(draft_post(ARTICLE, stream=False))
+    assert len(calls) == 1 + create_post.MAX_FIX_CALLS
+
+
+def test_stream_check_flags_only_missing_labels():
+    """Testa que só a falta de rótulos interrompe; hook e TEXT longos ficam para o reparo local."""
+    check = StreamCheck()
+    assert check.feed("HOOK: Selic") is None
+    assert check.feed(" sobe" * 25) is None
+
+    # Hook de 20 palavras seguido do rótulo seguinte ainda sem ":"
+    check = StreamCheck()
+    assert check.feed("HOOK: " + " ".join(["palavra"] * 20) + "\n") is None
+    assert check.feed("TEXT") is None
+    assert check.feed(": " + SENTENCE * 20) is None
+
+    check = StreamCheck(label_window=50)
+    assert check.feed("Claro! Aqui está o seu post sobre a Selic, com ") is None
+    assert check.feed("tudo que você pediu.") == "resposta sem os rótulos HOOK/TEXT"
+
+
+def test_stream_aborts_unlabelled_reply_and_regenerates(monkeypatch):
+    """Testa que a resposta sem rótulos é interrompida e o post é pedido de novo."""
+    streams = []
+
+    async def fake_stream(**kwargs):
+        state = {"sent": 0, "closed": False}
+        streams.append(state)
+        if len(streams) == 1:
+            chunks = ["Claro!"] + [" Aqui vai uma introdução longa."] * 40
+        else:
+            chunks = ["HOOK:" + " palavra" * 25 + "\n", "TEXT: " + SENTENCE * 10,
+                      "\nHASHTAGS: #Selic #Copom #Juros"]
+        try:
+            for chunk in chunks:
+                state["sent"] += 1
+                yield chunk
+        finally:
+            state["closed"] = True
+
+    monkeypatch.setattr(create_post, "stream_completion", fake_stream)
+    post = asyncio.run(draft_post(ARTICLE, stream=True))
+    assert len(streams) == 2
+    assert streams[0]["sent"] < 41 and streams[0]["closed"]
+    # Hook longo: cortado localmente, sem terceira chamada
+    assert len(post["hook"].split()) == 20
+
+
+def test_draft_posts_bounded_concurrency(monkeypatch):
+    """Testa que no máximo `concurrency` drafts ficam em andamento."""
+    running = {"now": 0, "max": 0}
+
+    async def fake_draft(article, audience=None):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        if article["title"] == "falha":
+            raise ValueError("inválido")
+        return {"title": article["title"]}
+
+    monkeypatch.setattr(create_post, "draft_post", fake_draft)
+    articles = [{"title": str(i)} for i in range(6)] + [{"title": "falha"}]
+    posts = asyncio.run(draft_posts(articles, concurrency=2))
+    assert running["max"] == 2
+    assert [p["title"] for p in posts] == [str(i) for i in range(6)]
@@ -0,0 +1,60 @@
+"""
+Testes para o prazo de execução.
+"""
+import asyncio
+import math
+
+import pytest
+
+from src.deadline import Deadline
+
+
+def test_parse_durations_and_clock():
+    """Testa os formatos aceitos pela opção --deadline."""
+    assert Deadline.parse(None).unlimited
+    assert math.isinf(Deadline.parse("").remaining())
+    assert 89 < Deadline.parse("90s").remaining() <= 90
+    assert 5399 < Deadline.parse("1h30m").remaining() <= 5400
+    assert 119 < Deadline.parse("120").remaining() <= 120
+    assert 0 <= Deadline.parse("23:59").remaining() <= 86400
+    with pytest.raises(ValueError):
+        Deadline.parse("amanhã")
+
+
+def test_sub_deadline_uses_fraction_of_remaining():
+    """Testa o prazo parcial de cada etapa."""
+    deadline = Deadline(100)
+    assert 49 < deadline.sub(0.5).remaining() <= 50
+    assert Deadline().sub(0.5).unlimited
+
+
+def test_gather_cancels_pending_and_keeps_partial_results():
+    """Testa que tarefas lentas são canceladas e as concluídas são mantidas."""
+    cancelled = []
+
+    async def job(delay, value):
+        try:
+            await asyncio.sleep(delay)
+            return value
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+
+    async def failing():
+        raise RuntimeError("falha")
+
+    async def main():
+        deadline = Deadline(0.2)
+        return await deadline.gather([job(0, "a"), job(5, "b"), failing(), job(0.01, "c")])
+
+    assert asyncio.run(main()) == ["a", "c"]
+    assert cancelled == ["b"]
+
+
+def test_run_raises_timeout():
+    """Testa o limite de uma única tarefa."""
+    async def main():
+        await Deadline(0.05).run(asyncio.sleep(5))
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
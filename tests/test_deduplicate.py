@@ -0,0 +1,65 @@
+"""
+Testes para a remoção de duplicatas exatas e quase-duplicatas.
+"""
+from src.processor.deduplicate import process_items, remove_near_duplicates, MinHashLSH
+
+BODY = (
+    "O Comitê de Política Monetária do Banco Central decidiu nesta quarta-feira "
+    "elevar a taxa Selic em 0,5 ponto percentual, para 14,75% ao ano, em decisão "
+    "unânime. O comunicado indicou que novos ajustes dependerão da evolução da "
+    "inflação e das expectativas."
+)
+
+CONFIG = {
+    "enabled": True,
+    "shingle_size": 3,
+    "bands": 16,
+    "rows": 4,
+    "threshold": 0.6,
+    "representative": "longest",
+    "source_priority": ["Valor Investe"],
+}
+
+
+def make_items():
+    return [
+        {"title": "Copom eleva Selic para 14,75%", "content": BODY, "source": "InfoMoney"},
+        {"title": "Petrobras aprova dividendos", "source": "Exame",
+         "content": "A Petrobras aprovou o pagamento de dividendos aos acionistas."},
+        {"title": "Banco Central sobe Selic a 14,75% ao ano", "source": "Valor Investe",
+         "content": BODY + " Analistas esperam mais uma alta."},
+        {"title": "Copom eleva juros para 14,75%", "content": BODY, "source": "Exame"},
+    ]
+
+
+def test_exact_duplicates():
+    """Testa a remoção de duplicatas exatas por título e fonte."""
+    items = [
+        {"title": "Notícia 1", "source": "site1"},
+        {"title": "NOTÍCIA 1", "source": "site1"},
+        {"title": "Notícia 1", "source": "site2"},
+    ]
+    assert len(process_items(items)) == 2
+
+
+def test_near_duplicates_across_sources():
+    """Testa que a mesma história em fontes diferentes vira um único item."""
+    result = remove_near_duplicates(make_items(), CONFIG)
+    assert [it["source"] for it in result] == ["Valor Investe", "Exame"]
+    assert result[1]["title"] == "Petrobras aprova dividendos"
+
+
+def test_representative_policy():
+    """Testa a escolha do representativo por prioridade de fonte."""
+    config = dict(CONFIG, representative="source_priority", source_priority=["Exame"])
+    result = remove_near_duplicates(make_items(), config)
+    assert len(result) == 2
+    assert result[0]["title"] == "Copom eleva juros para 14,75%"
+
+
+def test_disabled_and_distinct_texts():
+    """Testa que textos distintos e a opção desabilitada não removem nada."""
+    items = make_items()
+    assert remove_near_duplicates(items, dict(CONFIG, enabled=False)) == items
+    lsh = MinHashLSH()
+    assert lsh.groups(["mercado sobe forte hoje", "petróleo cai no exterior", ""]) == []
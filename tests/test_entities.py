@@ -0,0 +1,57 @@
+"""
+Testes para a extração de tickers e empresas.
+"""
+import json
+
+from src.processor.entities import EntityExtractor, get_extractor
+from src.storage.indexer import NewsIndex
+
+COMPANIES = {
+    "Petrobras": {"tickers": ["PETR4", "PETR3"], "aliases": ["Petrobras", "Petróleo Brasileiro"]},
+    "Vale": {"tickers": ["VALE3"], "exact_aliases": ["Vale"]},
+    "Itaú Unibanco": {"tickers": ["ITUB4"], "aliases": ["Itaú"]},
+}
+
+
+def test_tickers_and_aliases_in_one_pass():
+    """Testa tickers no formato da B3, apelidos sem acento e apelidos exatos."""
+    extractor = EntityExtractor(COMPANIES)
+    entities = extractor.extract("PETROBRAS e ITAU sobem; BBDC4 e SANB11 caem; a Vale recua")
+    assert entities["tickers"] == ["PETR4", "PETR3", "ITUB4", "BBDC4", "SANB11", "VALE3"]
+    assert entities["companies"] == ["Petrobras", "Itaú Unibanco", "Vale"]
+
+
+def test_no_false_positives():
+    """Testa que palavras comuns e números não viram entidades."""
+    extractor = EntityExtractor(COMPANIES)
+    assert extractor.extract("Para o G20, vale a pena olhar o PIB de 2024 e a petrobrasileira") == \
+        {"tickers": [], "companies": []}
+    assert extractor.extract("Metas da COP26 e do G7X23 e A1B24") == {"tickers": [], "companies": []}
+    # Raiz com dígito só quando o ticker está no dicionário
+    known = EntityExtractor({"B3": {"tickers": ["B3SA3"]}})
+    assert known.extract("B3SA3 sobe") == {"tickers": ["B3SA3"], "companies": ["B3"]}
+
+
+def test_default_dictionary_loads():
+    """Testa o dicionário padrão de entities.yaml."""
+    entities = get_extractor().extract_item({"title": "Ações da Petrobras disparam", "summary": ""})
+    assert "PETR4" in entities["tickers"]
+
+
+def test_index_search_by_ticker(tmp_path):
+    """Testa a busca por ticker e empresa no índice."""
+    extractor = EntityExtractor(COMPANIES)
+    items = [
+        {"title": "Petrobras anuncia dividendos", "source": "A", "link": "https://a.com/1"},
+        {"title": "VALE3 lidera altas", "source": "B", "link": "https://b.com/2"},
+    ]
+    for item in items:
+        item["entities"] = extractor.extract_item(item)
+    path = tmp_path / "news.json"
+    path.write_text(json.dumps(items), encoding="utf-8")
+
+    index = NewsIndex(str(tmp_path / "index.db"))
+    index.index_file(str(path))
+    assert [r["title"] for r in index.search(ticker="petr3")] == ["Petrobras anuncia dividendos"]
+    assert [r["title"] for r in index.search(company="Vale")] == ["VALE3 lidera altas"]
+    assert index.search(ticker="ITUB4") == []
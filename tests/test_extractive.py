@@ -0,0 +1,63 @@
+"""
+Testes para o resumo extrativo local e o roteamento entre API e resumo local.
+"""
+import asyncio
+
+from src.processor.extractive import split_sentences, textrank, summarise_extractive
+from src.processor import summarise
+
+TEXT = (
+    "SÃO PAULO, 28 de abril. "
+    "O Ibovespa fechou em alta nesta sessão, impulsionado pelos bancos e pela Vale. "
+    "O Sr. Silva, gestor, comentou o movimento. "
+    "O volume negociado no Ibovespa superou a média, com bancos e Vale liderando as altas. "
+    "O dólar registrou leve queda frente ao real."
+)
+
+
+def test_split_sentences_keeps_abbreviations():
+    """Testa a segmentação em sentenças sem quebrar em abreviações."""
+    sentences = split_sentences(TEXT)
+    assert len(sentences) == 5
+    assert sentences[2] == "O Sr. Silva, gestor, comentou o movimento."
+
+
+def test_textrank_prefers_central_sentences():
+    """Testa que sentenças que compartilham termos com as demais pontuam mais."""
+    sentences = split_sentences(TEXT)
+    scores = textrank(sentences)
+    assert abs(scores.sum() - 1.0) < 1e-9
+    assert scores[1] > scores[0]
+    assert scores[3] > scores[4]
+
+
+def test_summarise_extractive_order_and_size():
+    """Testa que o resumo mantém a ordem original e respeita o tamanho."""
+    summary = summarise_extractive(TEXT, max_sentences=2, max_chars=400)
+    assert summary.startswith("O Ibovespa fechou em alta")
+    assert "O volume negociado" in summary
+    assert "SÃO PAULO" not in summary
+    assert len(summarise_extractive(TEXT, max_chars=60)) <= 63
+    assert summarise_extractive("") == ""
+
+
+def test_router_sends_short_items_to_local_summary(monkeypatch):
+    """Testa que itens curtos ou pouco relevantes não chamam a API."""
+    calls = []
+
+    async def fake_summarise(text, url):
+        calls.append(text)
+        return "resumo da API"
+
+    monkeypatch.setattr(summarise, "summarise", fake_summarise)
+
+    short = {"title": "Ibovespa sobe", "content": TEXT, "relevance": 5.0}
+    result = asyncio.run(summarise.process_item(short))
+    assert calls == []
+    assert "Ibovespa" in result
+
+    long_item = {"title": "Ibovespa sobe", "content": TEXT * 10, "relevance": 4.0}
+    assert asyncio.run(summarise.process_item(long_item)) == "resumo da API"
+    low = dict(long_item, relevance=2.0)
+    assert asyncio.run(summarise.process_item(low)) != "resumo da API"
+    assert asyncio.run(summarise.process_item(long_item, use_llm=False)) != "resumo da API"
@@ -0,0 +1,85 @@
+"""
+Testes para o envio incremental ao Google Sheets, com o substituto local da API.
+"""
+from export.google_sheets import SheetsWriter
+from export.local_sheets import LocalSheetsService, parse_range
+
+SHEET = "Outubro 2026"
+
+
+def post(n, **extra):
+    return {"title": f"Post {n}", "link": f"https://a.com/{n}", "score": n, **extra}
+
+
+def test_appends_only_new_rows_in_batches(tmp_path):
+    """Testa cabeçalho na primeira escrita, chave por link e appends em lotes."""
+    service = LocalSheetsService()
+    writer = SheetsWriter(service, cache_path=tmp_path / "sheets.json", batch_size=2)
+
+    assert writer.append([post(1), post(2), post(3)], sheet_name=SHEET) == 3
+    rows = service.rows(writer.spreadsheet_id, SHEET)
+    assert rows[0] == ["title", "link", "score"]
+    assert rows[3] == ["Post 3", "https://a.com/3", 3]
+    # Aba nova: nada é lido, só criado e acrescentado (4 linhas em lotes de 2)
+    assert service.calls == ["create", "get", "batchUpdate", "values.append", "values.append"]
+
+    service.calls.clear()
+    assert writer.append([post(2), post(4), post(4)], sheet_name=SHEET) == 1
+    assert service.calls == ["values.append"]
+    assert len(service.rows(writer.spreadsheet_id, SHEET)) == 5
+
+
+def test_cached_ids_skip_lookup_in_new_process(tmp_path):
+    """Testa que IDs em cache evitam busca/criação e que a aba é lida uma única vez."""
+    service = LocalSheetsService()
+    SheetsWriter(service, cache_path=tmp_path / "sheets.json").append([post(1)], sheet_name=SHEET)
+
+    service.calls.clear()
+    writer = SheetsWriter(service, cache_path=tmp_path / "sheets.json")
+    assert writer.append([post(1), post(2)], sheet_name=SHEET) == 1
+    assert writer.append([post(3)], sheet_name=SHEET) == 1
+    assert service.calls == ["values.get", "values.get", "values.append", "values.append"]
+
+
+def test_new_columns_extend_header(tmp_path):
+    """Testa que colunas novas só atualizam o cabeçalho."""
+    service = LocalSheetsService()
+    writer = SheetsWriter(service, cache_path=None)
+    writer.append([post(1)], sheet_name=SHEET)
+    writer.append([post(2, published="2026-10-18T09:00:00")], sheet_name=SHEET)
+
+    rows = service.rows(writer.spreadsheet_id, SHEET)
+    assert rows[0] == ["title", "link", "score", "published", "data_formatada"]
+    assert rows[2][-1] == "18/10/2026 09:00"
+
+
+def test_failed_append_is_retried(tmp_path):
+    """Testa que linhas de um append que falhou são enviadas na nova tentativa."""
+    service = LocalSheetsService()
+    writer = SheetsWriter(service, cache_path=None, batch_size=2)
+    original = service._append_values
+    failures = iter([True, False, True])
+
+    def flaky_append(**kwargs):
+        if next(failures, False):
+            raise ConnectionError("falha de rede")
+        return original(**kwargs)
+
+    service._append_values = flaky_append
+    for attempt in range(2):
+        try:
+            writer.append([post(1), post(2), post(3)], sheet_name=SHEET)
+        except ConnectionError:
+            pass
+    # 1ª tentativa: nada gravado; 2ª: cabeçalho e post 1 gravados, lote seguinte falhou
+    assert writer.append([post(1), post(2), post(3)], sheet_name=SHEET) == 2
+
+    rows = service.rows(writer.spreadsheet_id, SHEET)
+    assert rows[0] == ["title", "link", "score"]
+    assert [row[0] for row in rows[1:]] == ["Post 1", "Post 2", "Post 3"]
+
+
+def test_parse_range():
+    """Testa a interpretação de intervalos A1 no substituto local."""
+    assert parse_range("'Outubro 2026'!C2:C") == ("Outubro 2026", 1, 2, None, 2)
+    assert parse_range("Aba!1:1") == ("Aba", 0, 0, 0, None)
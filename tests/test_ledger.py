@@ -0,0 +1,107 @@
+"""
+Testes para o registro de drafts já gerados.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.storage.ledger import DraftLedger, story_fingerprint
+
+NOW = datetime(2026, 10, 18, 9, 0)
+
+
+def article(n, story, relevance=3.0, tickers=(), **extra):
+    return {"title": f"Notícia {n} sobre a história {story}", "link": f"https://a.com/{n}?utm_source=x",
+            "source": "Site", "summary": f"Resumo {n}", "relevance": relevance, "story_id": story,
+            "entities": {"tickers": list(tickers), "companies": []}, **extra}
+
+
+def test_suppresses_covered_stories_within_lookback(tmp_path):
+    """Testa a supressão pelo link e pela história dentro da janela."""
+    ledger = DraftLedger(str(tmp_path / "ledger.db"), lookback_days=3)
+    ledger.record([article(1, "s1", tickers=["PETR4"])], now=NOW - timedelta(days=1))
+
+    assert "link" in ledger.check(article(1, "s1", tickers=["PETR4"]), now=NOW)
+    assert "história" in ledger.check(article(2, "s1", tickers=["PETR4"]), now=NOW)
+    assert ledger.check(article(3, "s2"), now=NOW) is None
+    # Fora da janela
+    assert ledger.check(article(2, "s1"), now=NOW + timedelta(days=3)) is None
+    # Outro perfil de audiência
+    assert ledger.check(article(2, "s1"), scope="crypto", now=NOW) is None
+
+
+def test_significant_update_overrides(tmp_path):
+    """Testa que relevância bem maior ou entidades novas liberam um novo draft."""
+    ledger = DraftLedger(str(tmp_path / "ledger.db"), update_relevance_gain=1.0)
+    ledger.record([article(1, "s1", relevance=3.0, tickers=["PETR4"])], now=NOW)
+
+    assert ledger.check(article(2, "s1", relevance=3.5, tickers=["PETR4"]), now=NOW) is not None
+    assert ledger.check(article(2, "s1", relevance=4.2, tickers=["PETR4"]), now=NOW) is None
+    assert ledger.check(article(2, "s1", tickers=["PETR4", "VALE3"]), now=NOW) is None
+
+
+def test_select_fills_slots_with_new_stories(tmp_path):
+    """Testa que as vagas vão para histórias novas, sem repetir história na execução."""
+    ledger = DraftLedger(str(tmp_path / "ledger.db"))
+    ledger.record([article(1, "s1")], now=NOW - timedelta(hours=20))
+    candidates = [article(1, "s1"), article(2, "s2"), article(3, "s2"), article(4, "s3"), article(5, "s4")]
+
+    selected = ledger.select(candidates, 2, now=NOW)
+    assert [a["link"] for a in selected] == ["https://a.com/2?utm_source=x", "https://a.com/4?utm_source=x"]
+
+
+def test_fingerprint_without_story_id():
+    """Testa a impressão digital pelos termos do título quando não há história."""
+    a = {"title": "Petrobras anuncia dividendos extraordinários"}
+    b = {"title": "Dividendos extraordinários: Petrobras anuncia"}
+    assert story_fingerprint(a) == story_fingerprint(b)
+    assert story_fingerprint({"title": "x", "story_id": "abc"}) == "story:abc"
+    # Títulos sem termos úteis não se confundem entre si
+    assert story_fingerprint({"title": "!!!", "link": "https://a.com/1"}) == "link:https://a.com/1"
+    assert story_fingerprint({"title": "", "link": "https://a.com/2"}) != story_fingerprint(
+        {"title": "", "link": "https://a.com/3"})
+
+
+def test_write_drafts_records_only_delivered(tmp_path, monkeypatch):
+    """Testa que histórias só entram no registro se algum destino recebeu os drafts."""
+    import asyncio
+    import src.cli as cli
+    import src.create_post as create_post
+
+    async def fake_drafts(articles, audience=None, deadline=None):
+        return [{"link": a["link"], "hook": "h"} for a in articles]
+
+    ledgers = []
+
+    def open_ledger():
+        ledgers.append(DraftLedger(str(tmp_path / "ledger.db")))
+        return ledgers[-1]
+
+    results = {"csv:x": ConnectionError("falhou")}
+    monkeypatch.setattr(create_post, "draft_posts", fake_drafts)
+    monkeypatch.setattr(cli, "open_draft_ledger", open_ledger)
+    monkeypatch.setattr(cli, "export_records",
+                        lambda stream, posts, suffix="": asyncio.sleep(0, result=results))
+
+    cli.write_drafts([article(1, "s1")], None, top_n=1)
+    assert len(DraftLedger(str(tmp_path / "ledger.db"))) == 0
+
+    results["sheets"] = "https://docs.google.com/x"
+    cli.write_drafts([article(1, "s1")], None, top_n=1)
+    assert len(DraftLedger(str(tmp_path / "ledger.db"))) == 1
+
+    # Nenhum destino configurado: o draft gerado conta como entregue
+    results.clear()
+    cli.write_drafts([article(3, "s3")], None, top_n=1)
+    assert len(DraftLedger(str(tmp_path / "ledger.db"))) == 2
+
+    # O registro é fechado mesmo quando a geração falha
+    async def failing_drafts(*args, **kwargs):
+        raise RuntimeError("LLM fora do ar")
+
+    monkeypatch.setattr(create_post, "draft_posts", failing_drafts)
+    with pytest.raises(RuntimeError):
+        cli.write_drafts([article(2, "s2")], None, top_n=1)
+    with pytest.raises(sqlite3.ProgrammingError):
+        ledgers[-1].conn.execute("SELECT 1")
@@ -0,0 +1,66 @@
+"""
+Testes para as formas normalizadas do texto compartilhadas pelos estágios.
+"""
+import numpy as np
+
+from src.article import Article
+from src.processor.deduplicate import shingle_hashes
+from src.processor.normalize import normalized, plain_text
+from src.storage.keys import content_hash
+
+
+def test_plain_text():
+    """Testa a remoção de HTML e espaços, sem tocar em textos limpos."""
+    assert plain_text("<p>Copom  mantém\n<b>Selic</b></p>") == "Copom mantém Selic"
+    assert plain_text("juros < inflação") == "juros < inflação"
+
+
+def test_forms_computed_once_per_article():
+    """Testa que as formas ficam no Article e são reaproveitadas."""
+    article = Article(title="Ações da Petrobras sobem", summary="<p>O Ibovespa fecha em alta.</p>")
+    forms = normalized(article)
+    assert normalized(article) is forms
+    assert forms.folded == "acoes da petrobras sobem o ibovespa fecha em alta."
+    assert forms.title_terms == ["acoes", "petrobras", "sobem"]
+    assert forms.shingles(3) is forms.shingles(3)
+    assert np.array_equal(np.sort(forms.shingles(3)),
+                          np.sort(shingle_hashes(f"{forms.title} {forms.body}", 3)))
+    assert "forms" not in dict(article) and "text_forms" not in dict(article)
+
+
+def test_forms_invalidated_when_text_changes():
+    """Testa que mudar o título ou o corpo descarta as formas antigas."""
+    article = Article(title="Selic", summary="Texto original", relevance=3.0)
+    forms = normalized(article)
+    article["relevance"] = 4.0
+    assert normalized(article) is forms
+
+    article["summary"] = "Resumo novo"
+    assert normalized(article).body == "Resumo novo"
+    assert content_hash(article) == content_hash({"title": "Selic", "summary": "Resumo novo"})
+
+
+def test_forms_keep_no_body_in_memory(tmp_path):
+    """Testa que as formas de um corpo gravado em disco não o trazem de volta à memória."""
+    import tracemalloc
+    from src.article import ContentStore
+    from src.processor.entities import get_extractor
+
+    store = ContentStore(str(tmp_path))
+    body = "O Ibovespa fecha em alta com bancos e a Petrobras. " * 2000
+    articles = [Article(title=f"Notícia {n}", content=body, store=store) for n in range(10)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for article in articles:
+        forms = normalized(article)
+        forms.shingles(3), forms.title_terms, forms.body_terms, content_hash(article)
+        get_extractor().extract_item(article)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    assert all(article.is_spilled("content") for article in articles)
+    # Só hashes e termos ficam: bem menos que um único corpo (~100 KB)
+    assert grown < len(body)
+    assert normalized(articles[0]).body == body.strip()
+    store.close()
@@ -0,0 +1,60 @@
+"""
+Testes para a pontuação por perfis de audiência.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+import src.agent as agent
+from src.processor.relevance import get_profile_scorer, process_items
+
+NOW = datetime(2025, 4, 28, 12, 0, tzinfo=timezone.utc)
+
+PROFILES = {
+    "equities": {"keywords": {"ibovespa": 1.0}, "min_relevance": 3.5, "limit": 2},
+    "crypto": {"keywords": {"bitcoin": 1.0}, "min_relevance": 3.5, "limit": 1},
+}
+
+
+def _items():
+    published = "2025-04-28T10:00:00+00:00"
+    return [
+        {"title": "Ibovespa sobe forte", "source": "a", "published": published},
+        {"title": "Bitcoin renova máxima", "source": "b", "published": published},
+        {"title": "Ibovespa e bitcoin em alta", "source": "c", "published": published},
+        {"title": "Clima ameno no fim de semana", "source": "d", "published": published},
+    ]
+
+
+def test_unknown_profile_raises():
+    """Testa que um perfil inexistente é rejeitado."""
+    with pytest.raises(ValueError):
+        get_profile_scorer("perfil_inexistente")
+
+
+def test_profile_keywords_change_scores():
+    """Testa que cada perfil pontua com suas próprias palavras-chave."""
+    items = _items()
+    equities = process_items(items, now=NOW, profile="equities")
+    crypto = process_items(items, now=NOW, profile="crypto")
+    assert equities[0] > crypto[0]
+    assert crypto[1] > equities[1]
+
+
+def test_select_for_profiles_union(monkeypatch):
+    """Testa a união das seleções, com a relevância de cada perfil no item."""
+    monkeypatch.setattr(agent, "load_profiles", lambda: PROFILES)
+
+    def fake_relevance(items, profile=None):
+        keyword = next(iter(PROFILES[profile]["keywords"]))
+        return [4.0 if keyword in item["title"].lower() else 3.0 for item in items]
+
+    monkeypatch.setattr(agent, "calculate_relevance", fake_relevance)
+    selected = agent.select_for_profiles(_items(), ["equities", "crypto"], limit=10, per_source=None)
+
+    titles = [item["title"] for item in selected]
+    assert "Clima ameno no fim de semana" not in titles
+    # crypto tem limite 1: só um dos itens com bitcoin entra por esse perfil
+    assert len(selected) == 3
+    assert all(item["relevance"] == max(item["profile_scores"].values()) for item in selected)
+    assert sum("crypto" in item["profile_scores"] for item in selected) == 1
@@ -0,0 +1,115 @@
+"""
+Testes para o limitador de taxa das chamadas de LLM.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+from openai import RateLimitError
+
+import src.llm as llm
+from src.ratelimit import RateLimiter, parse_duration, estimate_tokens
+
+
+def test_parse_duration():
+    """Testa os formatos de duração dos cabeçalhos da API."""
+    assert parse_duration("20") == 20.0
+    assert parse_duration("6m0s") == 360.0
+    assert parse_duration("1.5s") == 1.5
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("") is None
+    assert estimate_tokens([{"content": "x" * 400}], max_tokens=100) == 200
+
+
+def test_requests_are_metered():
+    """Testa que requisições além do orçamento aguardam o reabastecimento."""
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1_000_000)
+    limiter.requests.level = 0
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*[limiter.acquire(10) for _ in range(3)])
+        return time.monotonic() - start
+
+    # 600 rpm = 1 requisição a cada 0,1 s
+    assert asyncio.run(main()) >= 0.25
+
+
+def test_callers_served_in_arrival_order():
+    """Testa a fila justa entre chamadores."""
+    limiter = RateLimiter(requests_per_minute=1200, tokens_per_minute=1_000_000)
+    limiter.requests.level = 0
+    order = []
+
+    async def caller(i):
+        await limiter.acquire()
+        order.append(i)
+
+    async def main():
+        await asyncio.gather(*[caller(i) for i in range(5)])
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_headers_adapt_budget():
+    """Testa o ajuste do orçamento pelos cabeçalhos de rate limit."""
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=30000)
+    limiter.update_from_headers({
+        "x-ratelimit-limit-requests": "100",
+        "x-ratelimit-remaining-requests": "3",
+        "x-ratelimit-limit-tokens": "10000",
+    })
+    assert limiter.requests.capacity == 95.0
+    assert limiter.requests.level == 3.0
+    assert limiter.tokens.capacity == 9500.0
+
+    pause = limiter.on_rate_limited({"retry-after": "2"})
+    assert pause == 2.0
+    assert limiter.paused_until > time.monotonic() + 1.5
+
+
+def test_pause_follows_exhausted_limit():
+    """Testa que a pausa usa o reset do limite esgotado, com teto."""
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=30000)
+    pause = limiter.on_rate_limited({
+        "x-ratelimit-remaining-requests": "120", "x-ratelimit-reset-requests": "6m0s",
+        "x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1.5s",
+    })
+    assert pause == 1.5
+    assert limiter.on_rate_limited({
+        "x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "6m0s",
+    }) == RateLimiter.MAX_PAUSE
+    # Sem saber qual limite estourou: backoff exponencial
+    assert limiter.on_rate_limited({"x-ratelimit-reset-requests": "6m0s"}) == 1.0
+    assert limiter.on_rate_limited({}) == 2.0
+
+
+def test_chat_completion_retries_after_429(monkeypatch):
+    """Testa que um 429 pausa o limitador e a chamada é refeita."""
+    calls = []
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    class FakeRaw:
+        headers = {"x-ratelimit-remaining-requests": "10"}
+
+        def parse(self):
+            return SimpleNamespace(usage=SimpleNamespace(total_tokens=50), choices=["ok"])
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            response = httpx.Response(429, headers={"retry-after-ms": "50"}, request=request)
+            raise RateLimitError("rate limited", response=response, body=None)
+        return FakeRaw()
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create))))
+    monkeypatch.setattr(llm, "_client", fake_client)
+    monkeypatch.setattr(llm, "limiter", RateLimiter(600, 100000))
+
+    response = asyncio.run(llm.chat_completion(model="m", messages=[{"content": "oi"}]))
+    assert response.choices == ["ok"]
+    assert len(calls) == 2
+    assert llm.limiter.requests.level <= 10
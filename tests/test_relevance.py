@@ -0,0 +1,62 @@
+"""
+Testes para a pontuação de relevância em lote.
+"""
+from datetime import datetime, timezone
+
+from src.processor.text import KeywordMatcher
+from src.processor.relevance import RelevanceScorer, process_items, process_item
+
+NOW = datetime(2025, 4, 28, 12, 0, tzinfo=timezone.utc)
+
+CONFIG = {
+    "base_score": 3.0,
+    "fields": ["title"],
+    "max_keyword_bonus": 1.0,
+    "keywords": {"ações": 0.2, "ibovespa": 0.3, "banco central": 0.5},
+    "recency": {"fresh_days": 1, "fresh_bonus": 1.0, "recent_days": 3,
+                "recent_bonus": 0.5, "stale_days": 7, "stale_penalty": 1.0},
+}
+
+
+def test_matcher_accent_insensitive_whole_words():
+    """Testa que o casador ignora acentos e só casa palavras inteiras."""
+    matcher = KeywordMatcher(["ações", "banco central"])
+    assert matcher.find("ACOES sobem após fala do Banco Central") == ["ações", "banco central"]
+    assert matcher.find("negociações") == []
+
+
+def test_scorer_keywords_counted_once_per_item():
+    """Testa que cada palavra-chave soma seu peso uma única vez por item."""
+    scorer = RelevanceScorer(CONFIG)
+    items = [
+        {"title": "Ações, ações e mais ações"},
+        {"title": "Ibovespa reage ao Banco Central"},
+        {"title": "Sem termos"},
+    ]
+    scores = scorer.score(items, NOW)
+    assert list(scores.round(2)) == [3.2, 3.8, 3.0]
+
+
+def test_scorer_recency():
+    """Testa o ajuste de recência sobre um único instante de referência."""
+    scorer = RelevanceScorer(CONFIG)
+    items = [
+        {"title": "x", "published": "2025-04-28T08:00:00Z"},
+        {"title": "x", "published": "2025-04-26T08:00:00+00:00"},
+        {"title": "x", "published": "2025-04-23T08:00:00+00:00"},
+        {"title": "x", "published": "2025-04-01T08:00:00+00:00"},
+        {"title": "x", "published": "data inválida"},
+    ]
+    assert list(scorer.score(items, NOW)) == [4.0, 3.5, 3.0, 2.0, 3.0]
+
+
+def test_process_item_matches_batch():
+    """Testa que a versão por item usa o mesmo pontuador do lote."""
+    items = [
+        {"title": "Ibovespa e dólar em alta", "published": "2025-04-28T10:00:00Z"},
+        {"title": "Outra notícia", "description": "análise de risco"},
+    ]
+    batch = process_items(items, NOW)
+    assert len(batch) == 2
+    assert all(0 <= s <= 5 for s in batch)
+    assert process_item(items[1]) == batch[1]
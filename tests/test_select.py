@@ -0,0 +1,32 @@
+"""
+Testes para a seleção dos itens mais relevantes.
+"""
+from src.processor.select import select_top_k
+
+ITEMS = [
+    {"title": "a1", "source": "A", "relevance": 3.0},
+    {"title": "a2", "source": "A", "relevance": 4.8},
+    {"title": "a3", "source": "A", "relevance": 4.6},
+    {"title": "b1", "source": "B", "relevance": 4.0},
+    {"title": "b2", "source": "B", "relevance": 4.0},
+    {"title": "c1", "source": "C", "relevance": 2.0},
+]
+
+
+def test_top_k_by_merit():
+    """Testa que a seleção independe da ordem de chegada."""
+    selected = select_top_k(ITEMS, 3)
+    assert [it["title"] for it in selected] == ["a2", "a3", "b1"]
+
+
+def test_top_k_ties_keep_arrival_order():
+    """Testa o desempate pela ordem original."""
+    selected = select_top_k(ITEMS[3:5], 1)
+    assert selected[0]["title"] == "b1"
+
+
+def test_top_k_per_source_quota():
+    """Testa a cota por fonte."""
+    selected = select_top_k(ITEMS, 4, per_source=1)
+    assert [it["title"] for it in selected] == ["a2", "b1", "c1"]
+    assert select_top_k(ITEMS, 0) == []
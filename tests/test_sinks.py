@@ -0,0 +1,158 @@
+"""
+Testes para a exportação paralela aos destinos.
+"""
+import asyncio
+import csv
+import json
+import time
+
+from aiohttp import web
+
+import pytest
+
+import export.google_sheets as google_sheets
+from export.google_sheets import SheetsWriter
+from export.local_sheets import LocalSheetsService
+from export.sinks import CsvSink, JsonlSink, SheetsSink, Sink, WebhookSink, build_sinks, fan_out
+
+RECORDS = [{"title": "Copom mantém Selic", "link": "https://a.com/1", "score": 4.0},
+           {"title": "Petrobras anuncia dividendos", "link": "https://a.com/2", "score": 3.5}]
+
+
+class FakeSink(Sink):
+    threaded = False
+
+    def __init__(self, name, delay=0.0, failures=0, **options):
+        super().__init__(retry_delay=0.01, **options)
+        self._name = name
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    @property
+    def name(self):
+        return self._name
+
+    async def write(self, records):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ConnectionError("indisponível")
+        return f"{len(records)} registros"
+
+    def write_sync(self, records):
+        return asyncio.run(self.write(records))
+
+
+def test_fan_out_isolates_failures_and_retries(tmp_path):
+    """Testa que destinos com falha ou lentos não afetam os outros."""
+    flaky = FakeSink("flaky", failures=1, retries=2)
+    broken = FakeSink("broken", failures=10, retries=1)
+    slow = FakeSink("slow", delay=5, timeout=0.2, retries=0)
+    sinks = [CsvSink(tmp_path / "posts.csv"), JsonlSink(tmp_path / "posts.jsonl"), flaky, broken, slow]
+
+    start = time.monotonic()
+    results = asyncio.run(fan_out(RECORDS, sinks))
+    assert time.monotonic() - start < 2
+
+    assert results["flaky"] == "2 registros" and flaky.calls == 2
+    assert isinstance(results["broken"], ConnectionError) and broken.calls == 2
+    assert isinstance(results["slow"], asyncio.TimeoutError)
+    with open(tmp_path / "posts.csv", newline="", encoding="utf-8") as fh:
+        assert [row["link"] for row in csv.DictReader(fh)] == ["https://a.com/1", "https://a.com/2"]
+    lines = (tmp_path / "posts.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[1])["title"] == "Petrobras anuncia dividendos"
+
+
+def test_sheets_sink_retries_after_failure(monkeypatch):
+    """Testa a nova tentativa do Sheets (substituto local) após uma falha real da API."""
+    service = LocalSheetsService()
+    writer = SheetsWriter(service, cache_path=None)
+    monkeypatch.setattr(google_sheets, "get_writer", lambda: writer)
+    original = service._append_values
+    failures = iter([True])
+
+    def flaky_append(**kwargs):
+        if next(failures, False):
+            raise ConnectionError("falha de rede")
+        return original(**kwargs)
+
+    service._append_values = flaky_append
+    sink = SheetsSink(retries=1, retry_delay=0.01)
+    results = asyncio.run(fan_out(RECORDS, [sink]))
+
+    assert results["sheets"] == writer.url
+    rows = service.rows(writer.spreadsheet_id, google_sheets.sheet_name_for())
+    assert [row[1] for row in rows[1:]] == ["https://a.com/1", "https://a.com/2"]
+
+
+def test_thread_sink_not_retried_after_timeout(monkeypatch):
+    """Testa que um destino em thread que estourou o prazo não é reexecutado em paralelo."""
+    service = LocalSheetsService()
+    writer = SheetsWriter(service, cache_path=None)
+    monkeypatch.setattr(google_sheets, "get_writer", lambda: writer)
+    original = service._append_values
+    calls = []
+
+    def slow_append(**kwargs):
+        calls.append(1)
+        time.sleep(0.3)
+        return original(**kwargs)
+
+    service._append_values = slow_append
+    sink = SheetsSink(retries=2, retry_delay=0.01, timeout=0.1)
+    results = asyncio.run(fan_out(RECORDS, [sink]))
+
+    assert isinstance(results["sheets"], asyncio.TimeoutError)
+    time.sleep(0.4)  # a thread termina a escrita iniciada
+    assert len(calls) == 1
+    assert len(service.rows(writer.spreadsheet_id, google_sheets.sheet_name_for())) == 3
+
+
+def test_sink_requires_write_sync():
+    """Testa que write_sync é abstrato."""
+    class Incomplete(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_webhook_sink_posts_records():
+    """Testa o webhook contra um servidor HTTP local."""
+    received = []
+
+    async def handler(request):
+        received.append(await request.json())
+        return web.json_response({"ok": True})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/drafts", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await fan_out(RECORDS, [WebhookSink(f"http://127.0.0.1:{port}/drafts")])
+        finally:
+            await runner.cleanup()
+
+    results = asyncio.run(scenario())
+    assert list(results.values())[0].endswith("(200)")
+    assert received[0]["records"][0]["link"] == "https://a.com/1"
+
+
+def test_build_sinks_skips_disabled_and_formats_paths():
+    """Testa a criação dos destinos a partir da configuração."""
+    config = {"sinks": {"drafts": [
+        {"type": "csv", "path": "output/posts_{date}{suffix}.csv"},
+        {"type": "webhook", "url": "http://localhost/x", "enabled": False},
+        {"type": "jsonl", "path": "out.jsonl", "retries": 3},
+    ]}}
+    sinks = build_sinks("drafts", suffix="_crypto", config=config)
+    assert [s.type for s in sinks] == ["csv", "jsonl"]
+    assert str(sinks[0].path).endswith("_crypto.csv")
+    assert sinks[1].retries == 3
+    assert build_sinks("articles", config=config) == []
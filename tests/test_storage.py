@@ -10,7 +10,10 @@ import pytest
 
 from src.storage.validator import NewsValidator
 from src.storage.compressor import NewsCompressor
-from src.storage.indexer import NewsIndex
+from src.storage.indexer import NewsIndex, encode_payload
+from src.storage.seen import SeenStore, BloomFilter
+from src.storage.keys import canonical_url
+from src.storage.archive import RecordArchive, index_path, write_archive
 
 # Dados de exemplo para testes
 SAMPLE_ITEMS = [
@@ -108,6 +111,37 @@ def test_compressor_compression_ratio():
         ratio = NewsCompressor.get_compression_ratio(orig_path, comp_path)
         assert 0 < ratio < 1  # Arquivo comprimido deve ser menor
 
+@pytest.mark.parametrize("count", [0, 8, 10])
+def test_record_archive_random_access(tmp_path, monkeypatch, count):
+    """Testa o arquivo em blocos: leitura inteira compatível e um bloco por registro."""
+    import zlib
+    import src.storage.archive as archive_module
+
+    records = [dict(SAMPLE_ITEMS[i % 2], title=f"Notícia {i}\nlinha") for i in range(count)]
+    path = tmp_path / "data.json.gz"
+    write_archive(records, path, block_records=4)
+
+    assert NewsCompressor.decompress_json(str(path)) == records
+    calls, decompress = [], zlib.decompress
+    monkeypatch.setattr(archive_module.zlib, "decompress",
+                        lambda data, **kw: calls.append(1) or decompress(data, **kw))
+    with RecordArchive(path) as archive:
+        assert len(archive) == count
+        if count:
+            assert archive[5]["title"] == "Notícia 5\nlinha"
+            assert archive[6] == records[6]  # mesmo bloco, já descomprimido
+            assert len(calls) == 1
+            assert archive[-count] == records[0]
+            assert len(calls) == 2
+        assert list(archive) == records
+        with pytest.raises(IndexError):
+            archive[count]
+
+    # Arquivo antigo, sem índice de blocos
+    index_path(path).unlink()
+    with RecordArchive(path) as archive:
+        assert list(archive) == records and len(archive) == count
+
 def test_indexer_operations():
     """Testa operações do indexador."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -141,4 +175,283 @@ def test_indexer_operations():
             start_date=datetime(2025, 4, 24, 18, 0),
             end_date=datetime(2025, 4, 24, 19, 0)
         )
-        assert len(results) == 2 
\ No newline at end of file
+        assert len(results) == 2 
+
+def test_canonical_url():
+    """Testa a normalização de URLs usada como chave."""
+    assert canonical_url("https://WWW.Site.com/a/?utm_source=x&b=2&a=1#topo") == "https://site.com/a?a=1&b=2"
+    assert canonical_url("") == ""
+
+
+def test_bloom_filter():
+    """Testa que o filtro de Bloom não tem falsos negativos."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"url:https://example.com/{i}" for i in range(500)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"outra:{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_seen_store_persists_across_runs():
+    """Testa que itens registrados são reconhecidos por uma nova instância."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "seen.db")
+        store = SeenStore(db_path, capacity=1000)
+        store.add_items(SAMPLE_ITEMS)
+        store.close()
+
+        store = SeenStore(db_path, capacity=1000)
+        assert store.seen_url("https://www.example.com/1/?utm_medium=rss")
+        assert store.is_seen({"title": "Notícia 2", "link": "https://outro.com/x",
+                              "summary": "Resumo da notícia 2"})
+        assert not store.is_seen({"title": "Nova", "link": "https://example.com/3"})
+        store.close()
+
+        # Registros expirados deixam de ser considerados vistos
+        store = SeenStore(db_path, max_age_days=-1, capacity=1000)
+        assert len(store) == 0
+        assert not store.seen_url("https://example.com/1")
+        store.close()
+
+
+def test_save_run_single_pass(tmp_path, monkeypatch):
+    """Testa que brutos e processados são gravados, comprimidos e indexados de uma vez."""
+    import src.storage_utils as storage_utils
+    from src.storage_utils import save_run
+
+    dirs = tmp_path / "raw", tmp_path / "processed", tmp_path / "compressed"
+    for d in dirs:
+        d.mkdir()
+    monkeypatch.setattr(storage_utils, "ensure_data_dirs", lambda: dirs)
+    db_path = str(tmp_path / "index.db")
+    monkeypatch.setattr(storage_utils, "NewsIndex", lambda: NewsIndex(db_path))
+
+    items = [dict(item) for item in SAMPLE_ITEMS]
+    save_run(items, items[:1])
+
+    raw_file = next(dirs[0].glob("*.json"))
+    processed_file = next(dirs[1].glob("*.json"))
+    assert json.loads(raw_file.read_text(encoding="utf-8"))[1]["title"] == "Notícia 2"
+    assert len(json.loads(processed_file.read_text(encoding="utf-8"))) == 1
+    assert len(list(dirs[2].glob("*.json.gz"))) == 2
+    assert not list(tmp_path.rglob("*.tmp"))
+    compressed = next(dirs[2].glob("raw-*.json.gz"))
+    assert NewsCompressor.decompress_json(str(compressed))[0]["link"] == "https://example.com/1"
+    with RecordArchive(compressed) as archive:
+        assert archive[1]["title"] == "Notícia 2"
+
+    results = NewsIndex(db_path).search(source="Site A")
+    assert len(results) == 1  # bruto e processado na mesma linha
+    assert results[0]["title"] == "Notícia 1"
+
+
+def test_indexer_migrations_and_bulk_ingest(tmp_path):
+    """Testa as migrações versionadas (inclusive em banco antigo), o WAL e a carga em lote."""
+    import sqlite3
+    import threading
+    from src.storage.indexer import MIGRATIONS
+
+    db_path = str(tmp_path / "index.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("""CREATE TABLE news (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                      source TEXT NOT NULL, published TIMESTAMP, relevance FLOAT,
+                      file_path TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+    legacy.commit()
+    legacy.close()
+
+    with NewsIndex(db_path) as index:
+        assert index.schema_version == len(MIGRATIONS)
+        assert index.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        columns = {row[1] for row in index.conn.execute("PRAGMA table_info(news)")}
+        assert "story_id" in columns
+
+        files = []
+        for n in range(20):
+            path = tmp_path / f"{n}.json"
+            items = [dict(item, title=f"Notícia {n}-{i}", link=f"https://example.com/{n}/{i}",
+                          entities={"tickers": ["PETR4"]})
+                     for i, item in enumerate(SAMPLE_ITEMS * 50)]
+            path.write_text(json.dumps(items), encoding="utf-8")
+            files.append(str(path))
+        assert index.index_files(files) == 2000
+
+        # Inserções concorrentes de várias threads na mesma conexão
+        threads = [threading.Thread(target=index.index_items, args=([dict(SAMPLE_ITEMS[0])], files[0]))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        count = index.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+        assert count == 2001
+        tickers = index.conn.execute("SELECT COUNT(*) FROM entities WHERE value = 'PETR4'").fetchone()[0]
+        assert tickers == 2000
+        assert index.search(query="Notícia 7-99")[0]["title"] == "Notícia 7-99"
+
+
+def test_search_reads_payload_not_snapshot(tmp_path):
+    """Testa que a busca usa o payload da linha, sem abrir o arquivo, mesmo com títulos iguais."""
+    from src.storage.keys import item_key
+
+    items = [dict(SAMPLE_ITEMS[0]), dict(SAMPLE_ITEMS[1], title="Notícia 1")]
+    snapshot = tmp_path / "snapshot.json"
+    snapshot.write_text(json.dumps(items), encoding="utf-8")
+    db_path = str(tmp_path / "index.db")
+
+    with NewsIndex(db_path) as index:
+        index.index_items(items, str(snapshot))
+        # Simula um banco anterior ao payload: a migração preenche a partir do arquivo
+        index.conn.execute("UPDATE news SET payload = NULL, item_id = NULL")
+        index.conn.execute("PRAGMA user_version = 2")
+
+    with NewsIndex(db_path) as index:
+        assert index.conn.execute("SELECT COUNT(*) FROM news WHERE payload IS NULL").fetchone()[0] == 0
+        snapshot.unlink()
+        index.index_items(items, str(snapshot))
+
+        results = index.search(source="Site B")
+        assert {r["link"] for r in results} == {"https://example.com/2"}
+        assert index.get(item_key(items[1]))["source"] == "Site B"
+        assert len(index.search(category="economia")) == 1
+
+
+def test_upsert_merges_newer_fields(tmp_path):
+    """Testa que reindexar a mesma notícia atualiza a linha sem perder campos processados."""
+    from src.storage.keys import item_key
+
+    processed = dict(SAMPLE_ITEMS[0], entities={"tickers": ["PETR4"]}, story_id="s1")
+    raw = {"title": "Notícia 1", "link": "https://www.example.com/1/?utm_source=rss",
+           "source": "Site A", "published": processed["published"], "summary": ""}
+    with NewsIndex(str(tmp_path / "index.db")) as index:
+        index.index_items([processed], "a.json")
+        index.index_items([raw, dict(processed, relevance=4.5, categories={"mercado": 0.7})], "b.json")
+
+        assert index.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0] == 1
+        item = index.get(item_key(raw))
+        assert item["summary"] == "Resumo da notícia 1"
+        assert item["relevance"] == 4.5 and item["story_id"] == "s1"
+        assert index.search(category="economia") == []
+        assert index.search(category="mercado", min_relevance=4.0)[0]["title"] == "Notícia 1"
+        assert index.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0] == 1
+        assert len(index.search(query="Notícia")) == 1
+
+
+def test_dedup_migration(tmp_path):
+    """Testa que a migração une as linhas repetidas de bancos antigos."""
+    import sqlite3
+    from src.storage.keys import item_key
+
+    db_path = str(tmp_path / "index.db")
+    with NewsIndex(db_path) as index:
+        index.index_items([dict(item) for item in SAMPLE_ITEMS], "a.json")
+        # Simula um banco anterior à chave única, com uma cópia mais nova da notícia 1
+        index.conn.execute("DROP INDEX idx_news_item_id")
+        newer = json.dumps(dict(SAMPLE_ITEMS[0], summary="", relevance=4.0)).encode("utf-8")
+        index.conn.execute("""INSERT INTO news (title, source, relevance, file_path, item_id, payload)
+                              SELECT title, source, 4.0, 'b.json', item_id, ? FROM news WHERE id = 1""",
+                           (encode_payload(newer),))
+        index.conn.execute("INSERT INTO categories (news_id, category) VALUES (3, 'economia')")
+        index.conn.execute("PRAGMA user_version = 4")
+
+    with NewsIndex(db_path) as index:
+        assert index.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0] == 2
+        results = index.search(category="economia")
+        assert len(results) == 1
+        assert results[0]["relevance"] == 4.0
+        assert results[0]["summary"] == "Resumo da notícia 1"
+        assert index.conn.execute("SELECT COUNT(*) FROM news_fts").fetchone()[0] == 2
+        with pytest.raises(sqlite3.IntegrityError):
+            index.conn.execute("INSERT INTO news (title, source, file_path, item_id) "
+                               "VALUES ('x', 'y', 'z', ?)", (item_key(SAMPLE_ITEMS[0]),))
+
+
+def test_migration_finds_relocated_snapshots(tmp_path, monkeypatch):
+    """Testa a recuperação de linhas com caminhos de outra máquina e de arquivos perdidos."""
+    import sqlite3
+    from src.storage import indexer
+    from src.storage.keys import item_key
+
+    data_dir = tmp_path / "data"
+    (data_dir / "processed").mkdir(parents=True)
+    monkeypatch.setattr(indexer, "DATA_DIR", data_dir)
+    moved = data_dir / "processed" / "2025-04-28T17-03-25.json"
+    moved.write_text(json.dumps([SAMPLE_ITEMS[0]]), encoding="utf-8")
+
+    db_path = str(tmp_path / "index.db")
+    with NewsIndex(db_path) as index:
+        index.index_items([dict(SAMPLE_ITEMS[0])], "a.json")
+        index.index_items([dict(SAMPLE_ITEMS[1])], "b.json")
+        # Simula o banco copiado de outra máquina: caminhos absolutos de lá e, para a
+        # notícia 2, duas cópias (bruta e processada) de arquivos que não existem mais
+        index.conn.execute("DROP INDEX idx_news_item_id")
+        index.conn.execute("INSERT INTO news (title, source, relevance, file_path) "
+                           "SELECT title, source, relevance, file_path FROM news WHERE id = 2")
+        index.conn.execute("UPDATE news SET payload = NULL, item_id = NULL, file_path = "
+                           "'/Users/outro/Desktop/agent/data/' || "
+                           "CASE id WHEN 1 THEN 'processed/2025-04-28T17-03-25.json' "
+                           "ELSE 'raw/2025-04-29T11-48-11.json' END")
+        index.conn.execute("PRAGMA user_version = 5")
+
+    with NewsIndex(db_path) as index:
+        assert index.schema_version == len(indexer.MIGRATIONS)
+        assert index.get(item_key(SAMPLE_ITEMS[0]))["summary"] == "Resumo da notícia 1"
+        assert index.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0] == 2
+        assert index.conn.execute("SELECT COUNT(*) FROM news WHERE item_id IS NULL").fetchone()[0] == 0
+        assert len(index.search(query="resumo")) == 1
+
+        # A notícia sem arquivo é reconhecida por título e fonte ao ser salva de novo
+        index.index_items([dict(SAMPLE_ITEMS[1], relevance=5.0)], "c.json")
+        assert index.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0] == 2
+        assert index.get(item_key(SAMPLE_ITEMS[1]))["relevance"] == 5.0
+        assert len(index.search(category="política")) == 1
+        with pytest.raises(sqlite3.IntegrityError):
+            index.conn.execute("INSERT INTO news (title, source, file_path, item_id) "
+                               "VALUES ('x', 'y', 'z', ?)", (item_key(SAMPLE_ITEMS[1]),))
+
+
+def test_full_text_search_ranking(tmp_path):
+    """Testa a busca FTS5 sem acentos, em resumo/conteúdo, com frase, prefixo e recência."""
+    from src.storage.indexer import fts_query
+
+    today = datetime.now().replace(microsecond=0)
+    items = [
+        {"title": "Copom mantém a taxa Selic", "link": "https://a.com/1", "source": "A",
+         "published": "2020-01-10T10:00:00", "summary": "Decisão unânime do comitê."},
+        {"title": "Copom mantém a taxa Selic", "link": "https://a.com/2", "source": "A",
+         "published": today.isoformat(), "summary": "Decisão unânime do comitê."},
+        {"title": "Petrobras anuncia dividendos", "link": "https://a.com/3", "source": "B",
+         "published": today.isoformat(), "summary": "Ações sobem",
+         "content": "<p>A estatal pagará proventos extraordinários.</p>"},
+    ]
+    with NewsIndex(str(tmp_path / "index.db")) as index:
+        index.index_items(items, str(tmp_path / "x.json"))
+
+        # Mesmo texto: a notícia recente vem antes
+        assert [r["link"] for r in index.search(query="selic")] == ["https://a.com/2", "https://a.com/1"]
+        assert index.search(query="acoes")[0]["link"] == "https://a.com/3"
+        assert index.search(query="proventos extraordinarios")[0]["link"] == "https://a.com/3"
+        assert index.search(query="petro*")[0]["link"] == "https://a.com/3"
+        assert index.search(query='"taxa selic"', source="A", limit=1)[0]["link"] == "https://a.com/2"
+        assert index.search(query='"selic taxa"') == []
+        assert index.search(query="S&P 500:") == []
+        # Sequências de operadores não viram erro de sintaxe do FTS5
+        assert [r["link"] for r in index.search(query="selic AND NOT juros")] == [
+            "https://a.com/2", "https://a.com/1"]
+        assert index.search(query="selic AND NOT unanime") == []
+        assert len(index.search(query="selic OR NOT juros")) == 2
+        # O termo negado nunca vira positivo
+        assert index.search(query="selic OR NOT unanime") == []
+        assert index.search(query="NOT selic") == []
+        assert [r["link"] for r in index.search(query="NOT selic petrobras")] == ["https://a.com/3"]
+        assert len(index.search(query="selic AND AND comite")) == 2
+        assert index.search(query="NOT OR AND") == []
+
+    assert fts_query('"taxa selic" petro* S&P OR') == '"taxa selic" "petro"* "S&P"'
+    assert fts_query("selic AND NOT juros") == '"selic" NOT "juros"'
+    assert fts_query("selic OR NOT juros") == '"selic" NOT "juros"'
+    assert fts_query("selic NOT AND OR juros") == '"selic" NOT "juros"'
+    assert fts_query("NOT juros selic") == '"selic"'
+    assert fts_query("OR NOT juros") == ''
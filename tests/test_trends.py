@@ -0,0 +1,70 @@
+"""
+Testes para a detecção de tendências e picos.
+"""
+from typer.testing import CliRunner
+
+from src.processor.trends import CountMinSketch, TrendTracker, item_terms
+
+HOUR = 3600.0
+START = 1_700_000_000.0
+
+
+def test_count_min_sketch_never_underestimates():
+    """Testa que a estimativa é pelo menos a contagem real e o decaimento."""
+    sketch = CountMinSketch(width=64, depth=4)
+    keys = [f"termo{i}" for i in range(200)]
+    sketch.add(keys)
+    sketch.add(["selic"] * 10)
+    assert (sketch.estimate(keys) >= 1).all()
+    assert sketch.estimate(["selic"])[0] >= 10
+    sketch.decay(0.5)
+    assert sketch.estimate(["selic"])[0] >= 5
+
+
+def test_item_terms_include_entities():
+    """Testa os termos de um item: tickers, empresas e título."""
+    item = {"title": "Petrobras sobe", "entities": {"tickers": ["PETR4"], "companies": ["Petrobras"]}}
+    assert item_terms(item) == ["$PETR4", "@Petrobras", "petrobras", "sobe", "petrobras sobe"]
+
+
+def test_burst_against_baseline(tmp_path):
+    """Testa que só o termo novo e repentino é apontado como pico."""
+    tracker = TrendTracker(str(tmp_path / "trends.npz"), width=512, min_count=3)
+    for hour in range(0, 240, 6):
+        tracker.observe([{"title": "Selic estável"}], now=START + hour * HOUR)
+    tracker.observe([{"title": "Bitcoin dispara"}] * 4 + [{"title": "Selic estável"}],
+                    now=START + 240 * HOUR)
+
+    terms = [burst["term"] for burst in tracker.bursts()]
+    assert "bitcoin" in terms
+    assert "selic" not in terms
+
+    # O estado salvo é restaurado por uma nova execução
+    tracker.save()
+    restored = TrendTracker.load(str(tmp_path / "trends.npz"), width=512, min_count=3)
+    assert [b["term"] for b in restored.bursts()] == terms
+
+    # Dias depois, sem novas menções, o pico se dissipa
+    restored.advance(START + 300 * HOUR)
+    assert "bitcoin" not in [b["term"] for b in restored.bursts()]
+
+
+def test_candidates_bounded(tmp_path):
+    """Testa que a memória não cresce com o histórico."""
+    tracker = TrendTracker(str(tmp_path / "trends.npz"), width=256, max_candidates=50)
+    for i in range(20):
+        tracker.observe([{"title": f"noticia{i}x{j} evento"} for j in range(20)],
+                        now=START + i * HOUR)
+    assert len(tracker.candidates) <= 50
+    assert tracker.recent.table.shape == (4, 256)
+
+
+def test_cli_trends_without_state(monkeypatch):
+    """Testa o comando trends antes da primeira coleta."""
+    import src.processor.trends as trends
+    from src.cli import app
+
+    monkeypatch.setattr(trends, "open_tracker", lambda: None)
+    result = CliRunner().invoke(app, ["trends"])
+    assert result.exit_code == 0
+    assert "Nenhum dado de tendências" in result.output